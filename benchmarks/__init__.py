@@ -0,0 +1,6 @@
+"""
+Benchmark suite for the habit tracker's hot paths.
+
+    python -m benchmarks run --size small --output results.json
+    python -m benchmarks compare baseline.json results.json --threshold 10
+"""
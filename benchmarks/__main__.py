@@ -0,0 +1,69 @@
+import argparse
+import json
+import sys
+
+from benchmarks.suite import CASES, DATASETS, DEFAULT_DATA_DIR, compare_runs, run_suite
+
+
+def run(args):
+    report = run_suite(args.size, repeat=args.repeat, cases=args.case, data_dir=args.data_dir)
+    print(f"=== {args.size} dataset ({report['meta']['completions']} completions) ===")
+    for name, result in report['results'].items():
+        print(f"{name:28} median {result['median_ms']:10.3f} ms   {result['ops_per_sec'] or 0:10.1f} ops/sec"
+              f"   {result['statements']:4} SQL statements")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+    return 0
+
+
+def compare(args):
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+
+    if baseline['meta']['dataset'] != current['meta']['dataset']:
+        print("⚠️  Runs used different datasets; comparison may be meaningless")
+
+    rows = compare_runs(baseline, current, args.threshold)
+    for row in rows:
+        flag = "❌ REGRESSION" if row['regression'] else "✅"
+        print(f"{row['case']:28} {row['baseline_ms']:10.3f} -> {row['current_ms']:10.3f} ms "
+              f"({row['change_pct']:+.1f}%) {flag}")
+
+    regressions = [row for row in rows if row['regression']]
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold}%")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Habit tracker benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="time the hot paths on a generated dataset")
+    run_parser.add_argument("--size", choices=sorted(DATASETS), default="small")
+    run_parser.add_argument("--repeat", type=int, default=50, help="timed calls per case")
+    run_parser.add_argument("--case", action="append", choices=sorted(CASES),
+                            help="only run this case (repeatable)")
+    run_parser.add_argument("--output", help="write results as JSON")
+    run_parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where generated datasets are cached")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser("compare", help="flag regressions between two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="percent slowdown that counts as a regression")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Load-test the HTTP/JSON API with concurrent keep-alive clients posting check-offs.
+
+Starts a server on a temporary database (or targets --url), then each client
+thread holds one connection and posts check-offs back to back.
+
+Usage: python benchmarks/bench_api.py [--clients 1 16 64] [--requests 200] [--url http://127.0.0.1:8000]
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api_server import HabitAPIServer  # noqa: E402
+
+
+def call(conn, method: str, path: str, body=None, token=None) -> tuple:
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f"Bearer {token}"
+    conn.request(method, path, json.dumps(body).encode() if body is not None else None, headers)
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    timing = response.getheader('Server-Timing', 'app;dur=0').partition('dur=')[2]
+    return response.status, payload, float(timing)
+
+
+def setup(host: str, port: int, clients: int) -> tuple:
+    """A fresh user with one daily habit per client; returns (token, habit_ids)."""
+    conn = http.client.HTTPConnection(host, port)
+    username = f"load_{time.time_ns()}"
+    call(conn, 'POST', '/register', {'username': username, 'email': f"{username}@example.com", 'password': "secret"})
+    token = call(conn, 'POST', '/login', {'username': username, 'password': "secret"})[1]['token']
+    for i in range(clients):
+        call(conn, 'POST', '/habits', {'name': f"Habit {i}", 'type': "daily"}, token)
+    habit_ids = [habit['habit_id'] for habit in call(conn, 'GET', '/habits', token=token)[1]]
+    conn.close()
+    return token, habit_ids
+
+
+def run_clients(host: str, port: int, clients: int, requests: int) -> dict:
+    token, habit_ids = setup(host, port, clients)
+    latencies, server_ms, errors = [], [], []
+    lock = threading.Lock()
+
+    def client(habit_id):
+        conn = http.client.HTTPConnection(host, port)
+        mine, theirs = [], []
+        for _ in range(requests):
+            started = time.perf_counter()
+            status, payload, timing = call(conn, 'POST', f'/habits/{habit_id}/checkoff', {'mood_score': 7}, token)
+            mine.append((time.perf_counter() - started) * 1000)
+            theirs.append(timing)
+            if status != 201:
+                with lock:
+                    errors.append(payload)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            server_ms.extend(theirs)
+
+    threads = [threading.Thread(target=client, args=(habit_id,)) for habit_id in habit_ids]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests_per_second': clients * requests / elapsed,
+        'p50_ms': latencies[len(latencies) // 2],
+        'p99_ms': latencies[int(len(latencies) * 0.99)],
+        'server_ms': statistics.mean(server_ms),
+        'errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 16, 64], help="concurrent keep-alive clients")
+    parser.add_argument("--requests", type=int, default=200, help="check-offs per client")
+    parser.add_argument("--url", help="running server to target (default: start one on a temporary database)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            server = HabitAPIServer(("127.0.0.1", 0), os.path.join(tmp, "api.db"), pool_size=8)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            host, port = server.server_address
+
+        print(f"POST /habits/<id>/checkoff, {args.requests} per client")
+        for clients in args.clients:
+            result = run_clients(host, port, clients, args.requests)
+            print(f"  {clients:3d} clients: {result['requests_per_second']:8.0f} req/sec, "
+                  f"p50 {result['p50_ms']:6.2f} ms, p99 {result['p99_ms']:6.2f} ms, "
+                  f"server {result['server_ms']:6.2f} ms, {result['errors']} errors")
+
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
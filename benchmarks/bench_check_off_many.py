@@ -0,0 +1,59 @@
+"""
+Compare a loop of check_off_habit calls against one check_off_many batch.
+
+Usage: python benchmarks/bench_check_off_many.py [--records 2000] [--habits 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db import Database  # noqa: E402
+from src.habit_manager import HabitManager  # noqa: E402
+
+
+def setup(db_path: str, habits: int) -> HabitManager:
+    db = Database(db_path)
+    db.register_user("bench", "bench@example.com", "secret")
+    manager = HabitManager(db)
+    manager.set_current_user(db.authenticate_user("bench", "secret"))
+    for i in range(habits):
+        manager.add_habit(f"Habit {i}", "daily" if i % 3 else "weekly")
+    return manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000, help="completions per measurement")
+    parser.add_argument("--habits", type=int, default=20, help="habits the completions are spread over")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = setup(os.path.join(tmp, "singles.db"), args.habits)
+        habit_ids = [h[0] for h in manager.list_habits()]
+        records = [(habit_ids[i % len(habit_ids)], "bench", 5) for i in range(args.records)]
+
+        start = time.perf_counter()
+        for habit_id, notes, mood in records:
+            manager.check_off_habit(habit_id, notes, mood)
+        singles = args.records / (time.perf_counter() - start)
+        manager.db.close()
+
+        manager = setup(os.path.join(tmp, "bulk.db"), args.habits)
+        start = time.perf_counter()
+        results = manager.check_off_many(records)
+        bulk = args.records / (time.perf_counter() - start)
+        manager.db.close()
+        assert all(r['success'] for r in results)
+
+    print(f"check-offs, {args.records} records over {args.habits} habits")
+    print(f"  check_off_habit loop: {singles:10.0f} records/sec")
+    print(f"  check_off_many:       {bulk:10.0f} records/sec")
+    print(f"  speedup:              {bulk / singles:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare connect-per-call against the pooled Database connections.
+
+Usage: python benchmarks/bench_connection_pool.py [--ops 5000]
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db import Database  # noqa: E402
+
+
+def authenticate_connect_per_call(db_path: str, username: str, password: str):
+    """The pre-pool behaviour: open, run one statement, close."""
+    password_hash = hashlib.sha256(password.encode()).hexdigest()
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT user_id FROM Users WHERE username = ? AND password_hash = ?",
+        (username, password_hash)
+    )
+    result = cursor.fetchone()
+    conn.close()
+    return result[0] if result else None
+
+
+def ops_per_second(func, ops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ops):
+        func()
+    return ops / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ops", type=int, default=5000, help="operations per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_pool.db")
+        db = Database(db_path)
+        db.register_user("bench", "bench@example.com", "secret")
+
+        before = ops_per_second(lambda: authenticate_connect_per_call(db_path, "bench", "secret"), args.ops)
+        after = ops_per_second(lambda: db.authenticate_user("bench", "secret"), args.ops)
+        db.close()
+
+    print(f"authenticate_user, {args.ops} ops")
+    print(f"  connect-per-call: {before:10.0f} ops/sec")
+    print(f"  pooled:           {after:10.0f} ops/sec")
+    print(f"  speedup:          {after / before:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
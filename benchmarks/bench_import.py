@@ -0,0 +1,75 @@
+"""
+Measure bulk import throughput with and without dropping indexes and triggers.
+
+Usage: python benchmarks/bench_import.py [--rows 500000] [--habits 50]
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db import Database  # noqa: E402
+from src.habit_manager import HabitManager  # noqa: E402
+from src.importer import CompletionImporter  # noqa: E402
+
+
+def setup(db_path: str, habits: int) -> HabitManager:
+    db = Database(db_path)
+    db.register_user("bench", "bench@example.com", "secret")
+    manager = HabitManager(db)
+    manager.set_current_user(db.authenticate_user("bench", "secret"))
+    for i in range(habits):
+        manager.add_habit(f"Habit {i}", "daily" if i % 3 else "weekly")
+    return manager
+
+
+def write_csv(path: str, rows: int, habits: int):
+    """rows completions spread over habits and five years, about 2% of them repeated."""
+    rng = random.Random(42)
+    start = datetime(2021, 1, 1)
+    previous = []
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(("habit_id", "timestamp", "notes", "mood_score"))
+        for _ in range(rows):
+            if previous and rng.random() < 0.02:
+                writer.writerow(rng.choice(previous))
+                continue
+            row = (rng.randint(1, habits), (start + timedelta(seconds=rng.randrange(5 * 365 * 86400))).isoformat(sep=' '),
+                   "", rng.choice(("", 3, 7)))
+            writer.writerow(row)
+            if len(previous) < 1000:
+                previous.append(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500000, help="rows in the import file")
+    parser.add_argument("--habits", type=int, default=50, help="habits the rows are spread over")
+    args = parser.parse_args()
+
+    print(f"import, {args.rows} rows over {args.habits} habits")
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "import.csv")
+        write_csv(source, args.rows, args.habits)
+
+        for bulk in (False, True):
+            manager = setup(os.path.join(tmp, f"import_{bulk}.db"), args.habits)
+            stats = CompletionImporter(manager).import_file(source, bulk=bulk)
+            again = CompletionImporter(manager).import_file(source, bulk=bulk)
+            manager.db.close()
+            assert again['imported'] == 0
+
+            label = "bulk (indexes dropped)" if bulk else "normal"
+            print(f"  {label:24s} {stats['rows_per_second']:10d} rows/sec "
+                  f"({stats['imported']} imported, {stats['duplicates']} duplicates)")
+            print(f"  {'re-import, all dupes':24s} {again['rows_per_second']:10d} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare check-offs committed by each producer thread against the group-commit WriteQueue.
+
+Usage: python benchmarks/bench_write_queue.py [--ops 400] [--producers 1 8 64] [--profile durable]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db import STORAGE_PROFILES, Database  # noqa: E402
+from src.habit_manager import HabitManager  # noqa: E402
+from src.write_queue import WriteQueue  # noqa: E402
+
+
+def setup(db_path: str, producers: int, profile: str) -> Database:
+    """One user and one daily habit per producer."""
+    db = Database(db_path, pool_size=producers + 1, profile=profile)
+    db.register_user("bench", "bench@example.com", "secret")
+    manager = HabitManager(db)
+    manager.set_current_user(db.authenticate_user("bench", "secret"))
+    for i in range(producers):
+        manager.add_habit(f"Habit {i}", "daily")
+    return db
+
+
+def run_producers(producers: int, ops: int, check_off) -> tuple:
+    """Each producer checks off its own habit ops times, waiting for every commit; returns (ops/sec, failures)."""
+    failures = []
+
+    def produce(habit_id):
+        for _ in range(ops):
+            try:
+                check_off(habit_id)
+            except (sqlite3.OperationalError, TimeoutError) as e:
+                failures.append(e)
+
+    threads = [threading.Thread(target=produce, args=(i + 1,)) for i in range(producers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return producers * ops / (time.perf_counter() - start), len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ops", type=int, default=400, help="check-offs per producer")
+    parser.add_argument("--producers", type=int, nargs="+", default=[1, 8, 64], help="concurrent producer threads")
+    parser.add_argument("--profile", choices=STORAGE_PROFILES, default="durable", help="storage profile")
+    args = parser.parse_args()
+
+    print(f"check-offs, {args.ops} per producer, '{args.profile}' storage profile")
+    with tempfile.TemporaryDirectory() as tmp:
+        for producers in args.producers:
+            db = setup(os.path.join(tmp, f"direct_{producers}.db"), producers, args.profile)
+
+            def direct(habit_id, local=threading.local()):
+                if not hasattr(local, 'manager'):
+                    local.manager = HabitManager(db)
+                    local.manager.set_current_user(1)
+                local.manager.check_off_habit(habit_id)
+
+            direct_rate, direct_failures = run_producers(producers, args.ops, direct)
+            db.close()
+
+            db = setup(os.path.join(tmp, f"queued_{producers}.db"), producers, args.profile)
+            writes = WriteQueue(db)
+            queued_rate, queued_failures = run_producers(
+                producers, args.ops, lambda habit_id: writes.check_off(1, habit_id).result())
+            writes.close()
+            db.close()
+
+            print(f"  {producers:3d} producers: per-call commits {direct_rate:8.0f}/sec ({direct_failures} failed), "
+                  f"write queue {queued_rate:8.0f}/sec ({queued_failures} failed, "
+                  f"{writes.stats()['avg_batch']} per commit)")
+
+
+if __name__ == "__main__":
+    main()
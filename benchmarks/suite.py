@@ -0,0 +1,197 @@
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import date, datetime
+from io import StringIO
+from unittest import mock
+
+from data.scale_data_generator import DEFAULT_PASSWORD, generate_dataset
+from src.db import Database
+from src.habit_manager import HabitManager
+from src.advanced_analytics import AdvancedAnalytics
+from src.rollups import CompletionRollupStore
+from src.repository import HabitRepository
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+# users, habits per user, years of history
+DATASETS = {
+    'small': (20, 5, 1),
+    'medium': (200, 8, 3),
+    'huge': (2000, 10, 5),
+}
+
+# Fixed end date so every run benchmarks byte-identical data
+DATASET_END_DATE = date(2025, 12, 31)
+DATASET_SEED = 42
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "habit_tracker_bench")
+
+
+def dataset_path(size: str, data_dir: str = DEFAULT_DATA_DIR) -> str:
+    """Generate the dataset on first use and return its (cached) path."""
+    users, habits, years = DATASETS[size]
+    path = os.path.join(data_dir, f"{size}_seed{DATASET_SEED}.db")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        partial = path + ".partial"
+        generate_dataset(partial, users, habits, years, seed=DATASET_SEED, end_date=DATASET_END_DATE)
+        os.replace(partial, path)
+    return path
+
+
+def measure(func, repeat: int, warmup: int = 1) -> dict:
+    """Time ``func`` ``repeat`` times; statistics are in milliseconds."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(timings)
+    return {
+        'repeat': repeat,
+        'min_ms': round(min(timings), 4),
+        'median_ms': round(median, 4),
+        'mean_ms': round(statistics.fmean(timings), 4),
+        'max_ms': round(max(timings), 4),
+        'ops_per_sec': round(1000 / median, 1) if median else None,
+    }
+
+
+class BenchmarkContext:
+    """
+    A private copy of a dataset plus the objects the cases operate on.
+    Benchmarks that write (check-offs) never touch the cached dataset.
+    """
+
+    def __init__(self, source_path: str, work_dir: str):
+        self.db_path = os.path.join(work_dir, "bench.db")
+        shutil.copyfile(source_path, self.db_path)
+        self.work_dir = work_dir
+
+        self.db = Database(self.db_path)
+        self.manager = HabitManager(self.db)
+        self.analytics = AdvancedAnalytics(self.db)
+
+        self.username = "user1"
+        self.user_id = self.db.authenticate_user(self.username, DEFAULT_PASSWORD)
+        self.manager.set_current_user(self.user_id)
+        habits = self.manager.list_habits()
+        self.habit_id = habits[0][0]
+
+    def close(self):
+        self.db.close()
+
+
+def _export_data(ctx: BenchmarkContext):
+    # cli.py uses bare imports ("from db import Database"); make src importable for this import only
+    sys.path.insert(0, SRC_DIR)
+    try:
+        from cli import HabitTrackerCLI
+    finally:
+        sys.path.remove(SRC_DIR)
+
+    cli = HabitTrackerCLI.__new__(HabitTrackerCLI)  # skip __init__: reuse the benchmark database
+    cli.db = ctx.db
+    cli.manager = ctx.manager
+    cli.rollups = CompletionRollupStore(ctx.db)
+    cli.current_user_id = ctx.user_id
+    cli.current_username = ctx.username
+
+    target = os.path.join(ctx.work_dir, "export")
+    with mock.patch("builtins.input", return_value=target), redirect_stdout(StringIO()):
+        cli.export_data()
+
+
+def count_statements(ctx: BenchmarkContext, case) -> int:
+    """SQL statements issued by one call, measured outside the timed loop."""
+    ctx.db.enable_instrumentation(slow_query_ms=float('inf'))
+    try:
+        case(ctx)
+        return ctx.db.query_stats()['statements']
+    finally:
+        ctx.db.disable_instrumentation()
+
+
+def _cold(call):
+    """Time call with an empty streak cache, so repeats measure the computation and not a dict hit."""
+    def case(ctx: BenchmarkContext):
+        ctx.db.streak_cache.invalidate()
+        return call(ctx)
+    return case
+
+
+# name -> callable(ctx); each call is one timed operation
+CASES = {
+    'check_off_habit': lambda ctx: ctx.manager.check_off_habit(ctx.habit_id),
+    'list_habits': lambda ctx: ctx.manager.list_habits(),
+    'calculate_current_streak': lambda ctx: ctx.analytics.calculate_current_streak(ctx.habit_id),
+    'calculate_longest_streak': lambda ctx: ctx.analytics.calculate_longest_streak(ctx.habit_id),
+    'get_longest_streak_all': _cold(lambda ctx: ctx.analytics.get_longest_streak_all(ctx.user_id)),
+    'get_longest_streak_all_cached': lambda ctx: ctx.analytics.get_longest_streak_all(ctx.user_id),
+    'habit_report_all_users': lambda ctx: ctx.analytics.habit_report(),
+    'load_user_habits': lambda ctx: HabitRepository(ctx.db).load_user_habits(ctx.user_id),
+    'authenticate_user': lambda ctx: ctx.db.authenticate_user(ctx.username, DEFAULT_PASSWORD),
+    'export_data': _export_data,
+}
+
+
+def run_suite(size: str, repeat: int = 50, cases=None, data_dir: str = DEFAULT_DATA_DIR) -> dict:
+    """Run the selected cases against one dataset size."""
+    source = dataset_path(size, data_dir)
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        ctx = BenchmarkContext(source, work_dir)
+        try:
+            for name in cases or CASES:
+                results[name] = measure(lambda: CASES[name](ctx), repeat)
+                results[name]['statements'] = count_statements(ctx, CASES[name])
+        finally:
+            ctx.close()
+
+    conn = sqlite3.connect(source)
+    completions = conn.execute("SELECT COUNT(*) FROM Completions").fetchone()[0]
+    conn.close()
+
+    return {
+        'meta': {
+            'dataset': size,
+            'completions': completions,
+            'repeat': repeat,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+
+def compare_runs(baseline: dict, current: dict, threshold: float = 10.0) -> list:
+    """
+    Compare median timings case by case. A case regresses when it got more
+    than ``threshold`` percent slower than in the baseline.
+    """
+    rows = []
+    for name, new in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        change = (new['median_ms'] - old['median_ms']) / old['median_ms'] * 100 if old['median_ms'] else 0.0
+        rows.append({
+            'case': name,
+            'baseline_ms': old['median_ms'],
+            'current_ms': new['median_ms'],
+            'change_pct': round(change, 1),
+            'regression': change > threshold,
+        })
+    return rows
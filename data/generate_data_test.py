@@ -1,5 +1,6 @@
 from src.db import Database
 from src.habit_manager import HabitManager
+from src.maintenance import rebuild_derived_tables
 from datetime import datetime, timedelta
 import random
 
@@ -80,6 +81,9 @@ class TestDataGenerator:
             total_completions += completions
             print(f"✅ Habit ID {habit_id}: {completions} completions")
 
+        # Completions were written with raw SQL, so refresh the derived tables
+        rebuild_derived_tables(self.db, habit_ids)
+
         print(f"🎉 Generated {total_completions} total completions across {len(habit_ids)} habits!")
 
     def _generate_habit_completions(self, habit_id, start_date, end_date):
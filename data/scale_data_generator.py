@@ -0,0 +1,255 @@
+"""
+Generate benchmark-sized habit databases.
+
+Builds N users x M habits x Y years of completions with deterministic
+seeds, optionally split across several shard databases generated in
+parallel processes.
+
+Usage (from the project root):
+    python -m data.scale_data_generator --users 1000 --habits 10 --years 3 --out data/scale.db
+    python -m data.scale_data_generator --users 20000 --habits 10 --years 5 --shards 8 --out data/scale.db
+"""
+import argparse
+import hashlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from src.db import Database
+from src.maintenance import rebuild_derived_tables
+from src.periods import day_number, period_of_day
+
+
+HABIT_TEMPLATES = [
+    ("Drink eight glasses of water daily", "daily"),
+    ("Spend 30 minutes exercising daily", "daily"),
+    ("30 Minutes of meditation daily", "daily"),
+    ("Clean the house once weekly", "weekly"),
+    ("Call relatives once a week", "weekly"),
+    ("Read 20 pages", "daily"),
+    ("Journal before bed", "daily"),
+    ("Plan the week ahead", "weekly"),
+]
+
+DEFAULT_PASSWORD = "password123"
+BATCH_SIZE = 50000
+
+
+class ScaleDataGenerator:
+    """
+    Generates large, reproducible datasets into one SQLite file.
+
+    Every user gets its own random stream derived from (seed, user number),
+    so a user's data is identical whichever shard or process produces it.
+    """
+
+    def __init__(self, db_path: str, seed: int = 42, end_date: date = None):
+        self.db_path = db_path
+        self.seed = seed
+        self.end_date = end_date or date.today()
+        self.password_hash = hashlib.sha256(DEFAULT_PASSWORD.encode()).hexdigest()
+        self._days_for = None
+        self._days = []
+
+    def generate(self, user_numbers, habits_per_user: int, years: float) -> dict:
+        """
+        Generate the given users into this generator's database.
+        Returns row counts and timing.
+        """
+        started = time.perf_counter()
+        db = Database(self.db_path, profile='bulk-load')
+        # Both recreated by init_db(force=True) once the data is in
+        db.drop_indexes()
+        db.drop_triggers()
+
+        start_date = self.end_date - timedelta(days=int(365 * years))
+        users = habits = completions = 0
+        pending = []
+
+        try:
+            with db.transaction() as conn:
+                for user_number in user_numbers:
+                    rng = random.Random(f"{self.seed}:{user_number}")
+                    user_id = conn.execute(
+                        "INSERT INTO Users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+                        (f"user{user_number}", f"user{user_number}@example.com", self.password_hash,
+                         f"{start_date} 08:00:00")
+                    ).lastrowid
+                    users += 1
+
+                    for habit_number in range(habits_per_user):
+                        name, habit_type = HABIT_TEMPLATES[habit_number % len(HABIT_TEMPLATES)]
+                        if habit_number >= len(HABIT_TEMPLATES):
+                            name = f"{name} #{habit_number // len(HABIT_TEMPLATES) + 1}"
+                        habit_id = conn.execute(
+                            "INSERT INTO Habits (user_id, name, type, created_at) VALUES (?, ?, ?, ?)",
+                            (user_id, name, habit_type, f"{start_date} 08:00:00")
+                        ).lastrowid
+                        habits += 1
+
+                        for completion in self._completion_times(rng, habit_type, start_date):
+                            pending.append((habit_id,) + completion)
+
+                        if len(pending) >= BATCH_SIZE:
+                            completions += self._flush(conn, pending)
+
+                completions += self._flush(conn, pending)
+
+            db.init_db(force=True)
+            rebuild_derived_tables(db)
+        finally:
+            db.close()
+
+        elapsed = time.perf_counter() - started
+        return {
+            'db_path': self.db_path,
+            'users': users,
+            'habits': habits,
+            'completions': completions,
+            'seconds': round(elapsed, 2),
+            'rows_per_second': round(completions / elapsed) if elapsed else 0,
+        }
+
+    def _flush(self, conn, pending: list) -> int:
+        count = len(pending)
+        conn.executemany(
+            "INSERT INTO Completions (habit_id, timestamp, ts_epoch, day_number, iso_week_key) "
+            "VALUES (?, ?, ?, ?, ?)",
+            pending
+        )
+        pending.clear()
+        return count
+
+    def _completion_times(self, rng: random.Random, habit_type: str, start_date: date):
+        """
+        Yield (timestamp, ts_epoch, day_number, iso_week_key) for each
+        completion of one habit.
+
+        Adherence follows a two-state (on track / lapsed) Markov chain so
+        misses cluster into realistic streak breaks. Weekends are weaker for
+        daily habits, and each year has a couple of vacations with no activity.
+        """
+        adherence = rng.uniform(0.55, 0.97)  # how reliable this habit is overall
+        relapse = rng.uniform(0.005, 0.04)   # chance per period of falling off the wagon
+        recovery = rng.uniform(0.15, 0.5)    # chance per period of picking it back up
+        preferred_hour = rng.randint(6, 21)
+
+        days = self._day_strings(start_date)
+        total_days = len(days) - 1
+        vacations = set()
+        for _ in range(max(1, total_days // 365) * 2):
+            first = rng.randrange(max(total_days, 1))
+            vacations.update(range(first, first + rng.randint(4, 14)))
+
+        random_ = rng.random  # hot loop: avoid randint() overhead
+        on_track = True
+        step = 1 if habit_type == 'daily' else 7
+        for offset in range(0, total_days + 1, step):
+            if on_track:
+                on_track = random_() >= relapse
+            else:
+                on_track = random_() < recovery
+
+            if habit_type == 'weekly':
+                offset = min(offset + int(random_() * 7), total_days)
+            if offset in vacations:
+                continue
+
+            day, day_no, is_weekend = days[offset]
+            chance = adherence if on_track else adherence * 0.15
+            if is_weekend and habit_type == 'daily':
+                chance *= 0.8
+            if random_() >= chance:
+                continue
+
+            hour = min(23, max(0, int(rng.gauss(preferred_hour, 1.5))))
+            minute, second = int(random_() * 60), int(random_() * 60)
+            yield (f"{day} {hour:02d}:{minute:02d}:{second:02d}",
+                   day_no * 86400 + hour * 3600 + minute * 60 + second,
+                   day_no, period_of_day(day_no, 'weekly'))
+
+    def _day_strings(self, start_date: date) -> list:
+        """(YYYY-MM-DD, day_number, is_weekend) for every day of the history, cached per start date."""
+        if self._days_for != start_date:
+            self._days_for = start_date
+            self._days = []
+            day = start_date
+            while day <= self.end_date:
+                self._days.append((day.isoformat(), day_number(day), day.weekday() >= 5))
+                day += timedelta(days=1)
+        return self._days
+
+
+def shard_path(out: str, shard: int, shards: int) -> str:
+    """data/scale.db -> data/scale_shard3.db when sharding."""
+    if shards == 1:
+        return out
+    root, ext = os.path.splitext(out)
+    return f"{root}_shard{shard}{ext or '.db'}"
+
+
+def generate_shard(job: dict) -> dict:
+    """Process-pool entry point: generate one shard from a plain-dict job."""
+    generator = ScaleDataGenerator(job['db_path'], seed=job['seed'], end_date=job['end_date'])
+    return generator.generate(job['user_numbers'], job['habits'], job['years'])
+
+
+def generate_dataset(out: str, users: int, habits: int, years: float, seed: int = 42,
+                     shards: int = 1, workers: int = None, end_date: date = None) -> list:
+    """
+    Generate users round-robin across ``shards`` databases, one process per
+    shard (at most ``workers`` at a time). Existing output files are replaced.
+    """
+    end_date = end_date or date.today()
+    jobs = []
+    for shard in range(shards):
+        path = shard_path(out, shard, shards)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        jobs.append({
+            'db_path': path,
+            'user_numbers': list(range(shard + 1, users + 1, shards)),
+            'habits': habits,
+            'years': years,
+            'seed': seed,
+            'end_date': end_date,
+        })
+
+    if shards == 1:
+        return [generate_shard(jobs[0])]
+
+    with ProcessPoolExecutor(max_workers=workers or min(shards, os.cpu_count() or 1)) as pool:
+        return list(pool.map(generate_shard, jobs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a benchmark-sized habit database")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--habits", type=int, default=5, help="habits per user")
+    parser.add_argument("--years", type=float, default=1.0, help="years of history per habit")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--shards", type=int, default=1, help="number of separate database files")
+    parser.add_argument("--workers", type=int, default=None, help="parallel processes (default: one per shard)")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None,
+                        help="last day of generated history, YYYY-MM-DD (default: today)")
+    parser.add_argument("--out", default="scale.db", help="output database (shards get a _shardN suffix)")
+    args = parser.parse_args()
+
+    print("=== HABIT TRACKER SCALE DATA GENERATOR ===")
+    started = time.perf_counter()
+    results = generate_dataset(args.out, args.users, args.habits, args.years, seed=args.seed,
+                               shards=args.shards, workers=args.workers, end_date=args.end_date)
+    elapsed = time.perf_counter() - started
+
+    for result in results:
+        print(f"✅ {result['db_path']}: {result['users']} users, {result['habits']} habits, "
+              f"{result['completions']} completions in {result['seconds']}s")
+    total = sum(r['completions'] for r in results)
+    print(f"🎉 {total} completions in {elapsed:.1f}s ({total / elapsed:.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,196 +1,225 @@
-from datetime import datetime, timedelta
-from typing import List, Tuple, Optional
+from datetime import date, datetime, timezone
+from itertools import groupby
+from typing import Dict, List, Tuple, Optional
+from src.bitmap import CompletionBitmap, CompletionBitmapStore, read_bitmap
 from src.db import Database
+from src.habit import HABIT_CLASSES
+from src.periods import DAY_NUMBER_SQL, parse_timestamp, period_number, period_of_day, utc_today
+from src.streak_state import StreakStateStore, current_streak_as_of, state_from_periods
+from src.vectorized import habit_statistics, resolve_backend
 
 
 class AdvancedAnalytics:
     """
     Advanced analytics with functional programming principles.
     Implements real streak calculation algorithms.
+
+    backend selects how habit_report() crunches many habits at once:
+    'numpy', 'python', or None for numpy when it is installed.
     """
 
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, backend: Optional[str] = None):
         self.db = db
+        self.backend = resolve_backend(backend)
+        self.streak_state = StreakStateStore(db)
+        self.bitmaps = CompletionBitmapStore(db)
 
     def get_habits_by_periodicity(self, user_id: int, periodicity: str) -> List[Tuple]:
         """
         Pure function: Filter habits by periodicity.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT habit_id, name, type, created_at FROM Habits WHERE user_id = ? AND type = ? AND is_active = TRUE",
-            (user_id, periodicity)
-        )
-        habits = cursor.fetchall()
-        conn.close()
+        with self.db.connection() as conn:
+            habits = conn.execute(
+                "SELECT habit_id, name, type, created_at FROM Habits WHERE user_id = ? AND type = ? AND is_active = TRUE",
+                (user_id, periodicity)
+            ).fetchall()
         return habits
 
     def get_completions_for_habit(self, habit_id: int) -> List[datetime]:
         """
         Pure function: Get all completions for a habit, sorted by date.
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT timestamp FROM Completions WHERE habit_id = ? ORDER BY timestamp",
-            (habit_id,)
-        )
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                "SELECT timestamp FROM Completions WHERE habit_id = ? ORDER BY timestamp",
+                (habit_id,)
+            ).fetchall()
+
         completions = []
-        for row in cursor.fetchall():
-            if row[0]:  # Only process if timestamp is not None
-                timestamp_str = str(row[0])
-                try:
-                    # Handle different timestamp formats
-                    if 'Z' in timestamp_str:
-                        dt = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                    else:
-                        dt = datetime.fromisoformat(timestamp_str)
-                    completions.append(dt)
-                except ValueError as e:
-                    print(f"Warning: Could not parse timestamp '{timestamp_str}': {e}")
-                    continue
-        conn.close()
+        for row in rows:
+            dt = parse_timestamp(row[0])
+            if dt is not None:
+                completions.append(dt)
         return completions
 
-    def calculate_current_streak(self, habit_id: int) -> int:
+    def compute_streaks(self, user_id: int) -> Dict[int, dict]:
         """
-        Calculate current streak using FP principles.
+        Current and longest streak for every active habit of a user.
+        Fetches all habits with a single ordered join instead of two queries
+        per habit: habits with a HabitStreakState row are answered from it,
+        only habits without one read their rollup periods. Memoized per day
+        until one of the user's habits changes (in any process).
         """
-        completions = self.get_completions_for_habit(habit_id)
-        if not completions:
-            return 0
+        today = utc_today()
+        streaks = self.db.streak_cache.get_or_compute(
+            'streaks', ('user', user_id), today, lambda: self._compute_streaks(user_id, today),
+            self.db.data_version(user_id)
+        )
+        # Callers get their own copy to modify
+        return {habit_id: dict(streak) for habit_id, streak in streaks.items()}
+
+    def _compute_streaks(self, user_id: int, today) -> Dict[int, dict]:
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT h.habit_id, h.name, h.type,
+                       s.current_streak, s.longest_streak, s.last_period, r.period_key
+                FROM Habits h
+                LEFT JOIN HabitStreakState s ON s.habit_id = h.habit_id
+                LEFT JOIN CompletionRollup r ON r.habit_id = h.habit_id AND s.habit_id IS NULL
+                WHERE h.user_id = ? AND h.is_active = TRUE
+                ORDER BY h.habit_id, r.period_key
+                """,
+                (user_id,)
+            ).fetchall()
+
+        streaks = {}
+        for (habit_id, name, habit_type), group in groupby(rows, key=lambda row: row[:3]):
+            group = list(group)
+            current_streak, longest_streak, last_period = group[0][3:6]
+            if current_streak is not None:
+                state = {'current_streak': current_streak, 'last_period': last_period}
+            else:
+                state = state_from_periods([row[6] for row in group if row[6] is not None], 0)
+                longest_streak = state['longest_streak']
 
-        habit_type = self.get_habit_type(habit_id)
-        today = datetime.now().date()
+            streaks[habit_id] = {
+                'name': name,
+                'type': habit_type,
+                'current_streak': current_streak_as_of(state, habit_type, today),
+                'longest_streak': longest_streak,
+            }
+        return streaks
 
-        if habit_type == 'daily':
-            return self._calculate_daily_streak(completions, today)
-        else:
-            return self._calculate_weekly_streak(completions, today)
+    def calculate_current_streak(self, habit_id: int) -> int:
+        """
+        Calculate current streak using FP principles.
+        Reads the maintained streak state when present (O(1)).
+        """
+        today = utc_today()
+        state = self.streak_state.get_state(habit_id)
+        if state is None:
+            period = period_number(today, self.get_habit_type(habit_id))
+            return self.bitmaps.get(habit_id).run_ending_at(period)
+        return current_streak_as_of(state, state['type'], today)
 
     def calculate_longest_streak(self, habit_id: int) -> int:
         """
         Calculate longest streak using FP principles.
+        Reads the maintained streak state when present (O(1)).
         """
-        completions = self.get_completions_for_habit(habit_id)
-        if not completions:
-            return 0
-
-        habit_type = self.get_habit_type(habit_id)
-
-        if habit_type == 'daily':
-            return self._calculate_longest_daily_streak(completions)
-        else:
-            return self._calculate_longest_weekly_streak(completions)
-
-    def _calculate_daily_streak(self, completions: List[datetime], today: datetime.date) -> int:
-        """Calculate current streak for daily habits."""
-        streak = 0
-        current_date = today
-
-        completion_dates = {comp.date() for comp in completions}
-
-        while current_date in completion_dates:
-            streak += 1
-            current_date -= timedelta(days=1)
-
-        return streak
-
-    def _calculate_weekly_streak(self, completions: List[datetime], today: datetime.date) -> int:
-        """Calculate current streak for weekly habits."""
-        streak = 0
-        current_date = today
-        current_week = current_date.isocalendar()[1]
-        current_year = current_date.year
-
-        completion_weeks = set()
-        for comp in completions:
-            comp_week = comp.isocalendar()[1]
-            comp_year = comp.year
-            completion_weeks.add((comp_year, comp_week))
-
-        while (current_year, current_week) in completion_weeks:
-            streak += 1
-            current_date -= timedelta(weeks=1)
-            current_week = current_date.isocalendar()[1]
-            current_year = current_date.year
-
-        return streak
+        state = self.streak_state.get_state(habit_id)
+        if state is not None:
+            return state['longest_streak']
+        return self.bitmaps.get(habit_id).longest_run()
 
-    def _calculate_longest_daily_streak(self, completions: List[datetime]) -> int:
-        """Calculate longest streak for daily habits."""
-        if not completions:
-            return 0
-
-        dates = sorted(list({comp.date() for comp in completions}))
-
-        longest_streak = 1
-        current_streak = 1
-
-        for i in range(1, len(dates)):
-            if (dates[i] - dates[i - 1]).days == 1:
-                current_streak += 1
-                longest_streak = max(longest_streak, current_streak)
-            else:
-                current_streak = 1
-
-        return longest_streak
-
-    def _calculate_longest_weekly_streak(self, completions: List[datetime]) -> int:
-        """Calculate longest streak for weekly habits."""
-        if not completions:
-            return 0
-
-        weeks = sorted(list({(comp.year, comp.isocalendar()[1]) for comp in completions}))
-
-        longest_streak = 1
-        current_streak = 1
-
-        for i in range(1, len(weeks)):
-            current_year, current_week = weeks[i]
-            prev_year, prev_week = weeks[i - 1]
-
-            if (current_year == prev_year and current_week == prev_week + 1) or \
-                    (current_year == prev_year + 1 and current_week == 1 and prev_week == 52):
-                current_streak += 1
-                longest_streak = max(longest_streak, current_streak)
-            else:
-                current_streak = 1
-
-        return longest_streak
+    def success_rate(self, habit_id: int, habit_type: str, created_at: str, today: Optional[date] = None) -> float:
+        """
+        Percentage of the habit's due dates since creation (its schedule,
+        see BaseHabit.due_count) whose day or week has a completion.
+        created_at and completion days are UTC, so today is the UTC date.
+        """
+        created = parse_timestamp(created_at)
+        if created.tzinfo is not None:
+            created = created.astimezone(timezone.utc).replace(tzinfo=None)
+        start, today = created.date(), today or utc_today()
+
+        due = HABIT_CLASSES[habit_type](None, created).due_count(start, today)
+        if due == 0:
+            return 0.0
+        completed = self.bitmaps.get(habit_id).count(
+            period_number(start, habit_type), period_number(today, habit_type))
+        # A weekly habit's current week can be completed before its due date comes round
+        return round(min(completed, due) * 100 / due, 1)
+
+    def habit_report(self, user_id: Optional[int] = None, window: int = 30) -> Dict[int, dict]:
+        """
+        Streaks, completion totals, success rate since creation and the
+        completion rate over the last ``window`` days (weeks for weekly
+        habits) for every active habit of a user, or of all users for
+        nightly reports (see report_habits()).
+        """
+        users = None if user_id is None else (user_id, user_id)
+        with self.db.connection() as conn:
+            return report_habits(conn, utc_today(), window, self.backend, users)
 
     def get_habit_type(self, habit_id: int) -> str:
         """Get the type of a habit."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT type FROM Habits WHERE habit_id = ?", (habit_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else 'daily'
+        habit = self.db.habit_cache.get(habit_id)
+        return habit['type'] if habit else 'daily'
 
     def get_longest_streak_all(self, user_id: int) -> Tuple[Optional[str], int]:
         """
         Get the habit with the longest streak across all habits.
         """
-        daily_habits = self.get_habits_by_periodicity(user_id, 'daily')
-        weekly_habits = self.get_habits_by_periodicity(user_id, 'weekly')
-        all_habits = daily_habits + weekly_habits
+        streaks = self.compute_streaks(user_id).values()
+        # Daily habits are considered before weekly ones, so ties keep going to the daily habit
+        ordered = [s for s in streaks if s['type'] == 'daily'] + [s for s in streaks if s['type'] == 'weekly']
 
         longest_habit_name = None
         longest_streak = 0
 
-        for habit in all_habits:
-            habit_id, name, habit_type, created_at = habit
-            streak = self.calculate_longest_streak(habit_id)
-
-            if streak > longest_streak:
-                longest_streak = streak
-                longest_habit_name = name
+        for habit in ordered:
+            if habit['longest_streak'] > longest_streak:
+                longest_streak = habit['longest_streak']
+                longest_habit_name = habit['name']
 
         return longest_habit_name, longest_streak
 
 
+def report_habits(conn, today: date, window: int = 30, backend: Optional[str] = None,
+                  users: Optional[Tuple[int, int]] = None) -> Dict[int, dict]:
+    """
+    habit_report() on a plain connection (e.g. a read-only worker's), for
+    the active habits of all users or of the user_id range users
+    (inclusive). Reads one stored bitmap per habit and hands the batch to
+    the selected backend.
+    """
+    where, params = "h.is_active = TRUE", ()
+    if users is not None:
+        where, params = "h.is_active = TRUE AND h.user_id BETWEEN ? AND ?", tuple(users)
+
+    rows = conn.execute(
+        f"""
+        SELECT h.habit_id, h.user_id, h.name, h.type, {DAY_NUMBER_SQL.format(column='h.created_at')},
+               b.origin, b.bits,
+               COALESCE(s.total_completions, (
+                   SELECT SUM(completion_count) FROM CompletionRollup WHERE habit_id = h.habit_id
+               ), 0)
+        FROM Habits h
+        LEFT JOIN CompletionBitmap b ON b.habit_id = h.habit_id
+        LEFT JOIN HabitStreakState s ON s.habit_id = h.habit_id
+        WHERE {where}
+        ORDER BY h.habit_id
+        """,
+        params
+    ).fetchall()
+
+    histories = []
+    for habit_id, _, _, habit_type, created_day, origin, bits, completions in rows:
+        current = period_number(today, habit_type)
+        start = period_of_day(created_day, habit_type) if created_day is not None else current
+        # Bitmaps not built yet (raw SQL writes) come from the rollups
+        bitmap = CompletionBitmap(origin, bits) if bits is not None else read_bitmap(conn, habit_id)
+        histories.append((habit_id, start, current, completions, bitmap))
+
+    statistics = habit_statistics(histories, window, backend)
+    return {
+        habit_id: {'user_id': owner_id, 'name': name, 'type': habit_type, **statistics[habit_id]}
+        for habit_id, owner_id, name, habit_type, *_ in rows
+    }
+
+
 # Functional programming style wrapper functions
 def calculate_longest_streak(analytics: AdvancedAnalytics, habit_id: int) -> int:
     """FP-style wrapper for longest streak calculation."""
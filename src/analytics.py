@@ -1,6 +1,7 @@
 from typing import List, Tuple, Optional
-from datetime import datetime, timedelta
 from db import Database
+from bitmap import CompletionBitmapStore
+from periods import period_number, utc_today
 
 
 class AnalyticsEngine:
@@ -10,99 +11,32 @@ class AnalyticsEngine:
 
     def __init__(self, db: Database):
         self.db = db
+        self.bitmaps = CompletionBitmapStore(db)
 
     def get_habits_by_periodicity(self, user_id: int, periodicity: str) -> List[Tuple]:
         """
         Get habits filtered by periodicity (daily/weekly).
         """
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT habit_id, name, type, created_at FROM Habits WHERE user_id = ? AND type = ? AND is_active = TRUE",
-            (user_id, periodicity)
-        )
-        habits = cursor.fetchall()
-        conn.close()
+        with self.db.connection() as conn:
+            habits = conn.execute(
+                "SELECT habit_id, name, type, created_at FROM Habits WHERE user_id = ? AND type = ? AND is_active = TRUE",
+                (user_id, periodicity)
+            ).fetchall()
         return habits
 
     def calculate_current_streak(self, habit_id: int) -> int:
         """
-        Calculate the current streak for a habit.
+        Calculate the current streak for a habit: the run of completed days
+        (or weeks) reaching today.
         """
-        completions = self._get_completions_sorted(habit_id)
-        if not completions:
-            return 0
-
-        streak = 0
-        today = datetime.now().date()
-        current_date = today
-
-        # For daily habits
-        if self._get_habit_type(habit_id) == 'daily':
-            while current_date >= completions[0].date():
-                if any(comp.date() == current_date for comp in completions):
-                    streak += 1
-                    current_date -= timedelta(days=1)
-                else:
-                    break
-
-        # For weekly habits
-        else:
-            current_week = current_date.isocalendar()[1]
-            current_year = current_date.year
-
-            while True:
-                week_completions = [comp for comp in completions
-                                    if comp.isocalendar()[1] == current_week
-                                    and comp.year == current_year]
-
-                if week_completions:
-                    streak += 1
-                    current_date -= timedelta(weeks=1)
-                    current_week = current_date.isocalendar()[1]
-                    current_year = current_date.year
-                else:
-                    break
-
-        return streak
+        today = period_number(utc_today(), self._get_habit_type(habit_id))
+        return self.bitmaps.get(habit_id).run_ending_at(today)
 
     def calculate_longest_streak(self, habit_id: int) -> int:
         """
         Calculate the longest streak for a habit.
         """
-        completions = self._get_completions_sorted(habit_id)
-        if not completions:
-            return 0
-
-        longest_streak = 0
-        current_streak = 1
-
-        # For daily habits
-        if self._get_habit_type(habit_id) == 'daily':
-            for i in range(1, len(completions)):
-                if (completions[i].date() - completions[i - 1].date()).days == 1:
-                    current_streak += 1
-                else:
-                    longest_streak = max(longest_streak, current_streak)
-                    current_streak = 1
-
-            longest_streak = max(longest_streak, current_streak)
-
-        # For weekly habits
-        else:
-            for i in range(1, len(completions)):
-                current_week = completions[i].isocalendar()[1]
-                prev_week = completions[i - 1].isocalendar()[1]
-
-                if current_week == prev_week + 1 or (current_week == 1 and prev_week == 52):
-                    current_streak += 1
-                else:
-                    longest_streak = max(longest_streak, current_streak)
-                    current_streak = 1
-
-            longest_streak = max(longest_streak, current_streak)
-
-        return longest_streak
+        return self.bitmaps.get(habit_id).longest_run()
 
     def get_longest_streak_all(self, user_id: int) -> Tuple[Optional[str], int]:
         """
@@ -123,26 +57,10 @@ class AnalyticsEngine:
 
         return longest_habit, longest_streak
 
-    def _get_completions_sorted(self, habit_id: int) -> List[datetime]:
-        """Get completions for a habit, sorted by date."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT timestamp FROM Completions WHERE habit_id = ? ORDER BY timestamp",
-            (habit_id,)
-        )
-        completions = [datetime.fromisoformat(row[0]) for row in cursor.fetchall()]
-        conn.close()
-        return completions
-
     def _get_habit_type(self, habit_id: int) -> str:
         """Get the type of a habit (daily/weekly)."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT type FROM Habits WHERE habit_id = ?", (habit_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else 'daily'
+        habit = self.db.habit_cache.get(habit_id)
+        return habit['type'] if habit else 'daily'
 
 
 # Functional programming style functions (as in original design)
@@ -0,0 +1,294 @@
+"""
+Local HTTP/JSON API over HabitManager and AdvancedAnalytics (stdlib only).
+
+One threaded HTTP/1.1 server with keep-alive connections. Request threads
+share the Database connection pool for reads; check-offs and other writes
+go through one WriteQueue, so a burst from many clients is committed in a
+few transactions. Every response carries its handling time in a
+``Server-Timing`` header.
+
+    POST   /register                {"username", "email", "password"}
+    POST   /login                   {"username", "password"} -> {"token"}
+    POST   /logout                  (this and the rest need "Authorization: Bearer <token>")
+    GET    /habits
+    POST   /habits                  {"name", "type": "daily"|"weekly"}
+    DELETE /habits/<id>
+    POST   /habits/<id>/checkoff    {"notes"?, "mood_score"?}
+    GET    /streaks
+    GET    /report?window=30
+    GET    /stats                   server and write queue counters
+
+Usage: python -m src.api_server [--db habits.db] [--host 127.0.0.1] [--port 8000]
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from src.advanced_analytics import AdvancedAnalytics
+from src.db import Database
+from src.habit_manager import HabitManager
+from src.write_queue import WriteQueue
+
+# Bodies are small JSON objects; anything bigger is a client error
+MAX_BODY_BYTES = 64 * 1024
+
+
+class APIError(Exception):
+    """An error response: HTTP status plus message."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class HabitAPIServer(ThreadingHTTPServer):
+    """
+    The API server: owns the Database (pool_size connections shared by
+    every request thread) and the WriteQueue. Call server_close() to
+    commit queued writes and close the database.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128  # bursts of new keep-alive clients
+
+    def __init__(self, address, db_path: str = "habits.db", pool_size: int = 8,
+                 window: float = 0.0, quiet: bool = True, **db_options):
+        self.db = Database(db_path, pool_size=pool_size, **db_options)
+        self.writes = WriteQueue(self.db, window=window)
+        self.analytics = AdvancedAnalytics(self.db)
+        self.quiet = quiet
+        self.requests = 0
+        self._stats_lock = threading.Lock()
+        super().__init__(address, HabitAPIHandler)
+
+    def count_request(self):
+        with self._stats_lock:
+            self.requests += 1
+
+    def server_close(self):
+        super().server_close()
+        self.writes.close()
+        self.db.close()
+
+
+class HabitAPIHandler(BaseHTTPRequestHandler):
+    """Routes one request to HabitManager/AdvancedAnalytics and writes a JSON response."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive by default
+    # Headers and body are separate writes; without TCP_NODELAY the body waits for a delayed ACK
+    disable_nagle_algorithm = True
+    server: HabitAPIServer
+
+    ROUTES = [
+        ('POST', re.compile(r'/register'), 'register', False),
+        ('POST', re.compile(r'/login'), 'login', False),
+        ('POST', re.compile(r'/logout'), 'logout', True),
+        ('GET', re.compile(r'/stats'), 'stats', False),
+        ('GET', re.compile(r'/habits'), 'list_habits', True),
+        ('POST', re.compile(r'/habits'), 'add_habit', True),
+        ('DELETE', re.compile(r'/habits/(\d+)'), 'delete_habit', True),
+        ('POST', re.compile(r'/habits/(\d+)/checkoff'), 'check_off', True),
+        ('GET', re.compile(r'/streaks'), 'streaks', True),
+        ('GET', re.compile(r'/report'), 'report', True),
+    ]
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method: str):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        try:
+            body = self._read_body()
+            for route_method, pattern, name, needs_user in self.ROUTES:
+                match = pattern.fullmatch(url.path)
+                if match is None or route_method != method:
+                    continue
+                args = [int(arg) for arg in match.groups()]
+                if needs_user:
+                    args.insert(0, self._user_id())
+                status, payload = getattr(self, f"handle_{name}")(*args, body=body, query=parse_qs(url.query))
+                break
+            else:
+                raise APIError(404, f"No route for {method} {url.path}")
+        except APIError as e:
+            status, payload = e.status, {'error': str(e)}
+        except ValueError as e:
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        self._send(status, payload, started)
+
+    def _read_body(self) -> dict:
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True  # no telling where the body ends
+            raise APIError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True  # the rest of the body is never read
+            raise APIError(413, "Request body too large")
+        if not length:
+            return {}
+        # Always consume the body, even for errors, so the next request on the connection parses
+        raw = self.rfile.read(length)
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            raise APIError(400, "Request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise APIError(400, "Request body must be a JSON object")
+        return body
+
+    def _token(self) -> str:
+        scheme, _, token = (self.headers.get('Authorization') or '').partition(' ')
+        return token if scheme == 'Bearer' else None
+
+    def _user_id(self) -> int:
+        # A cached session lookup; no password hash or query per request
+        user_id = self.server.db.sessions.validate(self._token())
+        if user_id is None:
+            raise APIError(401, "Missing or invalid token")
+        return user_id
+
+    def _send(self, status: int, payload, started: float):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Server-Timing', f"app;dur={(time.perf_counter() - started) * 1000:.3f}")
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.count_request()
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _manager(self, user_id: int) -> HabitManager:
+        manager = HabitManager(self.server.db)
+        manager.set_current_user(user_id)
+        return manager
+
+    @staticmethod
+    def _require(body: dict, *fields: str) -> list:
+        missing = [field for field in fields if not body.get(field)]
+        if missing:
+            raise APIError(400, f"Missing field(s): {', '.join(missing)}")
+        return [body[field] for field in fields]
+
+    # Handlers return (status, JSON payload)
+
+    def handle_register(self, body, query):
+        username, email, password = self._require(body, 'username', 'email', 'password')
+        if not self.server.writes.submit(self.server.db.register_user, username, email, password).result():
+            raise APIError(409, "Username or email already exists")
+        return 201, {'username': username}
+
+    def handle_login(self, body, query):
+        username, password = self._require(body, 'username', 'password')
+        token = self.server.writes.submit(self.server.db.sessions.login, username, password).result()
+        if token is None:
+            raise APIError(401, "Invalid username or password")
+        return 200, {'token': token}
+
+    def handle_logout(self, user_id, body, query):
+        self.server.writes.submit(self.server.db.sessions.revoke, self._token()).result()
+        return 200, {'logged_out': True}
+
+    def handle_stats(self, body, query):
+        return 200, {'requests': self.server.requests, 'write_queue': self.server.writes.stats(),
+                     'sessions': self.server.db.sessions.stats()}
+
+    def handle_list_habits(self, user_id, body, query):
+        habits = self._manager(user_id).list_habits()
+        return 200, [
+            {'habit_id': habit_id, 'name': name, 'type': habit_type, 'created_at': created_at}
+            for habit_id, name, habit_type, created_at in habits
+        ]
+
+    def handle_add_habit(self, user_id, body, query):
+        name, habit_type = self._require(body, 'name', 'type')
+        if habit_type not in ('daily', 'weekly'):
+            raise APIError(400, "type must be 'daily' or 'weekly'")
+        self.server.writes.add_habit(user_id, name, habit_type).result()
+        return 201, {'name': name, 'type': habit_type}
+
+    def handle_delete_habit(self, user_id, habit_id, body, query):
+        self._owned(self.server.writes.delete_habit(user_id, habit_id))
+        return 200, {'habit_id': habit_id, 'deleted': True}
+
+    def handle_check_off(self, user_id, habit_id, body, query):
+        mood_score = body.get('mood_score')
+        if mood_score is not None and not (isinstance(mood_score, int) and 1 <= mood_score <= 10):
+            raise APIError(400, "mood_score must be an integer from 1 to 10")
+        self._owned(self.server.writes.check_off(user_id, habit_id, body.get('notes'), mood_score))
+        return 201, {'habit_id': habit_id, 'checked_off': True}
+
+    @staticmethod
+    def _owned(future):
+        """Wait for a queued write on one habit; ownership failures become 404."""
+        try:
+            return future.result()
+        except ValueError as e:
+            raise APIError(404, str(e))
+
+    def handle_streaks(self, user_id, body, query):
+        streaks = self.server.analytics.compute_streaks(user_id)
+        return 200, [{'habit_id': habit_id, **streak} for habit_id, streak in streaks.items()]
+
+    def handle_report(self, user_id, body, query):
+        window = _int_param(query, 'window', 30)
+        if window < 1:
+            raise APIError(400, "window must be at least 1")
+        report = self.server.analytics.habit_report(user_id, window)
+        return 200, [{'habit_id': habit_id, **stats} for habit_id, stats in report.items()]
+
+
+def _int_param(query: dict, name: str, default: int) -> int:
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        return int(values[0])
+    except ValueError:
+        raise APIError(400, f"{name} must be an integer")
+
+
+def serve(db_path: str = "habits.db", host: str = "127.0.0.1", port: int = 8000,
+          pool_size: int = 8, quiet: bool = False):
+    """Run the API server until interrupted."""
+    server = HabitAPIServer((host, port), db_path, pool_size=pool_size, quiet=quiet)
+    print(f"✅ Habit API listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Habit tracker HTTP/JSON API")
+    parser.add_argument("--db", default="habits.db", help="path to the SQLite database")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--pool-size", type=int, default=8, help="database connections shared by request threads")
+    parser.add_argument("--quiet", action="store_true", help="no per-request log lines")
+    args = parser.parse_args()
+    serve(args.db, args.host, args.port, args.pool_size, args.quiet)
+
+
+if __name__ == "__main__":
+    main()
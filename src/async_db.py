@@ -0,0 +1,135 @@
+"""
+Asyncio facade over Database, HabitManager and AdvancedAnalytics.
+
+All SQLite work runs off the event loop: reads on a bounded pool of
+reader threads, writes on the single writer thread of a WriteQueue. Writes
+that arrive together (a burst of check-offs from many requests) are
+committed as one transaction, so a burst costs one commit instead of one
+each.
+
+    async with AsyncDatabase("habits.db") as adb:
+        user_id = await adb.authenticate_user("alice", "secret")
+        habits = AsyncHabitManager(adb, user_id)
+        await habits.check_off_habit(3, mood_score=7)
+        streaks = await AsyncAnalytics(adb).compute_streaks(user_id)
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.advanced_analytics import AdvancedAnalytics
+from src.db import Database
+from src.habit_manager import HabitManager
+from src.write_queue import WriteQueue
+
+
+class AsyncDatabase:
+    """
+    Owns a Database plus its reader executor and WriteQueue. Use one
+    instance per event loop, and close it (or use ``async with``) when done.
+    ``window`` is the WriteQueue's group-commit window in seconds.
+    """
+
+    def __init__(self, db_path: str = "habits.db", readers: int = 4, window: float = 0.0, **db_options):
+        self.readers = max(1, readers)
+        # One pooled connection per reader thread plus the writer's
+        self.db = Database(db_path, pool_size=self.readers + 1, **db_options)
+        self._read_executor = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix="habits-read")
+        self.writes = WriteQueue(self.db, window=window)
+
+    @property
+    def batches(self) -> int:
+        """Write transactions committed so far, for monitoring."""
+        return self.writes.batches
+
+    async def read(self, func, *args, **kwargs):
+        """Run a blocking read on a reader thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._read_executor, partial(func, *args, **kwargs))
+
+    async def write(self, func, *args, **kwargs):
+        """Run a blocking write on the writer thread, batched with concurrent writes."""
+        return await asyncio.wrap_future(self.writes.submit(func, *args, **kwargs))
+
+    async def register_user(self, username: str, email: str, password: str) -> bool:
+        return await self.write(self.db.register_user, username, email, password)
+
+    async def authenticate_user(self, username: str, password: str) -> Optional[int]:
+        return await self.read(self.db.authenticate_user, username, password)
+
+    async def check_off(self, user_id: int, habit_id: int, notes: str = None, mood_score: int = None):
+        """
+        Record a completion for user_id in the next batched transaction.
+        Raises ValueError if the habit is not the user's.
+        """
+        await asyncio.wrap_future(self.writes.check_off(user_id, habit_id, notes, mood_score))
+
+    async def close(self):
+        """Commit queued writes, then stop the threads and close the database."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.writes.close)
+        self._read_executor.shutdown(wait=True)
+        self.db.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class AsyncHabitManager:
+    """HabitManager operations for one user, as coroutines."""
+
+    def __init__(self, adb: AsyncDatabase, user_id: int):
+        if not user_id:
+            raise ValueError("No user logged in")
+        self.adb = adb
+        self.current_user_id = user_id
+
+    def _manager(self) -> HabitManager:
+        manager = HabitManager(self.adb.db)
+        manager.set_current_user(self.current_user_id)
+        return manager
+
+    async def add_habit(self, name: str, habit_type: str):
+        return await self.adb.write(lambda: self._manager().add_habit(name, habit_type))
+
+    async def check_off_habit(self, habit_id: int, notes: str = None, mood_score: int = None):
+        """Record a completion; batched with concurrent check-offs into one commit."""
+        await self.adb.check_off(self.current_user_id, habit_id, notes, mood_score)
+
+    async def check_off_many(self, records: Iterable) -> List[dict]:
+        records = list(records)
+        return await self.adb.write(lambda: self._manager().check_off_many(records))
+
+    async def deactivate_habit(self, habit_id: int):
+        return await self.adb.write(lambda: self._manager().deactivate_habit(habit_id))
+
+    async def delete_habit(self, habit_id: int):
+        return await self.adb.write(lambda: self._manager().delete_habit(habit_id))
+
+    async def list_habits(self):
+        return await self.adb.read(lambda: self._manager().list_habits())
+
+
+class AsyncAnalytics:
+    """AdvancedAnalytics queries as coroutines, run on the reader threads."""
+
+    def __init__(self, adb: AsyncDatabase, backend: Optional[str] = None):
+        self.adb = adb
+        self.analytics = AdvancedAnalytics(adb.db, backend)
+
+    async def compute_streaks(self, user_id: int) -> Dict[int, dict]:
+        return await self.adb.read(self.analytics.compute_streaks, user_id)
+
+    async def calculate_current_streak(self, habit_id: int) -> int:
+        return await self.adb.read(self.analytics.calculate_current_streak, habit_id)
+
+    async def calculate_longest_streak(self, habit_id: int) -> int:
+        return await self.adb.read(self.analytics.calculate_longest_streak, habit_id)
+
+    async def get_longest_streak_all(self, user_id: int) -> Tuple[Optional[str], int]:
+        return await self.adb.read(self.analytics.get_longest_streak_all, user_id)
+
+    async def habit_report(self, user_id: Optional[int] = None, window: int = 30) -> Dict[int, dict]:
+        return await self.adb.read(self.analytics.habit_report, user_id, window)
@@ -0,0 +1,191 @@
+from itertools import groupby
+from typing import Iterable, Iterator, List, Optional
+from src.periods import period_of_day
+
+
+class CompletionBitmap:
+    """
+    A habit's completion history as one bit per period (day for daily
+    habits, week for weekly ones): bit i is set when period origin + i has
+    at least one completion. Bits are packed little-endian into a bytearray,
+    so scans run on whole machine words through Python's big integers
+    instead of over lists of dates. Periods before origin are all zero.
+    """
+
+    def __init__(self, origin: int = 0, bits: Optional[bytes] = None):
+        self.origin = origin
+        self.bits = bytearray(bits or b'')
+
+    @classmethod
+    def from_periods(cls, periods: Iterable[int]) -> 'CompletionBitmap':
+        """Bitmap with the given (any order, duplicates allowed) periods set."""
+        periods = sorted(set(periods))
+        if not periods:
+            return cls()
+        bitmap = cls(periods[0], bytearray((periods[-1] - periods[0]) // 8 + 1))
+        for period in periods:
+            offset = period - bitmap.origin
+            bitmap.bits[offset >> 3] |= 1 << (offset & 7)
+        return bitmap
+
+    def add(self, period: int):
+        """Set one period, growing the bitmap as needed."""
+        if not self.bits:
+            self.origin = period
+        elif period < self.origin:
+            # Back-dated: re-anchor on the new first period
+            rebuilt = CompletionBitmap.from_periods(list(self.periods()) + [period])
+            self.origin, self.bits = rebuilt.origin, rebuilt.bits
+            return
+        offset = period - self.origin
+        if offset >> 3 >= len(self.bits):
+            self.bits.extend(bytes((offset >> 3) + 1 - len(self.bits)))
+        self.bits[offset >> 3] |= 1 << (offset & 7)
+
+    def __contains__(self, period: int) -> bool:
+        offset = period - self.origin
+        return 0 <= offset < len(self.bits) * 8 and bool(self.bits[offset >> 3] >> (offset & 7) & 1)
+
+    def periods(self) -> Iterator[int]:
+        """Completed periods in ascending order."""
+        for index, byte in enumerate(self.bits):
+            while byte:
+                low = byte & -byte
+                yield self.origin + index * 8 + low.bit_length() - 1
+                byte ^= low
+
+    def _word(self) -> int:
+        return int.from_bytes(self.bits, 'little')
+
+    def _window(self, start: Optional[int], end: Optional[int]) -> int:
+        """The bits for periods start..end (inclusive, clipped), shifted down to bit 0."""
+        word = self._word()
+        if start is not None and start > self.origin:
+            word >>= start - self.origin
+        if end is not None:
+            width = end - max(self.origin, start if start is not None else self.origin) + 1
+            word &= (1 << max(width, 0)) - 1
+        return word
+
+    def count(self, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        """Number of completed periods between start and end (inclusive)."""
+        return bin(self._window(start, end)).count('1')
+
+    def success_rate(self, start: int, end: int) -> float:
+        """Percentage of the periods start..end (inclusive) that were completed."""
+        if end < start:
+            return 0.0
+        return round(self.count(start, end) * 100 / (end - start + 1), 1)
+
+    def run_ending_at(self, period: int) -> int:
+        """Length of the run of completed periods ending at period (0 if it was missed)."""
+        if period not in self:
+            return 0
+        width = period - self.origin + 1
+        # Highest missed period at or below this one ends the run
+        gaps = ~self._word() & ((1 << width) - 1)
+        return width - gaps.bit_length()
+
+    def longest_run(self) -> int:
+        """Longest run of consecutive completed periods."""
+        word = self._word()
+        if not word:
+            return 0
+        # runs[k] marks the periods that start a run of at least 2**k
+        runs = [word]
+        while runs[-1] & (runs[-1] >> (1 << (len(runs) - 1))):
+            runs.append(runs[-1] & (runs[-1] >> (1 << (len(runs) - 1))))
+        # Extend the longest power of two by smaller ones while a run survives
+        length = 1 << (len(runs) - 1)
+        starts = runs[-1]
+        for k in range(len(runs) - 2, -1, -1):
+            extended = starts & (runs[k] >> length)
+            if extended:
+                starts = extended
+                length += 1 << k
+        return length
+
+
+class CompletionBitmapStore:
+    """
+    Per-habit completion bitmaps (CompletionBitmap table, one BLOB per
+    habit). Writers call apply_completions() inside their own transaction
+    like StreakStateStore; a trigger drops the bitmap whenever a rollup
+    period disappears, and habits without a stored bitmap are built from
+    CompletionRollup on read.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, habit_id: int) -> CompletionBitmap:
+        """The habit's bitmap (empty if it has no completions)."""
+        with self.db.connection() as conn:
+            return read_bitmap(conn, habit_id)
+
+    def apply_completions(self, conn, habit_id: int, habit_type: str, days: Iterable[int]):
+        """
+        Set the periods of new completions of one habit, given as day
+        numbers. Must run on the inserting connection, after the insert.
+        """
+        periods = [period_of_day(day, habit_type) for day in days if day is not None]
+        if not periods:
+            return
+
+        row = conn.execute("SELECT origin, bits FROM CompletionBitmap WHERE habit_id = ?", (habit_id,)).fetchone()
+        if row is None:
+            # Never built (or dropped by the trigger): start from the rollups, which include these rows
+            self._rebuild(conn, [habit_id])
+            return
+
+        bitmap = CompletionBitmap(row[0], row[1])
+        for period in periods:
+            bitmap.add(period)
+        conn.execute(
+            "UPDATE CompletionBitmap SET origin = ?, bits = ? WHERE habit_id = ?",
+            (bitmap.origin, bytes(bitmap.bits), habit_id)
+        )
+
+    def rebuild(self, habit_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recompute bitmaps from the completion rollup for the given habits
+        (default: all).
+        Returns the number of bitmaps written.
+        """
+        with self.db.transaction() as conn:
+            return self._rebuild(conn, None if habit_ids is None else list(habit_ids))
+
+    def _rebuild(self, conn, habit_ids: Optional[List[int]]) -> int:
+        if habit_ids is None:
+            conn.execute("DELETE FROM CompletionBitmap")
+            where, params = '', ()
+        else:
+            if not habit_ids:
+                return 0
+            placeholders = ', '.join('?' * len(habit_ids))
+            conn.execute(f"DELETE FROM CompletionBitmap WHERE habit_id IN ({placeholders})", habit_ids)
+            where, params = f"WHERE habit_id IN ({placeholders})", tuple(habit_ids)
+
+        rows = conn.execute(
+            f"SELECT habit_id, period_key FROM CompletionRollup {where} ORDER BY habit_id, period_key", params
+        )
+        return write_bitmaps(conn, rows)
+
+
+def read_bitmap(conn, habit_id: int) -> CompletionBitmap:
+    """A habit's stored bitmap, or one built from its rollup periods if none is stored."""
+    row = conn.execute("SELECT origin, bits FROM CompletionBitmap WHERE habit_id = ?", (habit_id,)).fetchone()
+    if row is not None:
+        return CompletionBitmap(row[0], row[1])
+    periods = conn.execute("SELECT period_key FROM CompletionRollup WHERE habit_id = ?", (habit_id,)).fetchall()
+    return CompletionBitmap.from_periods(row[0] for row in periods)
+
+
+def write_bitmaps(conn, rows) -> int:
+    """Insert one bitmap per habit from (habit_id, period_key) rows ordered by habit_id."""
+    bitmaps = []
+    for habit_id, group in groupby(rows, key=lambda row: row[0]):
+        bitmap = CompletionBitmap.from_periods(row[1] for row in group)
+        bitmaps.append((habit_id, bitmap.origin, bytes(bitmap.bits)))
+    conn.executemany("INSERT INTO CompletionBitmap (habit_id, origin, bits) VALUES (?, ?, ?)", bitmaps)
+    return len(bitmaps)
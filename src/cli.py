@@ -2,6 +2,8 @@ import sys
 from db import Database
 from habit_manager import HabitManager
 from advanced_analytics import AdvancedAnalytics
+from rollups import CompletionRollupStore
+from export import write_text_export
 from datetime import datetime
 
 
@@ -13,6 +15,7 @@ class HabitTrackerCLI:
     def __init__(self):
         self.db = Database()
         self.manager = HabitManager(self.db)
+        self.rollups = CompletionRollupStore(self.db)
         self.current_user_id = None
         self.current_username = None
 
@@ -233,7 +236,7 @@ class HabitTrackerCLI:
             confirm = input("Are you sure? This will remove all completion data. (y/n): ").strip().lower()
 
             if confirm == 'y':
-                self._delete_habit_from_db(habit_id)
+                self.manager.delete_habit(habit_id)
                 print("✅ Habit deleted successfully!")
             else:
                 print("Deletion cancelled.")
@@ -241,19 +244,6 @@ class HabitTrackerCLI:
         except ValueError:
             print("Invalid habit ID. Please enter a number.")
 
-    def _delete_habit_from_db(self, habit_id):
-        """Delete a habit from the database."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-
-        # First delete completions (due to foreign key constraints)
-        cursor.execute("DELETE FROM Completions WHERE habit_id = ?", (habit_id,))
-        # Then delete the habit
-        cursor.execute("DELETE FROM Habits WHERE habit_id = ?", (habit_id,))
-
-        conn.commit()
-        conn.close()
-
     def export_data(self):
         """Export habit data to a text file."""
         print("\n--- Export Data ---")
@@ -265,34 +255,7 @@ class HabitTrackerCLI:
 
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write("HABIT TRACKER DATA EXPORT\n")
-                f.write("=" * 50 + "\n\n")
-
-                habits = self.manager.list_habits()
-                f.write(f"Total Habits: {len(habits)}\n\n")
-
-                for habit in habits:
-                    habit_id, name, habit_type, created_at = habit
-                    completions = self._get_completion_count(habit_id)
-
-                    f.write(f"Habit: {name} ({habit_type})\n")
-                    f.write(f"Created: {created_at}\n")
-                    f.write(f"Total Completions: {completions}\n")
-
-                    # Get completion dates
-                    conn = self.db.get_connection()
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT timestamp FROM Completions WHERE habit_id = ? ORDER BY timestamp",
-                        (habit_id,)
-                    )
-                    dates = [row[0][:10] for row in cursor.fetchall()]  # Get just the date part
-                    conn.close()
-
-                    f.write(f"Completion Dates: {', '.join(dates)}\n")
-                    f.write("-" * 30 + "\n\n")
-
-                f.write(f"Export generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                write_text_export(self.db, self.current_user_id, f)
 
             print(f"✅ Data exported to {filename}")
 
@@ -337,37 +300,36 @@ class HabitTrackerCLI:
     def view_current_streaks(self, analytics):
         """Display current streaks using advanced analytics."""
         print("\n--- Current Streaks ---")
-        habits = self.manager.list_habits()
+        streaks = analytics.compute_streaks(self.manager.current_user_id)
 
-        for habit in habits:
-            habit_id, name, habit_type, created_at = habit
-            streak = analytics.calculate_current_streak(habit_id)
-            period = "days" if habit_type == "daily" else "weeks"
-            print(f"📊 {name}: {streak} {period} (current streak)")
+        for habit in streaks.values():
+            period = "days" if habit['type'] == "daily" else "weeks"
+            print(f"📊 {habit['name']}: {habit['current_streak']} {period} (current streak)")
 
     def view_longest_streaks(self, analytics):
         """Display longest streaks using advanced analytics."""
         print("\n--- Longest Streaks ---")
-        habits = self.manager.list_habits()
+        streaks = analytics.compute_streaks(self.manager.current_user_id)
 
-        for habit in habits:
-            habit_id, name, habit_type, created_at = habit
-            streak = analytics.calculate_longest_streak(habit_id)
-            period = "days" if habit_type == "daily" else "weeks"
-            print(f"🏆 {name}: {streak} {period} (longest streak)")
+        for habit in streaks.values():
+            period = "days" if habit['type'] == "daily" else "weeks"
+            print(f"🏆 {habit['name']}: {habit['longest_streak']} {period} (longest streak)")
 
     def view_habit_statistics(self, analytics):
         """Display comprehensive statistics for each habit."""
         print("\n--- Habit Statistics ---")
         habits = self.manager.list_habits()
+        streaks = analytics.compute_streaks(self.manager.current_user_id)
 
         for habit in habits:
             habit_id, name, habit_type, created_at = habit
             completions = self._get_completion_count(habit_id)
-            current_streak = analytics.calculate_current_streak(habit_id)
-            longest_streak = analytics.calculate_longest_streak(habit_id)
+            # The habit list and the streaks are separate reads; a habit added in between has none yet
+            streak = streaks.get(habit_id, {})
+            current_streak = streak.get('current_streak', 0)
+            longest_streak = streak.get('longest_streak', 0)
 
-            success_rate = self._calculate_success_rate(habit_id, habit_type, created_at)
+            success_rate = analytics.success_rate(habit_id, habit_type, created_at)
 
             print(f"\n📈 {name} ({habit_type}):")
             print(f"   Total completions: {completions}")
@@ -422,33 +384,7 @@ class HabitTrackerCLI:
 
     def _get_completion_count(self, habit_id):
         """Get the number of completions for a habit."""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM Completions WHERE habit_id = ?", (habit_id,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
-
-    def _calculate_success_rate(self, habit_id, habit_type, created_date):
-        """Calculate success rate for a habit."""
-        # Calculate days/weeks since creation
-        created = datetime.fromisoformat(
-            created_date.replace('Z', '+00:00')) if 'Z' in created_date else datetime.fromisoformat(created_date)
-        now = datetime.now()
-
-        if habit_type == 'daily':
-            days_since_creation = (now - created).days
-            expected_completions = max(days_since_creation, 1)  # At least 1
-        else:
-            weeks_since_creation = (now - created).days // 7
-            expected_completions = max(weeks_since_creation, 1)
-
-        actual_completions = self._get_completion_count(habit_id)
-
-        if expected_completions > 0:
-            success_rate = (actual_completions / expected_completions) * 100
-            return round(success_rate, 1)
-        return 0.0
+        return self.rollups.completion_count(habit_id)
 
     def logout(self):
         """Log out the current user."""
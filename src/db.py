@@ -1,6 +1,368 @@
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from typing import TYPE_CHECKING
 import hashlib
+from src.bitmap import write_bitmaps
+from src.habit_cache import HabitMetadataCache
+from src.sessions import SessionStore
+from src.streak_cache import StreakResultCache
+from src.periods import DAY_NUMBER_SQL, EPOCH_SECONDS_SQL, HABIT_PERIOD_SQL, WEEK_NUMBER_SQL
+
+if TYPE_CHECKING:
+    from src.instrumentation import QueryStats
+
+
+# PRAGMA settings applied to every pooled connection. All profiles use WAL so
+# analytics readers never block check-off writers (and vice versa); they
+# differ in how hard each commit waits for the disk.
+STORAGE_PROFILES = {
+    # fsync on every commit: survives power loss, slowest writes
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -8000,          # KiB (negative = size, not pages)
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,         # ms
+    },
+    # WAL + NORMAL: commits are atomic, the last few may be lost on power loss
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -32000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # Imports and data generation: no fsync, big cache, wait longer for locks
+    'bulk-load': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -256000,
+        'mmap_size': 1024 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000,
+    },
+}
+
+DEFAULT_STORAGE_PROFILE = 'balanced'
+
+COMPLETION_PERIOD_COLUMNS = (
+    f"ts_epoch = {EPOCH_SECONDS_SQL.format(column='timestamp')}, "
+    f"day_number = {DAY_NUMBER_SQL.format(column='timestamp')}, "
+    f"iso_week_key = {WEEK_NUMBER_SQL.format(column='timestamp')}"
+)
+
+
+def _add_completion_period_columns(cursor):
+    """
+    v1: integer UTC epoch seconds, day number and week number per completion,
+    so streak logic never re-parses timestamp text.
+    """
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(Completions)")}
+    for column in ('ts_epoch', 'day_number', 'iso_week_key'):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE Completions ADD COLUMN {column} INTEGER")
+    cursor.execute(f"UPDATE Completions SET {COMPLETION_PERIOD_COLUMNS}")
+
+
+# One CompletionRollup row per (habit, period) from the Completions rows
+# matching {where}; a daily habit's period is its day, a weekly one's its week.
+ROLLUP_AGGREGATE_SQL = f"""
+    SELECT c.habit_id, {HABIT_PERIOD_SQL} AS period_key, COUNT(*), MIN(c.ts_epoch), MAX(c.ts_epoch),
+           COALESCE(SUM(c.mood_score), 0), COUNT(c.mood_score)
+    FROM Completions c
+    JOIN Habits h ON h.habit_id = c.habit_id
+    WHERE period_key IS NOT NULL {{where}}
+    GROUP BY c.habit_id, period_key
+"""
+ROLLUP_COLUMNS = "habit_id, period_key, completion_count, first_ts_epoch, last_ts_epoch, mood_sum, mood_count"
+
+
+def _rollup_refresh_sql(row: str) -> str:
+    """
+    Trigger body recomputing the rollup row for the period of ``row``
+    (OLD or NEW) from the handful of completions in that day or week.
+    """
+    habit_type = f"(SELECT type FROM Habits WHERE habit_id = {row}.habit_id)"
+    period = f"CASE {habit_type} WHEN 'weekly' THEN {row}.iso_week_key ELSE {row}.day_number END"
+    first_day = f"CASE {habit_type} WHEN 'weekly' THEN {row}.iso_week_key * 7 - 3 ELSE {row}.day_number END"
+    last_day = f"CASE {habit_type} WHEN 'weekly' THEN {row}.iso_week_key * 7 + 3 ELSE {row}.day_number END"
+    return f"""
+        DELETE FROM CompletionRollup WHERE habit_id = {row}.habit_id AND period_key = {period};
+        INSERT INTO CompletionRollup ({ROLLUP_COLUMNS})
+        SELECT c.habit_id, {period}, COUNT(*), MIN(c.ts_epoch), MAX(c.ts_epoch),
+               COALESCE(SUM(c.mood_score), 0), COUNT(c.mood_score)
+        FROM Completions c
+        WHERE c.habit_id = {row}.habit_id AND c.day_number BETWEEN {first_day} AND {last_day}
+        GROUP BY c.habit_id;
+    """
+
+
+def _backfill_completion_rollups(cursor):
+    """v2: per-period completion rollups for existing completions."""
+    cursor.execute("DELETE FROM CompletionRollup")
+    cursor.execute(f"INSERT INTO CompletionRollup ({ROLLUP_COLUMNS}) {ROLLUP_AGGREGATE_SQL.format(where='')}")
+
+
+def _backfill_completion_bitmaps(cursor):
+    """v3: per-habit completion bitmaps for existing completions."""
+    cursor.execute("DELETE FROM CompletionBitmap")
+    rows = cursor.execute("SELECT habit_id, period_key FROM CompletionRollup ORDER BY habit_id, period_key").fetchall()
+    write_bitmaps(cursor, rows)
+
+
+def _create_habit_summary(cursor):
+    """v4: per-habit statistics written in bulk by the nightly job (see nightly.py)."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS HabitSummary (
+            habit_id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            report_date DATE NOT NULL,
+            current_streak INTEGER NOT NULL,
+            longest_streak INTEGER NOT NULL,
+            completions INTEGER NOT NULL,
+            periods_completed INTEGER NOT NULL,
+            success_rate REAL NOT NULL,
+            rolling_rate REAL NOT NULL
+        )
+    ''')
+
+
+def _create_sessions(cursor):
+    """v5: login sessions with expiry (see sessions.py)."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Sessions (
+            token_hash TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            created_at INTEGER NOT NULL,
+            expires_at INTEGER NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES Users (user_id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+
+
+def _create_user_data_version(cursor):
+    """v6: per-user change counters bumped by triggers (see StreakResultCache)."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS UserDataVersion (
+            user_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    ''')
+
+
+def _bump_user_version_sql(user_id_sql: str) -> str:
+    """Upsert that bumps the data version of the user(s) selected by user_id_sql."""
+    return (f"INSERT INTO UserDataVersion (user_id, version) {user_id_sql} "
+            "ON CONFLICT (user_id) DO UPDATE SET version = version + 1;")
+
+
+# (schema version, migration) in order; PRAGMA user_version records the last applied
+MIGRATIONS = [
+    (1, _add_completion_period_columns),
+    (2, _backfill_completion_rollups),
+    (3, _backfill_completion_bitmaps),
+    (4, _create_habit_summary),
+    (5, _create_sessions),
+    (6, _create_user_data_version),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def apply_storage_profile(conn: sqlite3.Connection, profile: str):
+    """Apply the PRAGMAs of a storage profile to one connection."""
+    for pragma, value in STORAGE_PROFILES[profile].items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+
+class ConnectionPool:
+    """
+    Thread-aware pool of long-lived SQLite connections.
+
+    Connections are opened lazily up to ``max_size`` and reused across calls.
+    Checkouts are tracked per thread: a thread that already holds a
+    connection gets the same one back, so nested helpers share the caller's
+    transaction instead of waiting on a second connection.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 5, timeout: float = 30.0,
+                 health_check_interval: float = 30.0, on_connect=None):
+        self.db_path = db_path
+        self.on_connect = on_connect  # called with each newly opened connection
+        # Every connection to ":memory:" is a separate database, so share one.
+        self.max_size = 1 if db_path == ":memory:" else max(1, max_size)
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle = []  # (connection, last_used) pairs, most recent last
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection that may be handed between threads."""
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        if self.on_connect is not None:
+            try:
+                self.on_connect(conn)
+            except Exception:
+                conn.close()
+                raise
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Cheap liveness probe for connections that sat idle for a while."""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Check out a connection for the calling thread.
+        Nested calls from the same thread return the connection already held.
+        """
+        holder = getattr(self._local, 'holder', None)
+        if holder is not None:
+            holder[1] += 1
+            return holder[0]
+
+        conn = self._checkout()
+        self._local.holder = [conn, 1]
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection obtained from acquire()."""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None or holder[0] is not conn:
+            raise ValueError("Connection was not acquired by this thread")
+
+        holder[1] -= 1
+        if holder[1] > 0:
+            return
+
+        self._local.holder = None
+        self._checkin(conn)
+
+    def _checkout(self) -> sqlite3.Connection:
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                        return conn
+                    # Stale connection: drop it and fall through to open a fresh one
+                    self._discard(conn)
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a database connection")
+                self._cond.wait(remaining)
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _checkin(self, conn: sqlite3.Connection):
+        # Never hand the next caller someone else's half-finished transaction
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            healthy = True
+        except sqlite3.Error:
+            healthy = False
+
+        with self._cond:
+            if self._closed or not healthy:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, conn: sqlite3.Connection):
+        """Close a connection and free its slot. Caller holds the lock."""
+        self._size -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def close(self):
+        """Close all idle connections; checked-out ones close when returned."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Current pool occupancy."""
+        with self._cond:
+            return {
+                'max_size': self.max_size,
+                'open': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+            }
+
+
+def _instrumented(conn, stats):
+    """
+    conn wrapped to report to stats, if instrumentation is on. Imported
+    lazily so short-lived commands don't pay for logging at startup.
+    """
+    if stats is None:
+        return conn
+    from src.instrumentation import InstrumentedConnection
+    return InstrumentedConnection(conn, stats)
+
+
+class PooledConnection:
+    """
+    Proxy returned by Database.get_connection().
+    Behaves like a sqlite3 connection, but close() hands it back to the pool.
+    """
+
+    def __init__(self, pool: ConnectionPool, conn: sqlite3.Connection, target=None):
+        self._pool = pool
+        self._conn = conn
+        self._target = target if target is not None else conn  # what calls are forwarded to
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(self._target, name)
+
+    def __enter__(self):
+        self._target.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._target.__exit__(exc_type, exc, tb)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn, self._target = self._conn, None, None
+            self._pool.release(conn)
 
 
 class Database:
@@ -8,65 +370,364 @@ class Database:
     Handles SQLite database operations for habits and completions.
     """
 
-    def __init__(self, db_path: str = "habits.db"):
+    def __init__(self, db_path: str = "habits.db", pool_size: int = 5,
+                 profile: str = DEFAULT_STORAGE_PROFILE):
+        if profile not in STORAGE_PROFILES:
+            raise ValueError(f"Unknown storage profile '{profile}'. "
+                             f"Choose one of: {', '.join(STORAGE_PROFILES)}")
+
         self.db_path = db_path
+        self.profile = profile
+        self.instrumentation = None  # QueryStats while instrumentation is switched on
+        self.habit_cache = HabitMetadataCache(self)
+        self.streak_cache = StreakResultCache()
+        self.sessions = SessionStore(self)
+        self._commit_hooks = threading.local()  # callbacks waiting for this thread's outermost commit
+        self.pool = ConnectionPool(db_path, max_size=pool_size, on_connect=self._configure_connection)
         self.init_db()
 
-    def init_db(self):
-        """
-        Initialize database tables: Users, Habits, Completions.
-        """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Users (
-                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Habits table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Habits (
-                habit_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,  -- 'daily' or 'weekly'
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT TRUE,
-                FOREIGN KEY (user_id) REFERENCES Users (user_id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Completions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Completions (
-                completion_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                habit_id INTEGER,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                mood_score INTEGER,
-                FOREIGN KEY (habit_id) REFERENCES Habits (habit_id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Index for faster streak queries
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_habit_timestamp 
-            ON Completions (habit_id, timestamp)
-        ''')
-
-        conn.commit()
-        conn.close()
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """Hook run by the pool on every new connection."""
+        apply_storage_profile(conn, self.profile)
+
+    def init_db(self, force: bool = False):
+        """
+        Initialize database tables: Users, Habits, Completions, HabitStreakState,
+        CompletionRollup, CompletionBitmap, HabitSummary, Sessions,
+        UserDataVersion. Skipped when PRAGMA user_version shows the schema is
+        already current, unless force is set (e.g. to recreate dropped indexes).
+        """
+        with self.transaction() as conn:
+            if not force and conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+                return
+
+            cursor = conn.cursor()
+
+            # Users table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS Users (
+                    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE NOT NULL,
+                    email TEXT UNIQUE NOT NULL,
+                    password_hash TEXT NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Habits table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS Habits (
+                    habit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER,
+                    name TEXT NOT NULL,
+                    type TEXT NOT NULL,  -- 'daily' or 'weekly'
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    is_active BOOLEAN DEFAULT TRUE,
+                    FOREIGN KEY (user_id) REFERENCES Users (user_id) ON DELETE CASCADE
+                )
+            ''')
+
+            # Completions table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS Completions (
+                    completion_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    habit_id INTEGER,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    notes TEXT,
+                    mood_score INTEGER,
+                    FOREIGN KEY (habit_id) REFERENCES Habits (habit_id) ON DELETE CASCADE
+                )
+            ''')
+
+            # Index for faster streak queries
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_habit_timestamp
+                ON Completions (habit_id, timestamp)
+            ''')
+
+            # Streak summary maintained on check-off (see streak_state.py).
+            # last_period is a day number for daily habits, a week number for weekly ones.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS HabitStreakState (
+                    habit_id INTEGER PRIMARY KEY,
+                    current_streak INTEGER NOT NULL DEFAULT 0,
+                    longest_streak INTEGER NOT NULL DEFAULT 0,
+                    last_period INTEGER,
+                    total_completions INTEGER NOT NULL DEFAULT 0,
+                    FOREIGN KEY (habit_id) REFERENCES Habits (habit_id) ON DELETE CASCADE
+                )
+            ''')
+
+            # Completions pre-aggregated per day (daily habits) or week (weekly
+            # habits), kept current by the triggers below (see rollups.py)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS CompletionRollup (
+                    habit_id INTEGER NOT NULL,
+                    period_key INTEGER NOT NULL,
+                    completion_count INTEGER NOT NULL,
+                    first_ts_epoch INTEGER,
+                    last_ts_epoch INTEGER,
+                    mood_sum INTEGER NOT NULL DEFAULT 0,
+                    mood_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (habit_id, period_key)
+                ) WITHOUT ROWID
+            ''')
+
+            # One bit per completed period and habit, origin being the first
+            # bit's period (see bitmap.py)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS CompletionBitmap (
+                    habit_id INTEGER PRIMARY KEY,
+                    origin INTEGER NOT NULL,
+                    bits BLOB NOT NULL,
+                    FOREIGN KEY (habit_id) REFERENCES Habits (habit_id) ON DELETE CASCADE
+                )
+            ''')
+
+            # Bring older databases up to date before touching migrated columns
+            self._migrate(cursor)
+
+            # Integer streak lookups (see periods.py)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_completions_habit_day
+                ON Completions (habit_id, day_number)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_habit_summary_user
+                ON HabitSummary (user_id)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_sessions_user
+                ON Sessions (user_id)
+            ''')
+
+            # Rows inserted without the integer period columns (raw SQL, old
+            # scripts) get them filled in; HabitManager computes them itself.
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_completions_fill_periods
+                AFTER INSERT ON Completions
+                WHEN NEW.day_number IS NULL
+                BEGIN
+                    UPDATE Completions SET {COMPLETION_PERIOD_COLUMNS}
+                    WHERE completion_id = NEW.completion_id;
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_completions_refresh_periods
+                AFTER UPDATE OF timestamp ON Completions
+                BEGIN
+                    UPDATE Completions SET {COMPLETION_PERIOD_COLUMNS}
+                    WHERE completion_id = NEW.completion_id;
+                END
+            ''')
+
+            # Check-offs fold into their period's rollup row; rows still missing
+            # their period columns are picked up by the update trigger once filled.
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_completions_rollup_insert
+                AFTER INSERT ON Completions
+                WHEN NEW.day_number IS NOT NULL
+                BEGIN
+                    INSERT INTO CompletionRollup ({ROLLUP_COLUMNS})
+                    SELECT NEW.habit_id,
+                           CASE type WHEN 'weekly' THEN NEW.iso_week_key ELSE NEW.day_number END,
+                           1, NEW.ts_epoch, NEW.ts_epoch,
+                           COALESCE(NEW.mood_score, 0), NEW.mood_score IS NOT NULL
+                    FROM Habits WHERE habit_id = NEW.habit_id
+                    ON CONFLICT (habit_id, period_key) DO UPDATE SET
+                        completion_count = completion_count + 1,
+                        first_ts_epoch = MIN(first_ts_epoch, excluded.first_ts_epoch),
+                        last_ts_epoch = MAX(last_ts_epoch, excluded.last_ts_epoch),
+                        mood_sum = mood_sum + excluded.mood_sum,
+                        mood_count = mood_count + excluded.mood_count;
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_completions_rollup_update
+                AFTER UPDATE OF habit_id, mood_score, ts_epoch, day_number, iso_week_key ON Completions
+                BEGIN
+                    {_rollup_refresh_sql('OLD')}
+                    {_rollup_refresh_sql('NEW')}
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_completions_rollup_delete
+                AFTER DELETE ON Completions
+                BEGIN
+                    {_rollup_refresh_sql('OLD')}
+                END
+            ''')
+
+            # Bits are only ever set incrementally; when a period is rewritten or
+            # removed, drop the bitmap so it is rebuilt from the rollups.
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_rollup_drop_bitmap
+                AFTER DELETE ON CompletionRollup
+                BEGIN
+                    DELETE FROM CompletionBitmap WHERE habit_id = OLD.habit_id;
+                END
+            ''')
+
+            # Any change to a user's habits or completions, from any process,
+            # bumps their data version so cached streaks everywhere go stale.
+            for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+                habit_owner = f"SELECT user_id, 1 FROM Habits WHERE habit_id = {row}.habit_id"
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_completions_version_{event.lower()}
+                    AFTER {event} ON Completions
+                    BEGIN
+                        {_bump_user_version_sql(habit_owner)}
+                    END
+                ''')
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_habits_version_{event.lower()}
+                    AFTER {event} ON Habits
+                    BEGIN
+                        {_bump_user_version_sql(f"VALUES ({row}.user_id, 1)")}
+                    END
+                ''')
+
+    def _migrate(self, cursor):
+        """Apply pending schema migrations and record the new PRAGMA user_version."""
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        for target, migration in MIGRATIONS:
+            if version < target:
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {target}")
+                version = target
+
+    def data_version(self, user_id: int) -> int:
+        """Change counter of a user's habits and completions, shared by every process."""
+        with self.connection() as conn:
+            row = conn.execute("SELECT version FROM UserDataVersion WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def bump_data_versions(self):
+        """Mark every user's data as changed, e.g. after writes made with the triggers dropped."""
+        with self.transaction() as conn:
+            conn.execute(_bump_user_version_sql("SELECT user_id, 1 FROM Users WHERE TRUE"))
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a pooled connection for the duration of a with-block.
+        """
+        conn = self.pool.acquire()
+        try:
+            yield _instrumented(conn, self.instrumentation)
+        finally:
+            self.pool.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Borrow a pooled connection and commit on success, roll back on error.
+        When the thread is already inside a transaction, the outer block decides.
+        """
+        with self.connection() as conn:
+            # sqlite3 only BEGINs at the first write, so in_transaction alone can't spot nesting
+            outermost = not conn.in_transaction and getattr(self._commit_hooks, 'pending', None) is None
+            if outermost:
+                self._commit_hooks.pending = []
+            try:
+                yield conn
+            except BaseException:
+                if outermost:
+                    self._commit_hooks.pending = None
+                    conn.rollback()
+                raise
+            if outermost:
+                try:
+                    conn.commit()
+                finally:
+                    callbacks, self._commit_hooks.pending = self._commit_hooks.pending, None
+                for callback in callbacks:
+                    callback()
+
+    def after_commit(self, callback):
+        """
+        Run callback once the calling thread's outermost transaction has
+        committed, or right away outside a transaction. Cache invalidation
+        goes through here so that work grouped into one bigger transaction
+        (the async facade) never lets readers re-cache data before it commits.
+        """
+        pending = getattr(self._commit_hooks, 'pending', None)
+        if pending is None:
+            callback()
+        else:
+            pending.append(callback)
 
     def get_connection(self):
-        """Return a new database connection."""
-        return sqlite3.connect(self.db_path)
+        """Return a pooled database connection; close() returns it to the pool."""
+        conn = self.pool.acquire()
+        stats = self.instrumentation
+        return PooledConnection(self.pool, conn, None if stats is None else _instrumented(conn, stats))
+
+    def enable_instrumentation(self, slow_query_ms: float = 100.0, slow_query_log: str = None) -> 'QueryStats':
+        """
+        Start recording every statement (text, duration, rows, calling method).
+        Statements slower than slow_query_ms are logged to the
+        'habit_tracker.slow_queries' logger and, if given, the slow_query_log file.
+        """
+        from src.instrumentation import QueryStats, configure_slow_query_log
+
+        configure_slow_query_log(slow_query_log)
+        if self.instrumentation is None:
+            self.instrumentation = QueryStats(slow_query_ms)
+        else:
+            self.instrumentation.slow_query_ms = slow_query_ms
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        """Stop recording; connections are handed out unwrapped again."""
+        self.instrumentation = None
+
+    def query_stats(self) -> dict:
+        """Aggregated counters since instrumentation was enabled (or reset)."""
+        if self.instrumentation is None:
+            return None
+        return self.instrumentation.snapshot()
+
+    def close(self):
+        """Close all pooled connections."""
+        self.pool.close()
+
+    def drop_indexes(self, keep=()) -> list:
+        """
+        Drop all secondary indexes (except those named in keep) ahead of a
+        bulk load. Calling init_db(force=True) afterwards recreates them in one pass.
+        """
+        with self.transaction() as conn:
+            names = [row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+            ) if row[0] not in keep]
+            for name in names:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+        return names
+
+    def drop_triggers(self) -> list:
+        """
+        Drop the triggers that maintain derived columns and tables ahead of
+        a bulk load. init_db(force=True) recreates them; rebuild_derived_tables()
+        catches the derived tables up.
+        """
+        with self.transaction() as conn:
+            names = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")]
+            for name in names:
+                conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        return names
+
+    def describe_storage(self) -> dict:
+        """
+        Report the active storage profile and the PRAGMA values SQLite
+        actually applied (e.g. ":memory:" databases cannot use WAL).
+        """
+        with self.connection() as conn:
+            settings = {
+                pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+                for pragma in STORAGE_PROFILES[self.profile]
+            }
+        return {'profile': self.profile, 'settings': settings}
 
     def register_user(self, username: str, email: str, password: str) -> bool:
         """
@@ -76,14 +737,11 @@ class Database:
             # Hash the password
             password_hash = hashlib.sha256(password.encode()).hexdigest()
 
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO Users (username, email, password_hash) VALUES (?, ?, ?)",
-                (username, email, password_hash)
-            )
-            conn.commit()
-            conn.close()
+            with self.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO Users (username, email, password_hash) VALUES (?, ?, ?)",
+                    (username, email, password_hash)
+                )
             return True
         except sqlite3.IntegrityError:
             # Username or email already exists
@@ -100,14 +758,11 @@ class Database:
             # Hash the provided password
             password_hash = hashlib.sha256(password.encode()).hexdigest()
 
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT user_id FROM Users WHERE username = ? AND password_hash = ?",
-                (username, password_hash)
-            )
-            result = cursor.fetchone()
-            conn.close()
+            with self.connection() as conn:
+                result = conn.execute(
+                    "SELECT user_id FROM Users WHERE username = ? AND password_hash = ?",
+                    (username, password_hash)
+                ).fetchone()
 
             return result[0] if result else None
         except Exception as e:
@@ -118,9 +773,6 @@ class Database:
         """
         Check if a username already exists.
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT user_id FROM Users WHERE username = ?", (username,))
-        result = cursor.fetchone()
-        conn.close()
-        return result is not None
\ No newline at end of file
+        with self.connection() as conn:
+            result = conn.execute("SELECT user_id FROM Users WHERE username = ?", (username,)).fetchone()
+        return result is not None
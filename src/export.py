@@ -0,0 +1,145 @@
+"""
+Habit data exports shared by the interactive and command-line interfaces.
+
+Everything streams a single ordered join of Habits and Completions through
+the cursor, so memory stays flat however many years of completions a user
+has.
+"""
+import contextlib
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+from src.db import Database
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+COMPRESSIONS = (None, 'gzip', 'zstd')
+EXPORT_COLUMNS = ('habit_id', 'habit_name', 'habit_type', 'completion_id', 'timestamp', 'notes', 'mood_score')
+FETCH_SIZE = 1000
+
+
+def iter_completions(db: Database, user_id: int) -> Iterator[tuple]:
+    """
+    Yield one EXPORT_COLUMNS tuple per completion of the user's active
+    habits, ordered by habit and time.
+    """
+    with db.connection() as conn:
+        cursor = conn.execute(
+            """
+            SELECT h.habit_id, h.name, h.type, c.completion_id, c.timestamp, c.notes, c.mood_score
+            FROM Habits h
+            JOIN Completions c ON c.habit_id = h.habit_id
+            WHERE h.user_id = ? AND h.is_active = TRUE
+            ORDER BY h.habit_id, c.timestamp
+            """,
+            (user_id,)
+        )
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+
+
+def _open_text(path, compression: Optional[str]):
+    """
+    Open path for text writing through the requested compressor. An already
+    open text file (such as sys.stdout) is written to as is and left open.
+    """
+    if hasattr(path, 'write'):
+        if compression is not None:
+            raise ValueError("Compressed exports need a file path, not an open stream")
+        return contextlib.nullcontext(path)
+    if compression is None:
+        return open(path, 'w', encoding='utf-8', newline='')
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd compression requires the 'zstandard' package")
+    raw = open(path, 'wb')
+    writer = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+    return io.TextIOWrapper(writer, encoding='utf-8', newline='')
+
+
+def export_completions(db: Database, user_id: int, path, fmt: str = 'csv',
+                       compression: Optional[str] = None,
+                       progress: Optional[Callable[[int], None]] = None,
+                       progress_every: int = 10000) -> int:
+    """
+    Stream a user's completions to path (or an open text file) as CSV or
+    JSON Lines, optionally gzip- or zstd-compressed. progress(rows_written) is called every
+    progress_every rows and once at the end. Returns the number of rows.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected one of {', '.join(EXPORT_FORMATS)})")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}' (expected gzip or zstd)")
+
+    rows = 0
+    with _open_text(path, compression) as out:
+        if fmt == 'csv':
+            writer = csv.writer(out)
+            writer.writerow(EXPORT_COLUMNS)
+            write = writer.writerow
+        else:
+            def write(row):
+                out.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False))
+                out.write("\n")
+
+        for row in iter_completions(db, user_id):
+            write(row)
+            rows += 1
+            if progress is not None and rows % progress_every == 0:
+                progress(rows)
+
+    if progress is not None:
+        progress(rows)
+    return rows
+
+
+def write_text_export(db: Database, user_id: int, out):
+    """Write the plain-text report of a user's active habits to an open file."""
+    with db.connection() as conn:
+        habits = conn.execute(
+            """
+            SELECT h.habit_id, h.name, h.type, h.created_at, COALESCE(SUM(r.completion_count), 0)
+            FROM Habits h
+            LEFT JOIN CompletionRollup r ON r.habit_id = h.habit_id
+            WHERE h.user_id = ? AND h.is_active = TRUE
+            GROUP BY h.habit_id
+            ORDER BY h.habit_id
+            """,
+            (user_id,)
+        ).fetchall()
+    completions = iter_completions(db, user_id)
+    try:
+        pending = next(completions, None)
+
+        out.write("HABIT TRACKER DATA EXPORT\n")
+        out.write("=" * 50 + "\n\n")
+        out.write(f"Total Habits: {len(habits)}\n\n")
+
+        for habit_id, name, habit_type, created_at, count in habits:
+            out.write(f"Habit: {name} ({habit_type})\n")
+            out.write(f"Created: {created_at}\n")
+            out.write(f"Total Completions: {count}\n")
+
+            # Completion dates come off the shared ordered stream, one at a time
+            out.write("Completion Dates: ")
+            separator = ""
+            while pending is not None and pending[0] == habit_id:
+                out.write(separator + str(pending[4])[:10])  # Get just the date part
+                separator = ", "
+                pending = next(completions, None)
+            out.write("\n")
+            out.write("-" * 30 + "\n\n")
+    finally:
+        # Returns the pooled connection even if writing fails part-way
+        completions.close()
+
+    out.write(f"Export generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
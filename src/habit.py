@@ -1,15 +1,24 @@
-from datetime import datetime
-from typing import List, Optional
+import sys
+from array import array
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+
+_EPOCH = datetime(1970, 1, 1)
+_NO_MOOD = -128  # mood_score None in CompletionLog's mood column
 
 
 class BaseHabit:
     """
     Base class for all habits.
     """
-    def __init__(self, name: str, creation_date: datetime):
+    __slots__ = ('habit_id', 'name', 'creation_date', 'completion_records')
+
+    def __init__(self, name: str, creation_date: datetime, habit_id: Optional[int] = None):
+        self.habit_id = habit_id  # set for habits loaded from the database
         self.name = name
         self.creation_date = creation_date
-        self.completion_records: List['Completion'] = []
+        self.completion_records: CompletionLog = CompletionLog()
 
     def is_due_on(self, date: datetime) -> bool:
         """
@@ -18,30 +27,226 @@ class BaseHabit:
         """
         raise NotImplementedError("Subclasses must implement this method.")
 
+    # Schedule over a date range (inclusive). Subclasses answer in closed
+    # form; this fallback asks is_due_on() for every day.
+
+    def due_mask(self, start: date, end: date) -> bytearray:
+        """
+        One byte per day from start to end: 1 where the habit is due, else 0.
+        numpy.frombuffer(mask, dtype=bool) views it as an array without copying.
+        """
+        start, days = _date_range(start, end)
+        return bytearray(self.is_due_on(start + timedelta(days=i)) for i in range(days))
+
+    def due_dates(self, start: date, end: date) -> List[date]:
+        """The dates from start to end on which the habit is due."""
+        first, _ = _date_range(start, end)
+        return [first + timedelta(days=i) for i, due in enumerate(self.due_mask(start, end)) if due]
+
+    def due_count(self, start: date, end: date) -> int:
+        """How many times the habit is due from start to end."""
+        return sum(self.due_mask(start, end))
+
 
 class DailyHabit(BaseHabit):
     """
     A habit that is due every day.
     """
+    __slots__ = ()
+
     def is_due_on(self, date: datetime) -> bool:
         # A daily habit is due every day
         return True
 
+    def due_mask(self, start: date, end: date) -> bytearray:
+        return bytearray(b'\x01') * _date_range(start, end)[1]
+
+    def due_count(self, start: date, end: date) -> int:
+        return _date_range(start, end)[1]
+
 
 class WeeklyHabit(BaseHabit):
     """
     A habit that is due once per week.
     """
+    __slots__ = ()
+
     def is_due_on(self, date: datetime) -> bool:
         # A weekly habit is due if it's the same weekday as creation
         return date.weekday() == self.creation_date.weekday()
 
+    def _first_due(self, start: date) -> int:
+        """Offset from start of the first due day (may lie past the range)."""
+        return (self.creation_date.weekday() - start.weekday()) % 7
+
+    def due_mask(self, start: date, end: date) -> bytearray:
+        start, days = _date_range(start, end)
+        mask = bytearray(days)
+        first = self._first_due(start)
+        mask[first::7] = b'\x01' * len(range(first, days, 7))
+        return mask
+
+    def due_dates(self, start: date, end: date) -> List[date]:
+        start, days = _date_range(start, end)
+        return [start + timedelta(days=i) for i in range(self._first_due(start), days, 7)]
+
+    def due_count(self, start: date, end: date) -> int:
+        start, days = _date_range(start, end)
+        return len(range(self._first_due(start), days, 7))
+
+
+HABIT_CLASSES = {'daily': DailyHabit, 'weekly': WeeklyHabit}
+
 
 class Completion:
     """
     Represents a completion (check-off) of a habit.
     """
+    __slots__ = ('timestamp', 'notes', 'mood_score')
+
     def __init__(self, timestamp: datetime, notes: Optional[str] = None, mood_score: Optional[int] = None):
         self.timestamp = timestamp
         self.notes = notes
-        self.mood_score = mood_score
\ No newline at end of file
+        self.mood_score = mood_score
+
+
+class CompletionView:
+    """
+    One entry of a CompletionLog with the attributes of a Completion.
+    Reads and writes go straight to the log's columns.
+    """
+    __slots__ = ('_log', '_index')
+
+    def __init__(self, log: 'CompletionLog', index: int):
+        self._log = log
+        self._index = index
+
+    @property
+    def timestamp(self) -> datetime:
+        return _EPOCH + timedelta(microseconds=self._log._timestamps[self._index])
+
+    @timestamp.setter
+    def timestamp(self, value: datetime):
+        self._log._timestamps[self._index] = _micros(value)
+
+    @property
+    def notes(self) -> Optional[str]:
+        return self._log._notes[self._log._note_ids[self._index]]
+
+    @notes.setter
+    def notes(self, value: Optional[str]):
+        self._log._note_ids[self._index] = self._log._note_id(value)
+
+    @property
+    def mood_score(self) -> Optional[int]:
+        mood = self._log._moods[self._index]
+        return None if mood == _NO_MOOD else mood
+
+    @mood_score.setter
+    def mood_score(self, value: Optional[int]):
+        self._log._moods[self._index] = _mood(value)
+
+    def __repr__(self):
+        return f"CompletionView({self.timestamp!r}, {self.notes!r}, {self.mood_score!r})"
+
+
+class CompletionLog(Sequence):
+    """
+    A habit's completions stored column-wise: timestamps as microseconds
+    since 1970 in an array('q'), mood scores in an array('b'), and notes
+    as ids into a table of distinct, interned strings. That is 13 bytes per
+    completion instead of a Completion object plus a datetime (over 100
+    bytes even with slots).
+
+    Behaves like the list of Completion objects it replaces: append() takes
+    a Completion, and indexing or iterating yields CompletionViews with the
+    same attributes. Timestamps must be naive datetimes.
+    """
+    __slots__ = ('_timestamps', '_moods', '_note_ids', '_notes', '_note_index')
+
+    def __init__(self, completions: Iterable[Completion] = ()):
+        self._timestamps = array('q')
+        self._moods = array('b')
+        self._note_ids = array('i')
+        self._notes: List[Optional[str]] = [None]  # id 0 is "no notes"
+        self._note_index = {}
+        self.extend(completions)
+
+    def record(self, timestamp: datetime, notes: Optional[str] = None, mood_score: Optional[int] = None):
+        """Add one completion without creating a Completion object."""
+        # Convert (and validate) everything first so the columns never get out of step
+        micros, mood, note_id = _micros(timestamp), _mood(mood_score), self._note_id(notes)
+        self._timestamps.append(micros)
+        self._moods.append(mood)
+        self._note_ids.append(note_id)
+
+    def record_epoch(self, ts_epoch: int, notes: Optional[str] = None, mood_score: Optional[int] = None):
+        """Add one completion given as UTC epoch seconds (the Completions.ts_epoch column)."""
+        note_id, mood = self._note_id(notes), _mood(mood_score)
+        self._timestamps.append(ts_epoch * 1_000_000)
+        self._moods.append(mood)
+        self._note_ids.append(note_id)
+
+    def append(self, completion: Completion):
+        self.record(completion.timestamp, completion.notes, completion.mood_score)
+
+    def extend(self, completions: Iterable[Completion]):
+        for completion in completions:
+            self.append(completion)
+
+    def _note_id(self, notes: Optional[str]) -> int:
+        if notes is None:
+            return 0
+        note_id = self._note_index.get(notes)
+        if note_id is None:
+            note_id = self._note_index[notes] = len(self._notes)
+            self._notes.append(sys.intern(notes))
+        return note_id
+
+    def timestamps(self) -> array:
+        """The timestamp column (microseconds since 1970), for bulk processing."""
+        return self._timestamps
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def __getitem__(self, index):
+        size = len(self._timestamps)
+        if isinstance(index, slice):
+            return [CompletionView(self, i) for i in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("completion index out of range")
+        return CompletionView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self._timestamps)):
+            yield CompletionView(self, index)
+
+    def __repr__(self):
+        return f"CompletionLog({len(self)} completions)"
+
+
+def _date_range(start: date, end: date) -> tuple:
+    """(start as a date, number of days through end inclusive, 0 if end is earlier)."""
+    if isinstance(start, datetime):
+        start = start.date()
+    if isinstance(end, datetime):
+        end = end.date()
+    return start, max((end - start).days + 1, 0)
+
+
+def _micros(timestamp: datetime) -> int:
+    if timestamp.tzinfo is not None:
+        raise ValueError("CompletionLog stores naive datetimes")
+    delta = timestamp - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _mood(mood_score: Optional[int]) -> int:
+    if mood_score is None:
+        return _NO_MOOD
+    if not -_NO_MOOD > mood_score > _NO_MOOD:
+        raise ValueError(f"Mood score {mood_score} is out of range")
+    return mood_score
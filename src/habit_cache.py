@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+METADATA_COLUMNS = ('habit_id', 'user_id', 'name', 'type', 'created_at', 'is_active')
+
+
+class HabitMetadataCache:
+    """
+    Bounded LRU read-through cache of habit metadata, one per Database
+    (db.habit_cache) so HabitManager and the analytics classes share it.
+    Writers that change or remove a habit call invalidate(), which also
+    bumps the habit's version so a load already in flight doesn't put the
+    old row back.
+    """
+
+    def __init__(self, db, max_size: int = 4096):
+        self.db = db
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._generation = 0  # bumped by a full invalidate()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, habit_id: int) -> Optional[dict]:
+        """Metadata for one habit, or None if it does not exist."""
+        return self.get_many([habit_id]).get(habit_id)
+
+    def get_many(self, habit_ids: Iterable[int]) -> Dict[int, dict]:
+        """Metadata for every existing habit among habit_ids; misses load in one query."""
+        found = {}
+        missing = []
+        with self._lock:
+            for habit_id in habit_ids:
+                entry = self._entries.get(habit_id)
+                if entry is None:
+                    self.misses += 1
+                    missing.append(habit_id)
+                else:
+                    self.hits += 1
+                    self._entries.move_to_end(habit_id)
+                    found[habit_id] = entry
+            generation = self._generation
+            versions = {habit_id: self._versions.get(habit_id, 0) for habit_id in missing}
+
+        if missing:
+            loaded = self._load(missing)
+            with self._lock:
+                for habit_id, entry in loaded.items():
+                    # Invalidated while loading: the row may predate the write
+                    if generation != self._generation or versions[habit_id] != self._versions.get(habit_id, 0):
+                        continue
+                    self._entries[habit_id] = entry
+                    self._entries.move_to_end(habit_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            found.update(loaded)
+        return found
+
+    def _load(self, habit_ids: list) -> Dict[int, dict]:
+        loaded = {}
+        with self.db.connection() as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(habit_ids), 500):
+                chunk = habit_ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT {', '.join(METADATA_COLUMNS)} FROM Habits "
+                    f"WHERE habit_id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+                for row in rows:
+                    loaded[row[0]] = dict(zip(METADATA_COLUMNS, row))
+        return loaded
+
+    def invalidate(self, habit_id: int = None):
+        """Forget one habit, or everything when habit_id is None."""
+        with self._lock:
+            if habit_id is None:
+                self._generation += 1
+                self._entries.clear()
+            else:
+                self._versions[habit_id] = self._versions.get(habit_id, 0) + 1
+                self._entries.pop(habit_id, None)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
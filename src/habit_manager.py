@@ -1,4 +1,11 @@
+from datetime import datetime
+from typing import Iterable, List
+from src.bitmap import CompletionBitmapStore
 from src.db import Database
+from src.periods import completion_columns, utc_timestamp
+from src.streak_state import StreakStateStore
+
+COMPLETION_INSERT_COLUMNS = "habit_id, timestamp, notes, mood_score, ts_epoch, day_number, iso_week_key"
 
 
 class HabitManager:
@@ -9,6 +16,8 @@ class HabitManager:
     def __init__(self, db: Database):
         self.db = db
         self.current_user_id = None  # Will be set after login
+        self.streak_state = StreakStateStore(db)
+        self.bitmaps = CompletionBitmapStore(db)
 
     def set_current_user(self, user_id: int):
         """Set the currently logged-in user."""
@@ -21,16 +30,52 @@ class HabitManager:
         if not self.current_user_id:
             raise ValueError("No user logged in")
 
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO Habits (user_id, name, type) VALUES (?, ?, ?)",
-            (self.current_user_id, name, habit_type)
-        )
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO Habits (user_id, name, type) VALUES (?, ?, ?)",
+                (self.current_user_id, name, habit_type)
+            )
+        self._invalidate_streaks()
         # Should NOT add a completion here!
 
+    def deactivate_habit(self, habit_id: int):
+        """
+        Hide a habit from listings and analytics while keeping its history.
+        """
+        self._update_owned_habit(habit_id, "UPDATE Habits SET is_active = FALSE WHERE habit_id = ?")
+
+    def delete_habit(self, habit_id: int):
+        """
+        Delete a habit with all of its completions and streak state.
+        """
+        self._update_owned_habit(
+            habit_id,
+            "DELETE FROM Completions WHERE habit_id = ?",
+            "DELETE FROM HabitStreakState WHERE habit_id = ?",
+            "DELETE FROM Habits WHERE habit_id = ?",
+        )
+
+    def _update_owned_habit(self, habit_id: int, *statements: str):
+        """Run statements for one of the current user's habits, then drop it from the caches."""
+        if not self.current_user_id:
+            raise ValueError("No user logged in")
+
+        with self.db.transaction() as conn:
+            if not conn.execute(
+                "SELECT 1 FROM Habits WHERE habit_id = ? AND user_id = ?",
+                (habit_id, self.current_user_id)
+            ).fetchone():
+                raise ValueError("Habit not found or access denied")
+            for statement in statements:
+                conn.execute(statement, (habit_id,))
+        self.db.after_commit(lambda: self.db.habit_cache.invalidate(habit_id))
+        self._invalidate_streaks()
+
+    def _invalidate_streaks(self):
+        """Orphan the current user's memoized streak overview."""
+        scope = ('user', self.current_user_id)
+        self.db.after_commit(lambda: self.db.streak_cache.invalidate(scope))
+
     def list_habits(self):
         """
         List all habits for the current user.
@@ -38,14 +83,11 @@ class HabitManager:
         if not self.current_user_id:
             raise ValueError("No user logged in")
 
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT habit_id, name, type, created_at FROM Habits WHERE user_id = ? AND is_active = TRUE",
-            (self.current_user_id,)
-        )
-        habits = cursor.fetchall()
-        conn.close()
+        with self.db.connection() as conn:
+            habits = conn.execute(
+                "SELECT habit_id, name, type, created_at FROM Habits WHERE user_id = ? AND is_active = TRUE",
+                (self.current_user_id,)
+            ).fetchall()
         return habits
 
     def check_off_habit(self, habit_id: int, notes: str = None, mood_score: int = None):
@@ -55,20 +97,104 @@ class HabitManager:
         if not self.current_user_id:
             raise ValueError("No user logged in")
 
-        # Verify the habit belongs to the current user
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT habit_id FROM Habits WHERE habit_id = ? AND user_id = ?",
-            (habit_id, self.current_user_id)
-        )
-        if not cursor.fetchone():
-            conn.close()
-            raise ValueError("Habit not found or access denied")
+        with self.db.transaction() as conn:
+            # The cache supplies the type; ownership is re-checked against Habits
+            # by the insert itself, since another process may have deleted it
+            habit = self.db.habit_cache.get(habit_id)
+            if habit is None or habit['user_id'] != self.current_user_id:
+                raise ValueError("Habit not found or access denied")
 
-        cursor.execute(
-            "INSERT INTO Completions (habit_id, notes, mood_score) VALUES (?, ?, ?)",
-            (habit_id, notes, mood_score)
-        )
-        conn.commit()
-        conn.close()
\ No newline at end of file
+            timestamp = utc_timestamp()
+            ts_epoch, day, week = completion_columns(timestamp)
+            inserted = conn.execute(
+                f"""
+                INSERT INTO Completions ({COMPLETION_INSERT_COLUMNS})
+                SELECT ?, ?, ?, ?, ?, ?, ?
+                WHERE EXISTS (SELECT 1 FROM Habits WHERE habit_id = ? AND user_id = ?)
+                """,
+                (habit_id, timestamp, notes, mood_score, ts_epoch, day, week, habit_id, self.current_user_id)
+            ).rowcount
+            if not inserted:
+                self.db.habit_cache.invalidate(habit_id)
+                raise ValueError("Habit not found or access denied")
+            # Same transaction, so the streak state never disagrees with Completions
+            self.streak_state.apply_completion(conn, habit_id, habit['type'], day)
+            self.bitmaps.apply_completions(conn, habit_id, habit['type'], [day])
+        self._invalidate_streaks()
+
+    def check_off_many(self, records: Iterable) -> List[dict]:
+        """
+        Record many completions in one transaction (imports, mobile sync).
+
+        Each record is a dict with 'habit_id' and optional 'notes',
+        'mood_score' and 'timestamp' (defaults to now), or a
+        (habit_id, notes, mood_score) tuple. Ownership of all habits is
+        checked with one query. Returns one result per record, in order:
+        {'habit_id': ..., 'success': bool, 'error': str or None}.
+        """
+        if not self.current_user_id:
+            raise ValueError("No user logged in")
+
+        now = utc_timestamp()
+        parsed = []
+        for record in records:
+            if not isinstance(record, dict):
+                habit_id, notes, mood_score = (tuple(record) + (None, None))[:3]
+                record = {'habit_id': habit_id, 'notes': notes, 'mood_score': mood_score}
+
+            timestamp = record.get('timestamp') or now
+            if isinstance(timestamp, datetime):
+                timestamp = timestamp.isoformat(sep=' ')
+            columns = completion_columns(timestamp)
+            error = None if columns[1] is not None else "Invalid timestamp"
+            parsed.append((record.get('habit_id'), record.get('notes'), record.get('mood_score'),
+                           timestamp, columns, error))
+
+        results = []
+        inserts = []
+        by_habit = {}
+        with self.db.transaction() as conn:
+            habit_types = self.owned_habit_types({p[0] for p in parsed if p[5] is None})
+
+            for habit_id, notes, mood_score, timestamp, columns, error in parsed:
+                if error is None and habit_id not in habit_types:
+                    error = "Habit not found or access denied"
+                results.append({'habit_id': habit_id, 'success': error is None, 'error': error})
+                if error is None:
+                    inserts.append((habit_id, timestamp, notes, mood_score) + columns)
+                    by_habit.setdefault(habit_id, []).append(columns[1])
+
+            conn.executemany(
+                f"INSERT INTO Completions ({COMPLETION_INSERT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                inserts
+            )
+            for habit_id, days in by_habit.items():
+                self.streak_state.apply_completions(conn, habit_id, habit_types[habit_id], days)
+                self.bitmaps.apply_completions(conn, habit_id, habit_types[habit_id], days)
+
+        self._invalidate_streaks()
+        return results
+
+    def owned_habit_types(self, habit_ids) -> dict:
+        """
+        Map habit_id -> type for the given ids that belong to the current user.
+        Types come from the metadata cache; ownership is confirmed against
+        Habits on the caller's connection, so call it inside the write
+        transaction.
+        """
+        habits = self.db.habit_cache.get_many(h for h in habit_ids if isinstance(h, int))
+        candidates = [habit_id for habit_id, habit in habits.items() if habit['user_id'] == self.current_user_id]
+
+        owned = set()
+        with self.db.connection() as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(candidates), 500):
+                chunk = candidates[start:start + 500]
+                owned.update(row[0] for row in conn.execute(
+                    f"SELECT habit_id FROM Habits WHERE user_id = ? AND habit_id IN ({', '.join('?' * len(chunk))})",
+                    (self.current_user_id, *chunk)
+                ))
+        for habit_id in set(candidates) - owned:
+            # Deleted elsewhere since it was cached
+            self.db.habit_cache.invalidate(habit_id)
+        return {habit_id: habits[habit_id]['type'] for habit_id in owned}
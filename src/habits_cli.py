@@ -0,0 +1,203 @@
+"""
+Non-interactive habit tracker commands for scripts and cron jobs.
+
+Usage:
+    python -m src.habits_cli login --username alice          # prints a token
+    export HABITS_TOKEN=<token>
+    python -m src.habits_cli checkoff 3 --mood 7
+    python -m src.habits_cli streaks --json
+    python -m src.habits_cli export --output habits.txt
+    python -m src.habits_cli export --format csv --compress gzip --output habits.csv.gz
+    python -m src.habits_cli import old_tracker.jsonl.gz
+    python -m src.habits_cli logout
+
+The database defaults to $HABITS_DB (or habits.db). Heavier modules
+(analytics, export) are only imported by the commands that use them.
+"""
+import argparse
+import os
+import sys
+
+from src.db import Database
+
+
+def _fail(message: str) -> int:
+    print(f"❌ {message}", file=sys.stderr)
+    return 1
+
+
+def cmd_login(db: Database, args) -> int:
+    password = sys.stdin.readline().rstrip("\n") if args.password_stdin else None
+    if password is None:
+        import getpass
+        password = getpass.getpass("Password: ")
+
+    token = db.sessions.login(args.username, password)
+    if token is None:
+        return _fail("Invalid username or password")
+    print(token)
+    return 0
+
+
+def cmd_logout(db: Database, args, user_id: int) -> int:
+    db.sessions.revoke(args.token)
+    print("✅ Logged out; the token no longer works")
+    return 0
+
+
+def cmd_checkoff(db: Database, args, user_id: int) -> int:
+    from src.habit_manager import HabitManager
+
+    manager = HabitManager(db)
+    manager.set_current_user(user_id)
+    try:
+        manager.check_off_habit(args.habit_id, args.notes, args.mood)
+    except ValueError as e:
+        return _fail(str(e))
+    print(f"✅ Habit {args.habit_id} checked off")
+    return 0
+
+
+def cmd_streaks(db: Database, args, user_id: int) -> int:
+    from src.advanced_analytics import AdvancedAnalytics
+
+    streaks = AdvancedAnalytics(db).compute_streaks(user_id)
+    if args.json:
+        import json
+        print(json.dumps([{'habit_id': habit_id, **streak} for habit_id, streak in streaks.items()], indent=2))
+        return 0
+
+    for habit in streaks.values():
+        period = "days" if habit['type'] == "daily" else "weeks"
+        print(f"{habit['name']}: {habit['current_streak']} {period} "
+              f"(longest {habit['longest_streak']})")
+    return 0
+
+
+def cmd_export(db: Database, args, user_id: int) -> int:
+    from src.export import export_completions, write_text_export
+
+    if args.format == 'text':
+        if args.compress:
+            return _fail("--compress needs --format csv or jsonl")
+        if args.output == '-':
+            write_text_export(db, user_id, sys.stdout)
+            return 0
+        with open(args.output, 'w', encoding='utf-8') as f:
+            write_text_export(db, user_id, f)
+        print(f"✅ Data exported to {args.output}")
+        return 0
+
+    if args.output == '-':
+        if args.compress:
+            return _fail("--output - writes uncompressed data; pick a file name to use --compress")
+        export_completions(db, user_id, sys.stdout, args.format)
+        return 0
+
+    def progress(rows):
+        print(f"\r{rows} completions written", end="", file=sys.stderr, flush=True)
+
+    try:
+        rows = export_completions(db, user_id, args.output, args.format, args.compress,
+                                  progress=None if args.quiet else progress)
+    except ValueError as e:
+        return _fail(str(e))
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"✅ {rows} completions exported to {args.output}")
+    return 0
+
+
+def cmd_import(db: Database, args, user_id: int) -> int:
+    from src.habit_manager import HabitManager
+    from src.importer import BULK_THRESHOLD_BYTES, CompletionImporter
+
+    manager = HabitManager(db)
+    manager.set_current_user(user_id)
+
+    def progress(stats):
+        print(f"\r{stats['read']} rows read, {stats['imported']} imported "
+              f"({stats['rows_per_second']} rows/sec)", end="", file=sys.stderr, flush=True)
+
+    importer = CompletionImporter(manager, chunk_size=args.chunk_size, progress=None if args.quiet else progress)
+    try:
+        if not args.bulk and os.path.getsize(args.path) > BULK_THRESHOLD_BYTES:
+            print("💡 Large file: --bulk loads faster if nothing else writes to the database meanwhile",
+                  file=sys.stderr)
+        stats = importer.import_file(args.path, args.format, args.bulk)
+    except (OSError, ValueError) as e:
+        return _fail(str(e))
+    if not args.quiet:
+        print(file=sys.stderr)
+
+    for error in stats['errors']:
+        print(f"⚠️  row {error['row']}: {error['error']}", file=sys.stderr)
+    print(f"✅ {stats['imported']} imported, {stats['duplicates']} duplicates skipped, "
+          f"{stats['rejected']} rejected in {stats['seconds']}s ({stats['rows_per_second']} rows/sec)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="habits", description="Habit tracker commands")
+    parser.add_argument("--db", default=os.environ.get("HABITS_DB", "habits.db"),
+                        help="path to the SQLite database (default: $HABITS_DB or habits.db)")
+    parser.add_argument("--token", default=os.environ.get("HABITS_TOKEN"),
+                        help="token from 'habits login' (default: $HABITS_TOKEN)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    login = subparsers.add_parser("login", help="start a session and print its token for the other commands")
+    login.add_argument("--username", required=True)
+    login.add_argument("--password-stdin", action="store_true", help="read the password from stdin")
+    login.set_defaults(handler=cmd_login, needs_user=False)
+
+    logout = subparsers.add_parser("logout", help="end the session of --token")
+    logout.set_defaults(handler=cmd_logout, needs_user=True)
+
+    checkoff = subparsers.add_parser("checkoff", help="record a completion")
+    checkoff.add_argument("habit_id", type=int)
+    checkoff.add_argument("--notes")
+    checkoff.add_argument("--mood", type=int, help="mood score 1-10")
+    checkoff.set_defaults(handler=cmd_checkoff, needs_user=True)
+
+    streaks = subparsers.add_parser("streaks", help="show current and longest streaks")
+    streaks.add_argument("--json", action="store_true", help="machine-readable output")
+    streaks.set_defaults(handler=cmd_streaks, needs_user=True)
+
+    export = subparsers.add_parser("export", help="export habit data")
+    export.add_argument("--format", choices=("text", "csv", "jsonl"), default="text")
+    export.add_argument("--compress", choices=("gzip", "zstd"), help="compress csv/jsonl output")
+    export.add_argument("--output", default="habit_export.txt", help="file to write (- for stdout, uncompressed)")
+    export.add_argument("--quiet", action="store_true", help="no progress output")
+    export.set_defaults(handler=cmd_export, needs_user=True)
+
+    import_ = subparsers.add_parser("import", help="load completions from a CSV/JSONL file")
+    import_.add_argument("path", help=".csv or .jsonl, optionally .gz/.zst compressed")
+    import_.add_argument("--format", choices=("csv", "jsonl"), help="default: from the file extension")
+    import_.add_argument("--chunk-size", type=int, default=50000, help="rows per transaction")
+    import_.add_argument("--bulk", action="store_true",
+                         help="drop indexes and triggers during the load (offline migrations only)")
+    import_.add_argument("--quiet", action="store_true", help="no progress output")
+    import_.set_defaults(handler=cmd_import, needs_user=True)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    # One connection is plenty for a single command
+    db = Database(args.db, pool_size=1)
+    try:
+        if not args.needs_user:
+            return args.handler(db, args)
+
+        user_id = db.sessions.validate(args.token)
+        if user_id is None:
+            return _fail("Missing, expired or invalid token; run 'habits login' or set HABITS_TOKEN")
+        return args.handler(db, args, user_id)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
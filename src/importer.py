@@ -0,0 +1,216 @@
+"""
+Bulk import of historical completions from CSV or JSON Lines files.
+
+Files use the export columns (see export.py); only habit_id and timestamp
+are required, notes and mood_score are optional and anything else is
+ignored. Files may be gzip (.gz) or zstd (.zst) compressed.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from datetime import timezone
+from typing import Callable, Iterator, Optional
+from src.habit_manager import HabitManager
+from src.maintenance import rebuild_derived_tables
+from src.periods import completion_columns, parse_timestamp
+
+DEFAULT_CHUNK_SIZE = 50000
+# Files larger than this get a --bulk suggestion from the habits CLI
+BULK_THRESHOLD_BYTES = 64 * 1024 * 1024
+# The (habit_id, timestamp) index doubles as the duplicate check, so it stays
+DEDUPE_INDEX = 'idx_habit_timestamp'
+MAX_REPORTED_ERRORS = 100
+
+
+def _open_text(path: str):
+    """Open path for text reading, decompressing .gz and .zst files."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd files require the 'zstandard' package")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def detect_format(path: str) -> str:
+    """'csv' or 'jsonl' from the file extension (ignoring .gz/.zst)."""
+    root, ext = os.path.splitext(path)
+    if ext in ('.gz', '.zst'):
+        root, ext = os.path.splitext(root)
+    if ext == '.csv':
+        return 'csv'
+    if ext in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Cannot tell the format of '{path}'; pass 'csv' or 'jsonl'")
+
+
+def iter_records(path: str, fmt: str) -> Iterator[dict]:
+    """Yield one dict per input row, streaming the file."""
+    with _open_text(path) as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        elif fmt == 'jsonl':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unknown import format '{fmt}'")
+
+
+def _normalize_timestamp(value) -> Optional[str]:
+    """
+    Canonical 'YYYY-MM-DD HH:MM:SS' UTC text (as stored by check-offs), so
+    '2025-01-01T08:00:00Z' and '2025-01-01 08:00:00' dedupe against each other.
+    """
+    completed = parse_timestamp(value)
+    if completed is None:
+        return None
+    if completed.tzinfo is not None:
+        completed = completed.astimezone(timezone.utc).replace(tzinfo=None)
+    return completed.isoformat(sep=' ')
+
+
+def _optional_int(value) -> Optional[int]:
+    if value is None or value == '':
+        return None
+    return int(value)
+
+
+class CompletionImporter:
+    """
+    Streams a file into Completions for the manager's current user.
+
+    Rows are validated and deduplicated on (habit_id, timestamp), both
+    within the file and against existing completions, then inserted one
+    chunk per transaction. Derived tables are rebuilt for the imported
+    habits at the end (for every habit after a bulk load).
+    """
+
+    def __init__(self, manager: HabitManager, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 progress: Optional[Callable[[dict], None]] = None):
+        if not manager.current_user_id:
+            raise ValueError("No user logged in")
+        self.manager = manager
+        self.db = manager.db
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self._habit_types = {}  # ownership cache: habit_id -> type, None if not the user's
+
+    def import_file(self, path: str, fmt: Optional[str] = None, bulk: bool = False) -> dict:
+        """
+        Import path and return counts and throughput. bulk drops secondary
+        indexes and every user's triggers for the load, so it is only for
+        offline migrations: writes by anyone else meanwhile skip derived-table
+        maintenance. All derived tables are rebuilt afterwards to cover them.
+        """
+        fmt = fmt or detect_format(path)
+
+        stats = {'read': 0, 'imported': 0, 'duplicates': 0, 'rejected': 0, 'errors': []}
+        touched = set()
+        started = time.perf_counter()
+
+        try:
+            if bulk:
+                self.db.drop_indexes(keep=(DEDUPE_INDEX,))
+                self.db.drop_triggers()
+            chunk = []
+            for line_number, record in enumerate(iter_records(path, fmt), start=1):
+                stats['read'] += 1
+                row, error = self._validate(record)
+                if error is not None:
+                    stats['rejected'] += 1
+                    if len(stats['errors']) < MAX_REPORTED_ERRORS:
+                        stats['errors'].append({'row': line_number, 'error': error})
+                    continue
+                chunk.append((line_number, row))
+                if len(chunk) >= self.chunk_size:
+                    self._load_chunk(chunk, stats, touched, started)
+            self._load_chunk(chunk, stats, touched, started)
+        finally:
+            if bulk:
+                self.db.init_db(force=True)
+                rebuild_derived_tables(self.db)
+            elif touched:
+                rebuild_derived_tables(self.db, sorted(touched))
+
+        elapsed = time.perf_counter() - started
+        stats['bulk'] = bulk
+        stats['seconds'] = round(elapsed, 2)
+        stats['rows_per_second'] = round(stats['read'] / elapsed) if elapsed else 0
+        return stats
+
+    def _validate(self, record: dict):
+        """(insert row, None) or (None, reason) for one input record."""
+        try:
+            habit_id = int(record.get('habit_id'))
+            mood_score = _optional_int(record.get('mood_score'))
+        except (TypeError, ValueError):
+            return None, "Invalid habit_id or mood_score"
+
+        timestamp = _normalize_timestamp(record.get('timestamp'))
+        if timestamp is None:
+            return None, "Invalid timestamp"
+
+        notes = record.get('notes') or None
+        return (habit_id, timestamp, notes, mood_score) + completion_columns(timestamp), None
+
+    def _load_chunk(self, chunk: list, stats: dict, touched: set, started: float):
+        """Check ownership, stage and insert one chunk in its own transaction."""
+        if not chunk:
+            return
+        with self.db.transaction() as conn:
+            unknown = {row[0] for _, row in chunk} - self._habit_types.keys()
+            if unknown:
+                owned = self.manager.owned_habit_types(unknown)
+                self._habit_types.update({habit_id: owned.get(habit_id) for habit_id in unknown})
+
+            rows = []
+            for line_number, row in chunk:
+                if self._habit_types[row[0]] is not None:
+                    rows.append(row)
+                    continue
+                stats['rejected'] += 1
+                if len(stats['errors']) < MAX_REPORTED_ERRORS:
+                    stats['errors'].append({'row': line_number, 'error': "Habit not found or access denied"})
+
+            # Staging collapses duplicates inside the file; NOT EXISTS skips
+            # rows already in Completions (including earlier chunks)
+            conn.execute(
+                """
+                CREATE TEMP TABLE IF NOT EXISTS import_staging (
+                    habit_id INTEGER, timestamp TEXT, notes TEXT, mood_score INTEGER,
+                    ts_epoch INTEGER, day_number INTEGER, iso_week_key INTEGER,
+                    PRIMARY KEY (habit_id, timestamp)
+                )
+                """
+            )
+            conn.execute("DELETE FROM import_staging")
+            conn.executemany("INSERT OR IGNORE INTO import_staging VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            inserted = conn.execute(
+                """
+                INSERT INTO Completions
+                    (habit_id, timestamp, notes, mood_score, ts_epoch, day_number, iso_week_key)
+                SELECT * FROM import_staging s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM Completions c WHERE c.habit_id = s.habit_id AND c.timestamp = s.timestamp
+                )
+                """
+            ).rowcount
+            conn.execute("DELETE FROM import_staging")
+
+        stats['imported'] += inserted
+        stats['duplicates'] += len(rows) - inserted
+        touched.update(row[0] for row in rows)
+        chunk.clear()
+
+        if self.progress is not None:
+            elapsed = time.perf_counter() - started
+            self.progress({'read': stats['read'], 'imported': stats['imported'],
+                           'rows_per_second': round(stats['read'] / elapsed) if elapsed else 0})
@@ -0,0 +1,225 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Optional
+
+
+# Frames that only carry a statement to SQLite, not "the API method that ran
+# the query": Database.connection()/transaction() (their BEGIN and COMMIT)
+# and contextlib, besides the proxies below (see _PROXY_CODES).
+_WRAPPER_FUNCTIONS = ('connection', 'transaction')
+_ANONYMOUS = ('<lambda>', '<genexpr>', '<listcomp>', '<dictcomp>', '<setcomp>')
+_WHITESPACE = re.compile(r'\s+')
+
+slow_query_logger = logging.getLogger("habit_tracker.slow_queries")
+
+
+def _normalize(sql: str) -> str:
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def _is_wrapper(code) -> bool:
+    return (code in _PROXY_CODES or code.co_name in _WRAPPER_FUNCTIONS
+            or os.path.basename(code.co_filename) == 'contextlib.py')
+
+
+def _calling_method() -> str:
+    """
+    Name of the first public frame above the wrappers, e.g.
+    'HabitManager.list_habits': private helpers and comprehensions are
+    reported as the method that called them.
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        if not (_is_wrapper(code) or code.co_name.startswith('_') or code.co_name in _ANONYMOUS):
+            return getattr(code, 'co_qualname', code.co_name)
+        frame = frame.f_back
+    return '<unknown>'
+
+
+class QueryStats:
+    """
+    Thread-safe aggregate of every SQL statement run while instrumentation
+    is on: counts, time (execute plus fetches) and rows, grouped by statement
+    text and by calling API method.
+    """
+
+    def __init__(self, slow_query_ms: float = 100.0):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.statements = 0
+            self.total_ms = 0.0
+            self.slow_queries = 0
+            self.by_statement = {}
+            self.by_caller = {}
+
+    def record(self, sql: str, caller: str, duration_ms: float, rows: int = 0):
+        """Count one executed statement."""
+        key = _normalize(sql)
+        with self._lock:
+            self.statements += 1
+            self.total_ms += duration_ms
+            entry = self.by_statement.get(key)
+            if entry is None:
+                entry = self.by_statement[key] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0}
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['rows'] += rows
+
+            caller_entry = self.by_caller.setdefault(caller, {'count': 0, 'total_ms': 0.0})
+            caller_entry['count'] += 1
+            caller_entry['total_ms'] += duration_ms
+
+        if duration_ms >= self.slow_query_ms:
+            with self._lock:
+                self.slow_queries += 1
+            slow_query_logger.warning("%.1f ms in %s: %s", duration_ms, caller, key)
+
+    def add_fetch(self, sql: str, caller: str, duration_ms: float, rows: int):
+        """Attribute rows (and fetch time) to a statement that already ran."""
+        key = _normalize(sql)
+        with self._lock:
+            self.total_ms += duration_ms
+            entry = self.by_statement.get(key)
+            if entry is not None:
+                entry['total_ms'] += duration_ms
+                entry['rows'] += rows
+            caller_entry = self.by_caller.get(caller)
+            if caller_entry is not None:
+                caller_entry['total_ms'] += duration_ms
+
+    def snapshot(self) -> dict:
+        """Copy of the counters, statements sorted by total time."""
+        with self._lock:
+            statements = sorted(self.by_statement.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+            return {
+                'statements': self.statements,
+                'total_ms': round(self.total_ms, 3),
+                'slow_queries': self.slow_queries,
+                'by_statement': {sql: dict(entry) for sql, entry in statements},
+                'by_caller': {caller: dict(entry) for caller, entry in self.by_caller.items()},
+            }
+
+
+class InstrumentedCursor:
+    """Cursor wrapper that reports executes and fetched rows to QueryStats."""
+
+    def __init__(self, cursor, stats: QueryStats):
+        self._cursor = cursor
+        self._stats = stats
+        self._sql = None
+        self._caller = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def execute(self, sql, parameters=()):
+        self._sql, self._caller = sql, _calling_method()
+        start = time.perf_counter()
+        self._cursor.execute(sql, parameters)
+        self._stats.record(sql, self._caller, (time.perf_counter() - start) * 1000)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._sql, self._caller = sql, _calling_method()
+        start = time.perf_counter()
+        self._cursor.executemany(sql, seq_of_parameters)
+        self._stats.record(sql, self._caller, (time.perf_counter() - start) * 1000,
+                           max(self._cursor.rowcount, 0))
+        return self
+
+    def executescript(self, script):
+        self._sql, self._caller = script, _calling_method()
+        start = time.perf_counter()
+        self._cursor.executescript(script)
+        self._stats.record(script, self._caller, (time.perf_counter() - start) * 1000)
+        return self
+
+    def _fetched(self, start: float, rows: int):
+        if self._sql is not None:
+            self._stats.add_fetch(self._sql, self._caller, (time.perf_counter() - start) * 1000, rows)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(start, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(size if size is not None else self._cursor.arraysize)
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+
+class InstrumentedConnection:
+    """Connection wrapper whose cursors report to QueryStats."""
+
+    def __init__(self, conn, stats: QueryStats):
+        self._conn = conn
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    def cursor(self, *args):
+        return InstrumentedCursor(self._conn.cursor(*args), self._stats)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+
+_PROXY_CODES = frozenset(
+    member.__code__
+    for proxy in (InstrumentedCursor, InstrumentedConnection)
+    for member in vars(proxy).values()
+    if hasattr(member, '__code__')
+)
+
+
+def configure_slow_query_log(path: Optional[str]):
+    """Send slow-query warnings to ``path`` (once per path)."""
+    if path is None:
+        return
+    target = os.path.abspath(path)
+    for handler in slow_query_logger.handlers:
+        if isinstance(handler, logging.FileHandler) and handler.baseFilename == target:
+            return
+    handler = logging.FileHandler(target, encoding='utf-8')
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_query_logger.addHandler(handler)
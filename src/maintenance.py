@@ -0,0 +1,48 @@
+"""
+Maintenance commands for tables derived from Completions.
+
+Usage: python -m src.maintenance [--db habits.db] rebuild
+"""
+import argparse
+from src.bitmap import CompletionBitmapStore
+from src.db import Database
+from src.rollups import CompletionRollupStore
+from src.streak_state import StreakStateStore
+
+
+def rebuild_derived_tables(db: Database, habit_ids=None) -> dict:
+    """
+    Recompute every derived table from Completions.
+    Run after writing completions with raw SQL instead of HabitManager.
+    """
+    habit_ids = None if habit_ids is None else list(habit_ids)
+    # Streak state is computed from the rollups, so they go first
+    counts = {
+        'completion_rollup': CompletionRollupStore(db).rebuild(habit_ids),
+        'streak_state': StreakStateStore(db).rebuild(habit_ids),
+        'completion_bitmap': CompletionBitmapStore(db).rebuild(habit_ids),
+    }
+    db.streak_cache.invalidate()
+    # Other processes only learn about the rebuild through the data versions
+    db.bump_data_versions()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Habit tracker maintenance")
+    parser.add_argument("--db", default="habits.db", help="path to the SQLite database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="recompute derived tables from Completions")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    try:
+        if args.command == "rebuild":
+            for table, count in rebuild_derived_tables(db).items():
+                print(f"✅ Rebuilt {table}: {count} rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Nightly analytics job: streak and success statistics for every habit of
+every user, written to HabitSummary in one bulk transaction.
+
+Users are split into contiguous user_id ranges and spread over a process
+pool. Each worker opens its own read-only connection and runs the batch
+report for its ranges; only the parent process writes.
+
+Usage: python -m src.nightly [--db habits.db] [--workers N] [--window 30] [--backend numpy|python]
+"""
+import argparse
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import List, Optional, Tuple
+from src.advanced_analytics import report_habits
+from src.db import Database
+from src.periods import utc_today
+from src.vectorized import BACKENDS, resolve_backend
+
+SUMMARY_COLUMNS = ('habit_id', 'user_id', 'report_date', 'current_streak', 'longest_streak',
+                   'completions', 'periods_completed', 'success_rate', 'rolling_rate')
+
+# Ranges per worker; more than one evens out users with very different history sizes
+CHUNKS_PER_WORKER = 4
+
+
+def partition_users(user_ids: List[int], chunks: int) -> List[Tuple[int, int]]:
+    """Split sorted user ids into at most ``chunks`` inclusive (first, last) ranges of similar size."""
+    if not user_ids:
+        return []
+    chunks = max(1, min(chunks, len(user_ids)))
+    size, extra = divmod(len(user_ids), chunks)
+    ranges, start = [], 0
+    for chunk in range(chunks):
+        end = start + size + (chunk < extra)
+        ranges.append((user_ids[start], user_ids[end - 1]))
+        start = end
+    return ranges
+
+
+def summarize_users(db_path: str, users: Tuple[int, int], today: date, window: int,
+                    backend: Optional[str]) -> dict:
+    """
+    Worker: summary rows for the habits of one user_id range, read over a
+    read-only connection of its own.
+    """
+    started = time.perf_counter()
+    # as_uri() percent-encodes '?', '#' and '%' that would otherwise end the path
+    conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        report = report_habits(conn, today, window, backend, users)
+    finally:
+        conn.close()
+
+    report_date = today.isoformat()
+    rows = [
+        (habit_id, stats['user_id'], report_date, stats['current_streak'], stats['longest_streak'],
+         stats['completions'], stats['periods_completed'], stats['success_rate'], stats['rolling_rate'])
+        for habit_id, stats in report.items()
+    ]
+    return {
+        'worker': os.getpid(),
+        'users': len({row[1] for row in rows}),
+        'rows': rows,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def run_nightly_job(db_path: str, workers: Optional[int] = None, window: int = 30,
+                    backend: Optional[str] = None, today: Optional[date] = None) -> dict:
+    """
+    Summarize every active habit into HabitSummary, replacing the previous
+    run. Returns totals plus per-worker users, habits, seconds and
+    habits/sec.
+    """
+    workers = workers or os.cpu_count() or 1
+    today = today or utc_today()
+    backend = resolve_backend(backend)  # fail here rather than in every worker
+    started = time.perf_counter()
+
+    db = Database(db_path)
+    try:
+        with db.connection() as conn:
+            user_ids = [row[0] for row in conn.execute("SELECT user_id FROM Users ORDER BY user_id")]
+        ranges = partition_users(user_ids, workers * CHUNKS_PER_WORKER)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(summarize_users, db_path, users, today, window, backend) for users in ranges]
+            results = [future.result() for future in futures]
+
+        rows = [row for result in results for row in result['rows']]
+        with db.transaction() as conn:
+            conn.execute("DELETE FROM HabitSummary")
+            conn.executemany(
+                f"INSERT INTO HabitSummary ({', '.join(SUMMARY_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(SUMMARY_COLUMNS))})",
+                rows
+            )
+    finally:
+        db.close()
+
+    per_worker = {}
+    for result in results:
+        worker = per_worker.setdefault(result['worker'], {'users': 0, 'habits': 0, 'seconds': 0.0})
+        worker['users'] += result['users']
+        worker['habits'] += len(result['rows'])
+        worker['seconds'] += result['seconds']
+    for worker in per_worker.values():
+        worker['habits_per_second'] = round(worker['habits'] / worker['seconds']) if worker['seconds'] else 0
+
+    return {
+        'users': len(user_ids),
+        'habits': len(rows),
+        'seconds': round(time.perf_counter() - started, 3),
+        'workers': per_worker,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nightly habit analytics")
+    parser.add_argument("--db", default="habits.db", help="path to the SQLite database")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--window", type=int, default=30, help="days/weeks in the rolling completion rate")
+    parser.add_argument("--backend", choices=BACKENDS, default=None, help="statistics backend (default: numpy if installed)")
+    args = parser.parse_args()
+
+    stats = run_nightly_job(args.db, args.workers, args.window, args.backend)
+    print(f"✅ Summarized {stats['habits']} habits of {stats['users']} users in {stats['seconds']:.2f}s")
+    for pid, worker in sorted(stats['workers'].items()):
+        print(f"   worker {pid}: {worker['users']} users, {worker['habits']} habits, "
+              f"{worker['habits_per_second']} habits/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from datetime import date, datetime, timezone
+from typing import Optional, Tuple
+
+
+# Day 0 is 1970-01-01, a Thursday; shifting by 3 makes weeks start on Monday
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+WEEK_OFFSET = 3
+
+# SQL twins of completion_columns(), used by the schema migration and the
+# insert trigger. The day is the date written in the timestamp (what
+# datetime.fromisoformat(...).date() gives); epoch seconds are UTC, with
+# naive timestamps taken as UTC like SQLite's CURRENT_TIMESTAMP. Stored
+# timestamps are UTC, so day numbers are UTC days, and everything that
+# compares them with "today" uses utc_today().
+DAY_NUMBER_SQL = "CAST(julianday(substr({column}, 1, 10)) - 2440587.5 AS INTEGER)"
+WEEK_NUMBER_SQL = "((" + DAY_NUMBER_SQL + " + 3) / 7)"
+EPOCH_SECONDS_SQL = "CAST(strftime('%s', {column}) AS INTEGER)"
+
+# Period number of a Completions row (alias c) for its habit (alias h)
+HABIT_PERIOD_SQL = "CASE h.type WHEN 'weekly' THEN c.iso_week_key ELSE c.day_number END"
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """Parse a stored completion timestamp, tolerating 'Z' suffixes."""
+    if not value:  # Only process if timestamp is not None
+        return None
+    timestamp_str = str(value)
+    try:
+        # Handle different timestamp formats
+        if 'Z' in timestamp_str:
+            return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+        return datetime.fromisoformat(timestamp_str)
+    except ValueError as e:
+        print(f"Warning: Could not parse timestamp '{timestamp_str}': {e}")
+        return None
+
+
+def utc_timestamp() -> str:
+    """Current UTC time in the same format as SQLite's CURRENT_TIMESTAMP."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def utc_today() -> date:
+    """Today's UTC date, the day that completions checked off now are filed under."""
+    return datetime.now(timezone.utc).date()
+
+
+def day_number(day: date) -> int:
+    """Days since 1970-01-01."""
+    return day.toordinal() - EPOCH_ORDINAL
+
+
+def week_number(day: date) -> int:
+    """Monday-start weeks since the week containing 1970-01-01."""
+    return (day_number(day) + WEEK_OFFSET) // 7
+
+
+def period_number(day: date, habit_type: str) -> int:
+    """Consecutive integer for the day (daily habits) or week (weekly habits)."""
+    if habit_type == 'weekly':
+        return week_number(day)
+    return day_number(day)
+
+
+def period_of_day(day: int, habit_type: str) -> int:
+    """period_number() for a day given as a day number."""
+    if habit_type == 'weekly':
+        return (day + WEEK_OFFSET) // 7
+    return day
+
+
+def completion_columns(timestamp) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """
+    (ts_epoch, day_number, iso_week_key) for a completion timestamp,
+    matching what the database computes for rows inserted without them.
+    """
+    completed = parse_timestamp(timestamp)
+    if completed is None:
+        return None, None, None
+    day = day_number(completed.date())
+    if completed.tzinfo is None:
+        # Naive timestamps are UTC, like SQLite's CURRENT_TIMESTAMP
+        epoch = day * 86400 + completed.hour * 3600 + completed.minute * 60 + completed.second
+    else:
+        epoch = int(completed.timestamp())
+    return epoch, day, period_of_day(day, 'weekly')
@@ -0,0 +1,173 @@
+"""
+Load a user's habits as DailyHabit/WeeklyHabit objects with their
+completions, so analytics can work on in-memory objects instead of
+re-querying per habit.
+
+The eager path streams one ordered join of Habits and Completions and
+groups it by habit as it goes. The lazy path loads the habits only; each
+habit's completion_records then fetches its rows a page at a time as it
+is read.
+
+    habits = HabitRepository(db).load_user_habits(user_id)
+    for habit in habits:
+        print(habit.name, len(habit.completion_records))
+"""
+from datetime import datetime
+from itertools import groupby
+from typing import Iterator, List, Optional
+from src.db import Database
+from src.habit import HABIT_CLASSES, BaseHabit, CompletionLog
+
+FETCH_SIZE = 1000
+PAGE_SIZE = 1000
+
+
+def _user_filter(include_inactive: bool) -> str:
+    return "h.user_id = ?" if include_inactive else "h.user_id = ? AND h.is_active = TRUE"
+
+
+def _habit(habit_id: int, name: str, habit_type: str, created_at: Optional[str]) -> BaseHabit:
+    habit_class = HABIT_CLASSES.get(habit_type)
+    if habit_class is None:
+        raise ValueError(f"Habit {habit_id} has unknown type '{habit_type}'")
+    return habit_class(name, datetime.fromisoformat(created_at) if created_at else None, habit_id)
+
+
+class PagedCompletionLog(CompletionLog):
+    """
+    A CompletionLog that fills itself from the database on demand, in
+    chronological pages of page_size rows. Iterating or indexing from the
+    front only loads the pages it reaches; len(), negative indexes and
+    appends load everything first.
+    """
+    __slots__ = ('_db', '_habit_id', '_page_size', '_after', '_complete', 'pages_loaded')
+
+    def __init__(self, db: Database, habit_id: int, page_size: int = PAGE_SIZE):
+        super().__init__()
+        self._db = db
+        self._habit_id = habit_id
+        self._page_size = page_size
+        self._after = ('', 0)  # (timestamp, completion_id) of the last row loaded
+        self._complete = False
+        self.pages_loaded = 0
+
+    def _load_page(self):
+        with self._db.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT timestamp, completion_id, ts_epoch, notes, mood_score
+                FROM Completions
+                WHERE habit_id = ? AND (timestamp, completion_id) > (?, ?)
+                ORDER BY timestamp, completion_id
+                LIMIT ?
+                """,
+                (self._habit_id, *self._after, self._page_size)
+            ).fetchall()
+        for _, _, ts_epoch, notes, mood_score in rows:
+            if ts_epoch is not None:  # unparseable timestamps have no time to store
+                self.record_epoch(ts_epoch, notes, mood_score)
+        if rows:
+            self._after = rows[-1][:2]
+        self._complete = len(rows) < self._page_size
+        self.pages_loaded += 1
+
+    def _load_all(self):
+        while not self._complete:
+            self._load_page()
+
+    def record(self, timestamp: datetime, notes: Optional[str] = None, mood_score: Optional[int] = None):
+        self._load_all()
+        super().record(timestamp, notes, mood_score)
+
+    def timestamps(self):
+        self._load_all()
+        return super().timestamps()
+
+    def __len__(self) -> int:
+        self._load_all()
+        return super().__len__()
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and index >= 0:
+            while index >= len(self._timestamps) and not self._complete:
+                self._load_page()
+        else:
+            self._load_all()
+        return super().__getitem__(index)
+
+    def __iter__(self):
+        index = 0
+        while True:
+            while index < len(self._timestamps):
+                yield self[index]
+                index += 1
+            if self._complete:
+                return
+            self._load_page()
+
+
+class HabitRepository:
+    """Builds habit objects for one user from the database."""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def iter_user_habits(self, user_id: int, include_inactive: bool = False) -> Iterator[BaseHabit]:
+        """
+        Yield the user's habits, ordered by habit_id, each with all of its
+        completions in chronological order. One query; only the habit being
+        assembled and one fetch batch are held besides what the caller keeps.
+        Holds a pooled connection until the iterator is exhausted or closed.
+        """
+        with self.db.connection() as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT h.habit_id, h.name, h.type, h.created_at, c.ts_epoch, c.notes, c.mood_score
+                FROM Habits h
+                LEFT JOIN Completions c ON c.habit_id = h.habit_id
+                WHERE {_user_filter(include_inactive)}
+                ORDER BY h.habit_id, c.timestamp, c.completion_id
+                """,
+                (user_id,)
+            )
+            for _, rows in groupby(_fetch_all(cursor), key=lambda row: row[0]):
+                habit = None
+                for row in rows:
+                    if habit is None:
+                        habit = _habit(*row[:4])
+                    if row[4] is not None:  # LEFT JOIN padding, or an unparseable timestamp
+                        habit.completion_records.record_epoch(row[4], row[5], row[6])
+                yield habit
+
+    def load_user_habits(self, user_id: int, lazy: bool = False, page_size: int = PAGE_SIZE,
+                         include_inactive: bool = False) -> List[BaseHabit]:
+        """
+        The user's habits with their completions. With lazy set, only the
+        habits are read now and completion_records pages in on first use.
+        """
+        if not lazy:
+            return list(self.iter_user_habits(user_id, include_inactive))
+
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT h.habit_id, h.name, h.type, h.created_at FROM Habits h
+                WHERE {_user_filter(include_inactive)}
+                ORDER BY h.habit_id
+                """,
+                (user_id,)
+            ).fetchall()
+        habits = []
+        for row in rows:
+            habit = _habit(*row)
+            habit.completion_records = PagedCompletionLog(self.db, row[0], page_size)
+            habits.append(habit)
+        return habits
+
+
+def _fetch_all(cursor) -> Iterator[tuple]:
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            return
+        yield from rows
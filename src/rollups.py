@@ -0,0 +1,74 @@
+from typing import Iterable, List, Optional
+from src.db import Database, ROLLUP_AGGREGATE_SQL, ROLLUP_COLUMNS
+
+
+class CompletionRollupStore:
+    """
+    Per-period completion summaries (CompletionRollup): one row per day for
+    daily habits and per week for weekly habits, with the completion count,
+    first/last completion time and mood totals. Triggers on Completions keep
+    it current, so analytics read one row per period instead of every
+    completion.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def completion_count(self, habit_id: int) -> int:
+        """Total completions of a habit."""
+        with self.db.connection() as conn:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(completion_count), 0) FROM CompletionRollup WHERE habit_id = ?",
+                (habit_id,)
+            ).fetchone()
+        return row[0]
+
+    def period_keys(self, habit_id: int) -> List[int]:
+        """Sorted day (daily) or week (weekly) numbers the habit was completed in."""
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                "SELECT period_key FROM CompletionRollup WHERE habit_id = ? ORDER BY period_key",
+                (habit_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_periods(self, habit_id: int) -> List[dict]:
+        """Every rollup row of a habit, oldest period first."""
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT period_key, completion_count, first_ts_epoch, last_ts_epoch, mood_sum, mood_count
+                FROM CompletionRollup WHERE habit_id = ? ORDER BY period_key
+                """,
+                (habit_id,)
+            ).fetchall()
+        return [
+            {'period_key': row[0], 'completion_count': row[1], 'first_ts_epoch': row[2],
+             'last_ts_epoch': row[3], 'mood_sum': row[4], 'mood_count': row[5]}
+            for row in rows
+        ]
+
+    def rebuild(self, habit_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recompute rollups from Completions for the given habits (default: all).
+        Returns the number of rollup rows written.
+        """
+        with self.db.transaction() as conn:
+            return self._rebuild(conn, None if habit_ids is None else list(habit_ids))
+
+    def _rebuild(self, conn, habit_ids: Optional[List[int]]) -> int:
+        if habit_ids is None:
+            conn.execute("DELETE FROM CompletionRollup")
+            where, params = '', ()
+        else:
+            if not habit_ids:
+                return 0
+            placeholders = ', '.join('?' * len(habit_ids))
+            conn.execute(f"DELETE FROM CompletionRollup WHERE habit_id IN ({placeholders})", habit_ids)
+            where, params = f"AND c.habit_id IN ({placeholders})", tuple(habit_ids)
+
+        cursor = conn.execute(
+            f"INSERT INTO CompletionRollup ({ROLLUP_COLUMNS}) {ROLLUP_AGGREGATE_SQL.format(where=where)}",
+            params
+        )
+        return cursor.rowcount
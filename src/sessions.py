@@ -0,0 +1,117 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Sessions last a month; validated tokens are trusted from memory for five minutes
+SESSION_TTL = 30 * 24 * 3600
+CACHE_TTL = 300
+
+
+def _token_hash(token: str) -> str:
+    """Only a digest of each token is stored, so a copy of the database holds no usable tokens."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class SessionStore:
+    """
+    Login sessions, one per Database (db.sessions). login() checks the
+    password once and issues an opaque token stored (hashed) in the
+    Sessions table with an expiry; validate() answers from a bounded
+    in-memory TTL cache, so checking a token on every request is a
+    dictionary lookup instead of a password hash plus query.
+
+    Revoking through this store drops the cached entry at once. Other
+    processes sharing the database notice a revocation within cache_ttl
+    seconds.
+    """
+
+    def __init__(self, db, ttl: int = SESSION_TTL, cache_ttl: int = CACHE_TTL, max_size: int = 4096):
+        self.db = db
+        self.ttl = ttl
+        self.cache_ttl = cache_ttl
+        self.max_size = max_size
+        self._cache = OrderedDict()  # token -> (user_id, trusted until)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def login(self, username: str, password: str) -> Optional[str]:
+        """Authenticate and open a session; returns its token, or None for bad credentials."""
+        user_id = self.db.authenticate_user(username, password)
+        if user_id is None:
+            return None
+        return self.create(user_id)
+
+    def create(self, user_id: int) -> str:
+        """Open a session for an already authenticated user."""
+        # Only needed here, so commands that just validate a token don't import it (and random)
+        import secrets
+
+        # Hex rather than urlsafe base64, which can start with '-' and then reads as an option to 'habits --token'
+        token = secrets.token_hex(32)
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO Sessions (token_hash, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (_token_hash(token), user_id, int(now), int(now + self.ttl))
+            )
+        self._remember(token, user_id, now + self.ttl, now)
+        return token
+
+    def validate(self, token: str) -> Optional[int]:
+        """The user_id of a live session, or None if the token is unknown, expired or revoked."""
+        if not token:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(token)
+            if entry is not None and entry[1] > now:
+                self.hits += 1
+                self._cache.move_to_end(token)
+                return entry[0]
+            self.misses += 1
+
+        with self.db.connection() as conn:
+            row = conn.execute(
+                "SELECT user_id, expires_at FROM Sessions WHERE token_hash = ? AND expires_at > ?",
+                (_token_hash(token), int(now))
+            ).fetchone()
+        if row is None:
+            with self._lock:
+                self._cache.pop(token, None)
+            return None
+        self._remember(token, row[0], row[1], now)
+        return row[0]
+
+    def _remember(self, token: str, user_id: int, expires_at: float, now: float):
+        with self._lock:
+            self._cache[token] = (user_id, min(expires_at, now + self.cache_ttl))
+            self._cache.move_to_end(token)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def revoke(self, token: str) -> bool:
+        """End one session (logout). Returns whether it existed."""
+        with self._lock:
+            self._cache.pop(token, None)
+        with self.db.transaction() as conn:
+            return conn.execute("DELETE FROM Sessions WHERE token_hash = ?", (_token_hash(token),)).rowcount > 0
+
+    def revoke_user(self, user_id: int) -> int:
+        """End every session of a user; returns how many there were."""
+        with self._lock:
+            for token in [token for token, entry in self._cache.items() if entry[0] == user_id]:
+                del self._cache[token]
+        with self.db.transaction() as conn:
+            return conn.execute("DELETE FROM Sessions WHERE user_id = ?", (user_id,)).rowcount
+
+    def purge_expired(self) -> int:
+        """Delete expired sessions; returns how many were removed."""
+        with self.db.transaction() as conn:
+            return conn.execute("DELETE FROM Sessions WHERE expires_at <= ?", (int(time.time()),)).rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'size': len(self._cache), 'hits': self.hits, 'misses': self.misses}
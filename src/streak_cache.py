@@ -0,0 +1,67 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class StreakResultCache:
+    """
+    Memoized streak results, one per Database (db.streak_cache) so every
+    AdvancedAnalytics instance shares it.
+
+    Results are keyed by (name, scope, as-of date, data version). A scope is
+    ('user', user_id) for a user's streak overview; writers in this process
+    bump its version with invalidate(), which orphans the old entries without
+    having to find them (the LRU bound clears them out). Callers also pass
+    the user's Database.data_version(), which triggers bump on every write
+    from any process, so other writers make entries stale too. Current
+    streaks use today's (UTC) date as as-of, so they roll over at midnight
+    UTC on their own.
+
+    Single-habit streaks aren't memoized: reading the data version costs
+    the same one query as reading the habit's stored streak state.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._versions = {}
+        self._generation = 0  # bumped by a full invalidate()
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, name: str, scope: tuple, as_of: Hashable, compute: Callable,
+                       data_version: int = 0):
+        """Cached value for the key, computing and storing it on a miss."""
+        with self._lock:
+            version = (self._generation, self._versions.get(scope, 0), data_version)
+            key = (name, scope, as_of, version)
+            if key in self._results:
+                self.hits += 1
+                self._results.move_to_end(key)
+                return self._results[key]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            # A write that landed while computing bumps the version; don't store a stale result
+            if version[:2] == (self._generation, self._versions.get(scope, 0)):
+                self._results[key] = value
+                while len(self._results) > self.max_size:
+                    self._results.popitem(last=False)
+        return value
+
+    def invalidate(self, *scopes: tuple):
+        """Bump the data version of the given scopes, or drop everything when none are given."""
+        with self._lock:
+            if not scopes:
+                self._generation += 1
+                self._results.clear()
+                return
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            return {'size': len(self._results), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,156 @@
+from datetime import date
+from itertools import groupby
+from typing import Iterable, List, Optional
+from src.db import Database
+from src.periods import period_number, period_of_day
+
+
+def state_from_periods(periods: List[int], total_completions: int) -> dict:
+    """
+    Build a streak state from the sorted, de-duplicated periods a habit was
+    completed in. current_streak is the run ending at last_period.
+    """
+    if not periods:
+        return {'current_streak': 0, 'longest_streak': 0, 'last_period': None,
+                'total_completions': total_completions}
+
+    longest_streak = 1
+    current_streak = 1
+    for i in range(1, len(periods)):
+        if periods[i] == periods[i - 1] + 1:
+            current_streak += 1
+            longest_streak = max(longest_streak, current_streak)
+        else:
+            current_streak = 1
+
+    return {'current_streak': current_streak, 'longest_streak': longest_streak,
+            'last_period': periods[-1], 'total_completions': total_completions}
+
+
+def current_streak_as_of(state: dict, habit_type: str, today: date) -> int:
+    """
+    The run only counts as current if it reaches today's day (or week),
+    matching the history-based calculators.
+    """
+    if state['last_period'] == period_number(today, habit_type):
+        return state['current_streak']
+    return 0
+
+
+class StreakStateStore:
+    """
+    Incrementally maintained streak summary per habit (HabitStreakState).
+    Writers call apply_completion() inside their own transaction, so reads
+    are a single primary-key lookup however long the history is.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def apply_completion(self, conn, habit_id: int, habit_type: str, day: int):
+        """
+        Fold one new completion (by its day_number) into the habit's state.
+        Must run on the connection (and transaction) that inserted it.
+        """
+        self.apply_completions(conn, habit_id, habit_type, [day])
+
+    def apply_completions(self, conn, habit_id: int, habit_type: str, days: Iterable[int]):
+        """
+        Fold several new completions of one habit, given as day numbers,
+        into its state with a single read and write. Must run on the
+        inserting connection.
+        """
+        periods = sorted(period_of_day(day, habit_type) for day in days if day is not None)
+        if not periods:
+            return
+
+        row = conn.execute(
+            "SELECT current_streak, longest_streak, last_period, total_completions "
+            "FROM HabitStreakState WHERE habit_id = ?",
+            (habit_id,)
+        ).fetchone()
+
+        # Missing state (legacy data) or a back-dated completion: recount this habit
+        if row is None or (row[2] is not None and periods[0] < row[2]):
+            self._rebuild(conn, [habit_id])
+            return
+
+        current_streak, longest_streak, last_period, total = row
+        for period in periods:
+            if last_period is None or period > last_period + 1:
+                current_streak = 1
+            elif period == last_period + 1:
+                current_streak += 1
+            # period == last_period: another completion in the same day/week
+            longest_streak = max(longest_streak, current_streak)
+            last_period = period
+
+        conn.execute(
+            """
+            UPDATE HabitStreakState
+            SET current_streak = ?, longest_streak = ?, last_period = ?, total_completions = ?
+            WHERE habit_id = ?
+            """,
+            (current_streak, longest_streak, last_period, total + len(periods), habit_id)
+        )
+
+    def get_state(self, habit_id: int) -> Optional[dict]:
+        """Stored state plus habit type, or None if it was never built."""
+        with self.db.connection() as conn:
+            row = conn.execute(
+                """
+                SELECT s.current_streak, s.longest_streak, s.last_period, s.total_completions, h.type
+                FROM HabitStreakState s
+                JOIN Habits h ON h.habit_id = s.habit_id
+                WHERE s.habit_id = ?
+                """,
+                (habit_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'current_streak': row[0], 'longest_streak': row[1], 'last_period': row[2],
+                'total_completions': row[3], 'type': row[4]}
+
+    def rebuild(self, habit_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recompute state from the completion rollup for the given habits
+        (default: all).
+        Returns the number of habits rebuilt.
+        """
+        with self.db.transaction() as conn:
+            return self._rebuild(conn, None if habit_ids is None else list(habit_ids))
+
+    def _rebuild(self, conn, habit_ids: Optional[List[int]]) -> int:
+        query = """
+            SELECT h.habit_id, h.type, r.period_key, r.completion_count
+            FROM Habits h
+            LEFT JOIN CompletionRollup r ON r.habit_id = h.habit_id
+        """
+        params = ()
+        if habit_ids is not None:
+            if not habit_ids:
+                return 0
+            query += f" WHERE h.habit_id IN ({', '.join('?' * len(habit_ids))})"
+            params = tuple(habit_ids)
+        else:
+            # Full rebuild: also forget habits that no longer exist
+            conn.execute("DELETE FROM HabitStreakState WHERE habit_id NOT IN (SELECT habit_id FROM Habits)")
+        query += " ORDER BY h.habit_id, r.period_key"
+
+        states = []
+        for (habit_id, habit_type), group in groupby(conn.execute(query, params), key=lambda row: row[:2]):
+            counted = [row for row in group if row[2] is not None]
+            state = state_from_periods([row[2] for row in counted], sum(row[3] for row in counted))
+            states.append((habit_id, state['current_streak'], state['longest_streak'],
+                           state['last_period'], state['total_completions']))
+
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO HabitStreakState
+                (habit_id, current_streak, longest_streak, last_period, total_completions)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            states
+        )
+        return len(states)
+
@@ -0,0 +1,125 @@
+"""
+Batch habit statistics for many habits at once (nightly reports).
+
+Both backends take the same input -- each habit's CompletionBitmap plus a
+few scalars -- and return identical results. The NumPy backend unpacks all
+bitmaps into one array and answers the whole batch with byte popcount
+prefix sums and run edges, a handful of array operations; it is used when numpy is installed, and the
+pure-Python backend (the CompletionBitmap word operations) is the fallback.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+from src.bitmap import CompletionBitmap
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+BACKENDS = ('python', 'numpy')
+
+# (habit_id, start_period, today_period, completions, bitmap)
+HabitHistory = Tuple[int, int, int, int, CompletionBitmap]
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """The backend to use: the requested one, or numpy when installed."""
+    if backend is None:
+        return 'numpy' if np is not None else 'python'
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown analytics backend '{backend}'. Choose one of: {', '.join(BACKENDS)}")
+    if backend == 'numpy' and np is None:
+        raise ValueError("The numpy analytics backend requires the 'numpy' package")
+    return backend
+
+
+def habit_statistics(habits: Sequence[HabitHistory], window: int = 30,
+                     backend: Optional[str] = None) -> Dict[int, dict]:
+    """
+    Streak and rate statistics per habit.
+
+    habits: (habit_id, start_period, today_period, completions, bitmap),
+    where start_period is the period the habit was created in and
+    completions its total number of check-offs.
+    Returns {habit_id: {'current_streak', 'longest_streak', 'completions',
+    'periods_completed', 'success_rate', 'rolling_rate'}}; rates are
+    percentages of the periods since creation and of the last ``window``
+    periods up to today.
+    """
+    if resolve_backend(backend) == 'numpy':
+        counts = _numpy_counts(habits, window)
+    else:
+        counts = _python_counts(habits, window)
+    return {
+        habit[0]: _statistics(habit[1], habit[2], window, habit[3], *habit_counts)
+        for habit, habit_counts in zip(habits, counts)
+    }
+
+
+def _statistics(start: int, today: int, window: int, completions: int, current: int, longest: int,
+                periods: int, since_start: int, in_window: int) -> dict:
+    return {
+        'current_streak': current,
+        'longest_streak': longest,
+        'completions': completions,
+        'periods_completed': periods,
+        'success_rate': round(since_start * 100 / max(today - start + 1, 1), 1),
+        'rolling_rate': round(in_window * 100 / window, 1),
+    }
+
+
+def _python_counts(habits, window) -> List[tuple]:
+    return [
+        (bitmap.run_ending_at(today), bitmap.longest_run(), bitmap.count(),
+         bitmap.count(start, today), bitmap.count(today - window + 1, today))
+        for _, start, today, _, bitmap in habits
+    ]
+
+
+def _numpy_counts(habits, window) -> List[tuple]:
+    n = len(habits)
+    start = np.array([habit[1] for habit in habits], dtype=np.int64)
+    today = np.array([habit[2] for habit in habits], dtype=np.int64)
+    origin = np.array([habit[4].origin for habit in habits], dtype=np.int64)
+    size = np.array([len(habit[4].bits) for habit in habits], dtype=np.int64)
+    width = size * 8
+
+    # All bitmaps back to back, each followed by a zero byte so no run crosses into the next habit
+    data = np.frombuffer(b''.join(bytes(habit[4].bits) + b'\0' for habit in habits), dtype=np.uint8)
+    offset = np.cumsum(size + 1) - (size + 1)
+    popcount = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.int64)
+    completed = np.zeros(len(data) + 1, dtype=np.int64)  # set bits before each byte
+    np.cumsum(popcount[data], out=completed[1:])
+
+    def count(first, last):
+        """Completed periods first..last (inclusive) of every habit, via the byte prefix sums."""
+        low = np.clip(first - origin, 0, width)
+        high = np.maximum(np.clip(last - origin + 1, 0, width), low)
+        low_byte, high_byte = offset + (low >> 3), offset + (high >> 3)
+        # Whole bytes, then drop the bits below low and add the bits below high in the edge bytes
+        return (completed[high_byte] - completed[low_byte]
+                - popcount[data[low_byte] & ((1 << (low & 7)) - 1)]
+                + popcount[data[high_byte] & ((1 << (high & 7)) - 1)])
+
+    # Runs of set bits: [run_start, run_end) in the concatenated bit array
+    bits = np.unpackbits(data, bitorder='little').view(np.int8)
+    edges = np.diff(bits, prepend=np.int8(0))
+    run_start = np.flatnonzero(edges == 1)
+    run_length = np.flatnonzero(edges == -1) - run_start
+
+    # Runs are ordered by habit, so each habit's runs are one slice of run_length
+    longest = np.zeros(n, dtype=np.int64)
+    first_run = np.searchsorted(run_start, offset * 8)
+    has_runs = first_run < np.append(first_run[1:], len(run_start))
+    if has_runs.any():
+        longest[has_runs] = np.maximum.reduceat(run_length, first_run[has_runs])
+
+    # The current streak is the run that covers today's bit
+    today_bit = offset * 8 + np.clip(today - origin, 0, width)
+    on_today = (today >= origin) & (today - origin < width) & (bits[today_bit] == 1)
+    current = np.zeros(n, dtype=np.int64)
+    if on_today.any():
+        covered = today_bit[on_today]
+        current[on_today] = covered - run_start[np.searchsorted(run_start, covered, side='right') - 1] + 1
+
+    return list(zip(current.tolist(), longest.tolist(), count(origin, origin + width - 1).tolist(),
+                    count(start, today).tolist(), count(today - window + 1, today).tolist()))
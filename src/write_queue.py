@@ -0,0 +1,181 @@
+"""
+Single-writer commit queue with group commit.
+
+Under burst traffic, many threads each committing their own check-off
+fight over SQLite's write lock (and eventually see "database is locked").
+WriteQueue instead hands every write to one writer thread that owns the
+write connection. Everything that queued up while the previous batch was
+committing (plus, optionally, whatever arrives within ``window`` seconds)
+is committed as one transaction; each operation runs under its own
+savepoint, so a rejected one does not undo the rest of its batch. Callers
+get a concurrent.futures.Future that resolves once the batch has
+committed.
+
+    writes = WriteQueue(db)
+    writes.check_off(user_id, habit_id, mood_score=7).result()
+    writes.close()
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+from src.db import Database
+from src.habit_manager import HabitManager
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    Queue of write operations drained by a single writer thread. Holds one
+    pooled connection for its whole lifetime; close() when done.
+    """
+
+    def __init__(self, db: Database, window: float = 0.0, max_batch: int = 1000):
+        self.db = db
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0      # transactions committed
+        self.operations = 0   # operations in those transactions
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="habits-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, **kwargs) -> Future:
+        """Run func(*args, **kwargs) on the writer thread inside the next batch."""
+        return self._put(('call', (func, args, kwargs)))
+
+    def check_off(self, user_id: int, habit_id: int, notes: str = None, mood_score: int = None) -> Future:
+        """
+        HabitManager.check_off_habit for user_id. Consecutive check-offs in a
+        batch are written with one check_off_many per user. The future raises
+        ValueError if the habit is not the user's.
+        """
+        return self._put(('check_off', (user_id, {'habit_id': habit_id, 'notes': notes, 'mood_score': mood_score})))
+
+    def add_habit(self, user_id: int, name: str, habit_type: str) -> Future:
+        return self.submit(lambda: self._manager(user_id).add_habit(name, habit_type))
+
+    def delete_habit(self, user_id: int, habit_id: int) -> Future:
+        return self.submit(lambda: self._manager(user_id).delete_habit(habit_id))
+
+    def _manager(self, user_id: int) -> HabitManager:
+        manager = HabitManager(self.db)
+        manager.set_current_user(user_id)
+        return manager
+
+    def _put(self, operation) -> Future:
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write queue is closed")
+            self._queue.put((operation, future))
+        return future
+
+    def close(self):
+        """Commit everything already queued, then stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self) -> dict:
+        """Batching counters for monitoring."""
+        return {
+            'batches': self.batches,
+            'operations': self.operations,
+            'queued': self._queue.qsize(),
+            'avg_batch': round(self.operations / self.batches, 1) if self.batches else 0.0,
+        }
+
+    def _run(self):
+        conn = self.db.pool.acquire()  # held until close(): this thread's transactions all use it
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                batch = [item]
+                deadline = time.monotonic() + self.window
+                while len(batch) < self.max_batch:
+                    try:
+                        remaining = deadline - time.monotonic()
+                        item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._commit(batch)
+        finally:
+            self.db.pool.release(conn)
+
+    def _commit(self, batch: List[tuple]):
+        """Run one batch in a single transaction, then resolve its futures."""
+        batch = [(operation, future) for operation, future in batch if future.set_running_or_notify_cancel()]
+        outcomes = []  # (future, result, exception)
+        try:
+            with self.db.transaction() as conn:
+                # Take the write lock once for the whole batch
+                conn.execute("BEGIN IMMEDIATE")
+                start = 0
+                while start < len(batch):
+                    end = start + 1
+                    if batch[start][0][0] == 'check_off':
+                        while end < len(batch) and batch[end][0][0] == 'check_off':
+                            end += 1
+                        outcomes.extend(self._check_offs(conn, batch[start:end]))
+                    else:
+                        outcomes.append(self._call(conn, batch[start]))
+                    start = end
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.operations += len(batch)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _call(self, conn, item) -> tuple:
+        (_, (func, args, kwargs)), future = item
+        conn.execute("SAVEPOINT write_queue_op")
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            conn.execute("ROLLBACK TO write_queue_op")
+            conn.execute("RELEASE write_queue_op")
+            return future, None, e
+        conn.execute("RELEASE write_queue_op")
+        return future, result, None
+
+    def _check_offs(self, conn, items) -> List[tuple]:
+        by_user = {}
+        for (_, (user_id, record)), future in items:
+            by_user.setdefault(user_id, []).append((record, future))
+
+        outcomes = []
+        for user_id, entries in by_user.items():
+            def write(user_id=user_id, entries=entries):
+                return self._manager(user_id).check_off_many(record for record, _ in entries)
+
+            _, results, error = self._call(conn, (('call', (write, (), {})), None))
+            for index, (_, future) in enumerate(entries):
+                if error is not None:
+                    outcomes.append((future, None, error))
+                elif results[index]['success']:
+                    outcomes.append((future, None, None))
+                else:
+                    outcomes.append((future, None, ValueError(results[index]['error'])))
+        return outcomes
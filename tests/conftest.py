@@ -0,0 +1,30 @@
+import pytest
+from src.db import Database
+from src.habit_manager import HabitManager
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a fresh SQLite database in the test's own temporary directory."""
+    return str(tmp_path / "test.db")
+
+
+@pytest.fixture
+def test_db(db_path):
+    """A fresh Database, closed after the test."""
+    db = Database(db_path)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def test_manager(test_db):
+    """
+    A habit manager logged in as a newly registered user (testuser /
+    password123). Modules that need habits or more users override it:
+    a fixture named test_manager that takes test_manager gets this one.
+    """
+    manager = HabitManager(test_db)
+    test_db.register_user("testuser", "test@test.com", "password123")
+    manager.set_current_user(test_db.authenticate_user("testuser", "password123"))
+    return manager
@@ -46,6 +46,7 @@ def test_streak_calculations():
         print("✅ All analytics tests passed!")
 
     finally:
+        db.close()
         if os.path.exists(test_db_path):
             try:
                 os.remove(test_db_path)
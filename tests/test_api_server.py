@@ -0,0 +1,94 @@
+import http.client
+import json
+import pytest
+import threading
+from src.api_server import HabitAPIServer
+
+
+@pytest.fixture
+def server(db_path):
+    """A running server on a free port."""
+    server = HabitAPIServer(("127.0.0.1", 0), db_path, pool_size=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def _request(conn, method, path, body=None, token=None):
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f"Bearer {token}"
+    conn.request(method, path, json.dumps(body).encode() if body is not None else None, headers)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read()), response
+
+
+def _login(conn, username):
+    status, _, _ = _request(conn, 'POST', '/register',
+                            {'username': username, 'email': f"{username}@example.com", 'password': "password123"})
+    assert status == 201
+    status, body, _ = _request(conn, 'POST', '/login', {'username': username, 'password': "password123"})
+    assert status == 200
+    return body['token']
+
+
+def test_habits_check_offs_and_streaks_over_one_connection(server):
+    conn = http.client.HTTPConnection(*server.server_address)
+    token = _login(conn, "alice")
+    sock = conn.sock
+
+    status, _, _ = _request(conn, 'POST', '/habits', {'name': "Read", 'type': "daily"}, token)
+    assert status == 201
+    status, habits, response = _request(conn, 'GET', '/habits', token=token)
+    assert status == 200 and [habit['name'] for habit in habits] == ["Read"]
+    assert response.getheader('Server-Timing').startswith('app;dur=')
+
+    habit_id = habits[0]['habit_id']
+    for mood in (6, 8):
+        status, _, _ = _request(conn, 'POST', f'/habits/{habit_id}/checkoff', {'mood_score': mood}, token)
+        assert status == 201
+    status, streaks, _ = _request(conn, 'GET', '/streaks', token=token)
+    assert streaks[0]['habit_id'] == habit_id and streaks[0]['current_streak'] == 1
+    status, report, _ = _request(conn, 'GET', '/report?window=7', token=token)
+    assert status == 200 and report[0]['completions'] == 2
+
+    status, stats, _ = _request(conn, 'GET', '/stats')
+    assert stats['requests'] == 8
+    # Everything above ran over the same keep-alive connection
+    assert conn.sock is sock
+    conn.close()
+
+
+def test_errors_are_json(server):
+    conn = http.client.HTTPConnection(*server.server_address)
+    alice, bob = _login(conn, "alice"), _login(conn, "bob")
+    _request(conn, 'POST', '/habits', {'name': "Read", 'type': "daily"}, alice)
+
+    assert _request(conn, 'GET', '/habits')[:2] == (401, {'error': "Missing or invalid token"})
+    assert _request(conn, 'POST', '/habits/1/checkoff', {}, bob)[0] == 404
+    assert _request(conn, 'POST', '/habits/1/checkoff', {'mood_score': 11}, alice)[0] == 400
+    assert _request(conn, 'POST', '/habits', {'name': "Walk", 'type': "hourly"}, alice)[0] == 400
+    assert _request(conn, 'DELETE', '/habits/1', token=bob)[0] == 404
+    assert _request(conn, 'GET', '/nowhere')[0] == 404
+    assert _request(conn, 'POST', '/login', {'username': "alice", 'password': "wrong"})[0] == 401
+    assert _request(conn, 'POST', '/logout', token=bob)[0] == 200
+    assert _request(conn, 'GET', '/habits', token=bob)[0] == 401
+
+    # The connection is still usable after errors
+    status, habits, _ = _request(conn, 'GET', '/habits', token=alice)
+    assert status == 200 and len(habits) == 1
+    conn.close()
+
+
+@pytest.mark.parametrize("length", ["-1", "ten", "1.5"])
+def test_invalid_content_length_is_rejected(server, length):
+    conn = http.client.HTTPConnection(*server.server_address)
+    conn.putrequest('POST', '/login')
+    conn.putheader('Content-Length', length)
+    conn.endheaders()
+    response = conn.getresponse()
+    assert (response.status, json.loads(response.read())) == (400, {'error': "Invalid Content-Length"})
+    conn.close()
@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from src.async_db import AsyncAnalytics, AsyncDatabase, AsyncHabitManager
+
+
+async def _setup(adb):
+    """Two users with one habit each; returns their managers."""
+    managers = []
+    for username in ("alice", "bob"):
+        assert await adb.register_user(username, f"{username}@example.com", "password123")
+        manager = AsyncHabitManager(adb, await adb.authenticate_user(username, "password123"))
+        await manager.add_habit("Read", "daily")
+        managers.append(manager)
+    return managers
+
+
+def test_concurrent_check_offs_share_one_transaction(db_path):
+    async def scenario():
+        async with AsyncDatabase(db_path, readers=2, window=0.05) as adb:
+            alice, bob = await _setup(adb)
+            batches = adb.batches
+            await asyncio.gather(*(alice.check_off_habit(1, mood_score=n) for n in range(20)),
+                                 *(bob.check_off_habit(2) for _ in range(5)))
+            assert adb.batches == batches + 1
+
+            streaks = await AsyncAnalytics(adb).compute_streaks(alice.current_user_id)
+            assert streaks[1]['current_streak'] == 1
+            assert (await alice.list_habits())[0][0] == 1
+            with adb.db.connection() as conn:
+                return conn.execute("SELECT habit_id, COUNT(*) FROM Completions GROUP BY habit_id").fetchall()
+
+    assert asyncio.run(scenario()) == [(1, 20), (2, 5)]
+
+
+def test_rejected_check_off_fails_only_its_caller(db_path):
+    async def scenario():
+        async with AsyncDatabase(db_path) as adb:
+            alice, _ = await _setup(adb)
+            results = await asyncio.gather(alice.check_off_habit(1), alice.check_off_habit(2),
+                                           return_exceptions=True)
+            assert results[0] is None
+            assert isinstance(results[1], ValueError) and "access denied" in str(results[1])
+
+            await alice.delete_habit(1)
+            assert await alice.list_habits() == []
+            with pytest.raises(ValueError):
+                await alice.check_off_habit(1)
+
+    asyncio.run(scenario())
+    with pytest.raises(ValueError):
+        AsyncHabitManager(None, None)
@@ -40,6 +40,7 @@ def test_user_authentication():
 
     finally:
         # Clean up
+        test_db.close()
         import time
         time.sleep(0.1)
         if os.path.exists(test_db_path):
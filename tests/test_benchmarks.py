@@ -0,0 +1,27 @@
+from benchmarks.suite import compare_runs, measure
+
+
+def _run(**medians):
+    return {'meta': {'dataset': 'small'},
+            'results': {name: {'median_ms': ms} for name, ms in medians.items()}}
+
+
+def test_measure_reports_statistics():
+    """measure() returns timing statistics for the requested repeats."""
+    calls = []
+    result = measure(lambda: calls.append(1), repeat=5, warmup=2)
+    assert len(calls) == 7
+    assert result['repeat'] == 5
+    assert result['min_ms'] <= result['median_ms'] <= result['max_ms']
+
+
+def test_compare_flags_regressions_above_threshold():
+    """Only slowdowns beyond the threshold count as regressions."""
+    rows = compare_runs(_run(a=1.0, b=1.0, c=2.0), _run(a=1.05, b=1.5, c=1.0, d=3.0), threshold=10)
+    by_case = {row['case']: row for row in rows}
+
+    assert set(by_case) == {'a', 'b', 'c'}  # new cases have nothing to compare against
+    assert by_case['a']['regression'] is False
+    assert by_case['b']['regression'] is True
+    assert by_case['b']['change_pct'] == 50.0
+    assert by_case['c']['regression'] is False
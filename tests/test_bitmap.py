@@ -0,0 +1,82 @@
+import pytest
+import random
+from src.bitmap import CompletionBitmap, CompletionBitmapStore
+from src.maintenance import rebuild_derived_tables
+from src.periods import completion_columns
+from src.streak_state import state_from_periods
+
+
+@pytest.fixture
+def test_manager(test_manager):
+    """The shared logged-in manager with a daily and a weekly habit."""
+    test_manager.add_habit("Read", "daily")
+    test_manager.add_habit("Clean", "weekly")
+    return test_manager
+
+
+def test_operations_match_a_plain_scan():
+    rng = random.Random(7)
+    for _ in range(200):
+        periods = sorted(rng.sample(range(20000, 20300), rng.randint(0, 120)))
+        bitmap = CompletionBitmap.from_periods(periods)
+        assert list(bitmap.periods()) == periods
+        assert bitmap.longest_run() == state_from_periods(periods, 0)['longest_streak']
+
+        start, end = sorted(rng.sample(range(19990, 20310), 2))
+        in_window = [p for p in periods if start <= p <= end]
+        assert bitmap.count(start, end) == len(in_window)
+        assert bitmap.success_rate(start, end) == round(len(in_window) * 100 / (end - start + 1), 1)
+
+        today = rng.randrange(19990, 20310)
+        run = 0
+        while today - run in periods:
+            run += 1
+        assert bitmap.run_ending_at(today) == run
+
+
+def test_add_grows_and_reanchors():
+    bitmap = CompletionBitmap()
+    assert bitmap.longest_run() == 0 and bitmap.run_ending_at(5) == 0
+    for period in (100, 101, 140, 98, 99):
+        bitmap.add(period)
+    assert bitmap.origin == 98
+    assert list(bitmap.periods()) == [98, 99, 100, 101, 140]
+    assert bitmap.run_ending_at(101) == 4
+
+
+def test_check_offs_maintain_stored_bitmap(test_manager):
+    test_manager.check_off_many([
+        {'habit_id': 1, 'timestamp': f"2025-03-{day:02d} 07:00:00"} for day in (1, 2, 3, 5, 5)
+    ] + [{'habit_id': 2, 'timestamp': '2025-03-03 07:00:00'}, {'habit_id': 2, 'timestamp': '2025-03-12 07:00:00'}])
+    test_manager.check_off_habit(1)
+
+    with test_manager.db.connection() as conn:
+        stored = dict(conn.execute("SELECT habit_id, bits FROM CompletionBitmap").fetchall())
+    assert set(stored) == {1, 2}
+
+    store = CompletionBitmapStore(test_manager.db)
+    daily = store.get(1)
+    assert daily.longest_run() == 3
+    assert daily.count() == 5
+    assert daily.run_ending_at(completion_columns('2025-03-05 07:00:00')[1]) == 1
+    assert daily.run_ending_at(completion_columns('2025-03-04 07:00:00')[1]) == 0
+    assert store.get(2).longest_run() == 2
+
+
+def test_rebuilt_after_rewrites_and_raw_sql(test_manager):
+    """A removed period drops the bitmap; reads and rebuilds recover it from the rollups."""
+    db = test_manager.db
+    test_manager.check_off_many([
+        {'habit_id': 1, 'timestamp': f"2025-04-{day:02d} 07:00:00"} for day in range(1, 6)
+    ])
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM Completions WHERE timestamp = '2025-04-03 07:00:00'")
+        assert conn.execute("SELECT COUNT(*) FROM CompletionBitmap").fetchone()[0] == 0
+        conn.execute("INSERT INTO Completions (habit_id, timestamp) VALUES (2, '2025-04-01 07:00:00')")
+
+    store = CompletionBitmapStore(db)
+    assert store.get(1).longest_run() == 2
+    assert store.get(2).count() == 1
+
+    assert rebuild_derived_tables(db)['completion_bitmap'] == 2
+    assert store.get(1).count() == 4
@@ -0,0 +1,64 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from src.habit_manager import HabitManager
+
+
+@pytest.fixture
+def test_manager(test_manager):
+    """The shared logged-in manager, plus a second user to test ownership against."""
+    test_manager.db.register_user("otheruser", "other@test.com", "password123")
+    return test_manager
+
+
+def _completion_count(db, habit_id):
+    with db.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM Completions WHERE habit_id = ?", (habit_id,)).fetchone()[0]
+
+
+def test_check_off_many_reports_per_record(test_manager):
+    """Valid records are inserted; foreign or unknown habits are rejected individually."""
+    db = test_manager.db
+    test_manager.add_habit("Mine", "daily")
+    mine = test_manager.list_habits()[0][0]
+
+    other = HabitManager(db)
+    other.set_current_user(db.authenticate_user("otheruser", "password123"))
+    other.add_habit("Theirs", "daily")
+    theirs = other.list_habits()[0][0]
+
+    results = test_manager.check_off_many([
+        {'habit_id': mine, 'notes': 'first', 'mood_score': 7},
+        (theirs, None, None),
+        {'habit_id': 999},
+        {'habit_id': mine, 'timestamp': 'not a date'},
+        (mine,),
+    ])
+
+    assert [r['success'] for r in results] == [True, False, False, False, True]
+    assert results[1]['error'] == "Habit not found or access denied"
+    assert results[3]['error'] == "Invalid timestamp"
+    assert _completion_count(db, mine) == 2
+    assert _completion_count(db, theirs) == 0
+
+
+def test_check_off_many_updates_streak_state(test_manager):
+    """Back-filled completions are folded into the streak state."""
+    test_manager.add_habit("Meditate", "daily")
+    habit_id = test_manager.list_habits()[0][0]
+
+    today = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)  # completion days are UTC
+    test_manager.check_off_many(
+        [{'habit_id': habit_id, 'timestamp': today - timedelta(days=d)} for d in (4, 3, 2, 0)]
+    )
+
+    state = test_manager.streak_state.get_state(habit_id)
+    assert state['total_completions'] == 4
+    assert state['longest_streak'] == 3
+    assert state['current_streak'] == 1
+
+
+def test_check_off_many_requires_login(test_manager):
+    """Like check_off_habit, bulk check-off needs a current user."""
+    test_manager.set_current_user(None)
+    with pytest.raises(ValueError):
+        test_manager.check_off_many([(1,)])
@@ -0,0 +1,73 @@
+import pytest
+import threading
+from src.db import Database
+
+
+@pytest.fixture
+def test_db(db_path):
+    """Create a test database with a pool of two connections."""
+    db = Database(db_path, pool_size=2)
+    yield db
+    db.close()
+
+
+def test_connections_are_reused(test_db):
+    """Sequential checkouts should reuse the same long-lived connection."""
+    with test_db.connection() as first:
+        pass
+    with test_db.connection() as second:
+        pass
+    assert first is second
+    assert test_db.pool.stats()['open'] == 1
+
+
+def test_nested_checkout_same_thread(test_db):
+    """A thread holding a connection gets the same one back."""
+    with test_db.connection() as outer:
+        with test_db.connection() as inner:
+            assert inner is outer
+        assert test_db.pool.stats()['in_use'] == 1
+    assert test_db.pool.stats()['in_use'] == 0
+
+
+def test_transaction_rolls_back_on_error(test_db):
+    """Errors inside a transaction block should not leave partial writes."""
+    with pytest.raises(RuntimeError):
+        with test_db.transaction() as conn:
+            conn.execute("INSERT INTO Users (username, email, password_hash) VALUES ('a', 'a@a', 'x')")
+            raise RuntimeError("boom")
+
+    assert test_db.user_exists("a") is False
+
+
+def test_get_connection_close_returns_to_pool(test_db):
+    """Legacy get_connection()/close() callers should keep working."""
+    conn = test_db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO Users (username, email, password_hash) VALUES ('b', 'b@b', 'x')")
+    conn.commit()
+    conn.close()
+
+    assert test_db.user_exists("b") is True
+    assert test_db.pool.stats()['in_use'] == 0
+
+
+def test_pool_is_bounded_across_threads(test_db):
+    """No more than pool_size connections are ever opened."""
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(50):
+                test_db.user_exists("nobody")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert test_db.pool.stats()['open'] <= 2
@@ -1,5 +1,6 @@
 from src.db import Database
 from src.habit_manager import HabitManager
+from src.maintenance import rebuild_derived_tables
 from datetime import datetime, timedelta
 import random
 
@@ -48,6 +49,9 @@ class TestDataGenerator:
         self._generate_daily_habits_data(habit_ids[:3], start_date, end_date)  # First 3 are daily
         self._generate_weekly_habits_data(habit_ids[3:], start_date, end_date)  # Last 2 are weekly
 
+        # Completions were written with raw SQL, so refresh the derived tables
+        rebuild_derived_tables(self.db, habit_ids)
+
         print("🎉 Test data generation complete!")
 
     def _get_last_habit_id(self):
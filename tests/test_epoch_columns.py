@@ -0,0 +1,84 @@
+import pytest
+import sqlite3
+from datetime import date
+from src.db import Database, SCHEMA_VERSION
+from src.periods import completion_columns, day_number
+
+
+@pytest.fixture
+def legacy_db_path(db_path):
+    """A database created with the original schema (no period columns, user_version 0)."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE Users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE Habits (
+            habit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            type TEXT CHECK(type IN ('daily', 'weekly')) NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT TRUE
+        );
+        CREATE TABLE Completions (
+            completion_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            habit_id INTEGER NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            notes TEXT,
+            mood_score INTEGER
+        );
+        INSERT INTO Users (username, email, password_hash) VALUES ('old', 'old@example.com', 'x');
+        INSERT INTO Habits (user_id, name, type) VALUES (1, 'Stretch', 'weekly');
+        INSERT INTO Completions (habit_id, timestamp) VALUES (1, '2024-12-30 07:15:00');
+        INSERT INTO Completions (habit_id, timestamp) VALUES (1, '2025-01-06T21:00:00Z');
+    ''')
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def _period_rows(db):
+    with db.connection() as conn:
+        return conn.execute(
+            "SELECT timestamp, ts_epoch, day_number, iso_week_key FROM Completions ORDER BY completion_id"
+        ).fetchall()
+
+
+def test_legacy_database_is_migrated_and_backfilled(legacy_db_path):
+    """Opening an old database adds the period columns and fills them in."""
+    db = Database(legacy_db_path)
+    try:
+        with db.connection() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+        rows = _period_rows(db)
+        assert rows[0][2] == day_number(date(2024, 12, 30))
+        # Monday 2024-12-30 and Monday 2025-01-06 are consecutive weeks across the year boundary
+        assert rows[1][3] == rows[0][3] + 1
+        for timestamp, *columns in rows:
+            assert tuple(columns) == completion_columns(timestamp)
+    finally:
+        db.close()
+
+    # Reopening is a no-op
+    db = Database(legacy_db_path)
+    db.close()
+
+
+def test_raw_inserts_and_timestamp_edits_fill_columns(legacy_db_path):
+    """Rows written without the columns get them from the database triggers."""
+    db = Database(legacy_db_path)
+    try:
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO Completions (habit_id, timestamp) VALUES (1, '2025-03-01 23:59:59')")
+            conn.execute("UPDATE Completions SET timestamp = '2020-02-29 00:00:00' WHERE completion_id = 1")
+
+        for timestamp, *columns in _period_rows(db):
+            assert tuple(columns) == completion_columns(timestamp)
+    finally:
+        db.close()
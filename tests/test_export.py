@@ -0,0 +1,76 @@
+import pytest
+import csv
+import gzip
+import io
+import json
+from src.export import EXPORT_COLUMNS, export_completions, write_text_export
+
+
+@pytest.fixture
+def test_manager(test_manager):
+    """The shared logged-in manager with two habits and a few completions."""
+    test_manager.add_habit("Read", "daily")
+    test_manager.add_habit("Clean", "weekly")
+    test_manager.check_off_many([
+        {'habit_id': 2, 'timestamp': '2025-01-06 10:00:00'},
+        {'habit_id': 1, 'timestamp': '2025-01-02 08:00:00', 'notes': 'chapter, 3', 'mood_score': 7},
+        {'habit_id': 1, 'timestamp': '2025-01-01 08:00:00'},
+    ])
+    return test_manager
+
+
+def test_csv_export_is_ordered_by_habit_and_time(test_manager, tmp_path):
+    """CSV has a header row and one row per completion."""
+    rows = export_completions(test_manager.db, test_manager.current_user_id, tmp_path / "export.csv")
+    assert rows == 3
+
+    with open(tmp_path / "export.csv", newline='', encoding='utf-8') as f:
+        records = list(csv.DictReader(f))
+    assert tuple(records[0]) == EXPORT_COLUMNS
+    assert [(r['habit_id'], r['timestamp']) for r in records] == [
+        ('1', '2025-01-01 08:00:00'), ('1', '2025-01-02 08:00:00'), ('2', '2025-01-06 10:00:00')]
+    assert records[1]['notes'] == 'chapter, 3'
+
+
+def test_gzip_jsonl_export_reports_progress(test_manager, tmp_path):
+    """Compressed JSON Lines round-trip; progress is reported as rows stream."""
+    seen = []
+    export_completions(test_manager.db, test_manager.current_user_id, tmp_path / "export.jsonl.gz",
+                       fmt='jsonl', compression='gzip', progress=seen.append, progress_every=2)
+    assert seen == [2, 3]
+
+    with gzip.open(tmp_path / "export.jsonl.gz", 'rt', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert records[1]['mood_score'] == 7
+    assert records[2]['habit_type'] == 'weekly'
+
+
+def test_unknown_format_is_rejected(test_manager, tmp_path):
+    with pytest.raises(ValueError):
+        export_completions(test_manager.db, test_manager.current_user_id, tmp_path / "export.csv", fmt='xml')
+
+
+def test_text_export_lists_dates_per_habit(test_manager):
+    """The text report keeps its layout."""
+    out = io.StringIO()
+    write_text_export(test_manager.db, test_manager.current_user_id, out)
+    report = out.getvalue()
+
+    assert "Total Habits: 2" in report
+    assert "Habit: Read (daily)\nCreated: " in report
+    assert "Total Completions: 2\nCompletion Dates: 2025-01-01, 2025-01-02\n" in report
+    assert "Total Completions: 1\nCompletion Dates: 2025-01-06\n" in report
+
+
+def test_text_export_returns_its_connection_when_writing_fails(test_manager):
+    """A failing writer doesn't leave the completions stream holding a pooled connection."""
+    class FullDisk(io.StringIO):
+        def write(self, text):
+            if text.startswith("Completion Dates"):
+                raise OSError("No space left on device")
+            return super().write(text)
+
+    with pytest.raises(OSError) as failure:
+        write_text_export(test_manager.db, test_manager.current_user_id, FullDisk())
+    # Checked while the traceback (and with it the export's frame) is still alive
+    assert failure.traceback and test_manager.db.pool.stats()['in_use'] == 0
@@ -1,5 +1,7 @@
-from src.habit import DailyHabit, WeeklyHabit
-from datetime import datetime
+import pytest
+import random
+from src.habit import BaseHabit, Completion, CompletionLog, DailyHabit, WeeklyHabit
+from datetime import date, datetime, timedelta, timezone
 
 
 def test_daily_habit_creation():
@@ -10,4 +12,84 @@ def test_daily_habit_creation():
 
 def test_weekly_habit_creation():
     habit = WeeklyHabit("Clean house", datetime.now())
-    assert habit.name == "Clean house"
\ No newline at end of file
+    assert habit.name == "Clean house"
+
+
+def test_entities_have_no_instance_dict():
+    habit = DailyHabit("Drink water", datetime.now())
+    completion = Completion(datetime.now())
+    for entity in (habit, WeeklyHabit("Clean house", datetime.now()), completion):
+        assert not hasattr(entity, '__dict__')
+    with pytest.raises(AttributeError):
+        habit.color = "blue"
+
+
+def test_completion_log_behaves_like_a_list_of_completions():
+    habit = WeeklyHabit("Clean house", datetime(2024, 1, 1))
+    first = datetime(2024, 1, 1, 9, 30, 15, 250)
+    habit.completion_records.append(Completion(first, "kitchen", 7))
+    habit.completion_records.record(datetime(2024, 1, 8, 10))
+    habit.completion_records.extend([Completion(datetime(2024, 1, 15), "kitchen")])
+
+    records = habit.completion_records
+    assert len(records) == 3
+    assert (records[0].timestamp, records[0].notes, records[0].mood_score) == (first, "kitchen", 7)
+    assert (records[-2].notes, records[-2].mood_score) == (None, None)
+    assert [record.timestamp.day for record in records] == [1, 8, 15]
+    assert [record.notes for record in records[::2]] == ["kitchen", "kitchen"]
+    assert records[0].notes is records[2].notes  # notes are stored once
+
+    # Views write through to the columns
+    records[1].mood_score = 4
+    records[1].notes = "bathroom"
+    assert (records[1].notes, records[1].mood_score) == ("bathroom", 4)
+    with pytest.raises(IndexError):
+        records[3]
+
+
+def test_completion_log_rejects_what_it_cannot_store():
+    log = CompletionLog()
+    with pytest.raises(ValueError):
+        log.record(datetime(2024, 1, 1, tzinfo=timezone.utc))
+    with pytest.raises(ValueError):
+        log.record(datetime(2024, 1, 1), mood_score=500)
+    assert len(log) == 0 and len(log.timestamps()) == 0
+
+
+class EveryOtherDayHabit(BaseHabit):
+    """Only implements is_due_on, so the generic schedule applies."""
+    __slots__ = ()
+
+    def is_due_on(self, date) -> bool:
+        return date.toordinal() % 2 == 0
+
+
+def test_schedule_matches_is_due_on():
+    rng = random.Random(7)
+    habits = [DailyHabit("Read", datetime(2024, 1, 3)), WeeklyHabit("Clean", datetime(2024, 1, 3, 18)),
+              EveryOtherDayHabit("Run", datetime(2024, 1, 3))]
+    for _ in range(200):
+        start = date(2024, 1, 1) + timedelta(days=rng.randrange(400))
+        end = start + timedelta(days=rng.randrange(-3, 60))
+        for habit in habits:
+            expected = [start + timedelta(days=i) for i in range((end - start).days + 1)
+                        if habit.is_due_on(start + timedelta(days=i))]
+            assert habit.due_dates(start, end) == expected
+            assert habit.due_count(start, end) == len(expected)
+            mask = habit.due_mask(start, end)
+            assert [start + timedelta(days=i) for i, due in enumerate(mask) if due] == expected
+
+
+def test_schedule_over_a_year():
+    weekly = WeeklyHabit("Clean", datetime(2024, 1, 1))  # a Monday
+    assert weekly.due_count(date(2024, 1, 1), date(2024, 12, 31)) == 53
+    assert weekly.due_count(datetime(2024, 1, 2, 9), datetime(2024, 1, 8, 9)) == 1
+    assert DailyHabit("Read", datetime(2024, 1, 1)).due_count(date(2024, 1, 1), date(2024, 12, 31)) == 366
+    assert WeeklyHabit("Clean", datetime(2024, 1, 1)).due_count(date(2024, 2, 1), date(2024, 1, 1)) == 0
+
+
+def test_due_mask_is_a_numpy_view():
+    np = pytest.importorskip("numpy")
+    mask = np.frombuffer(WeeklyHabit("Clean", datetime(2024, 1, 1)).due_mask(date(2024, 1, 1), date(2024, 1, 31)),
+                         dtype=bool)
+    assert mask.sum() == 5 and mask[::7].all()
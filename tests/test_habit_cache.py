@@ -0,0 +1,105 @@
+import pytest
+from src.db import Database
+from src.habit_manager import HabitManager
+from src.advanced_analytics import AdvancedAnalytics
+from src.habit_cache import HabitMetadataCache
+
+
+@pytest.fixture
+def test_manager(test_manager):
+    """The shared logged-in manager with three habits."""
+    for name, habit_type in (("Read", "daily"), ("Clean", "weekly"), ("Walk", "daily")):
+        test_manager.add_habit(name, habit_type)
+    return test_manager
+
+
+def test_cache_is_shared_by_manager_and_analytics(test_manager):
+    """A check-off warms the cache the analytics classes read from."""
+    cache = test_manager.db.habit_cache
+    test_manager.check_off_habit(2)
+    assert cache.stats()['misses'] == 1
+
+    assert AdvancedAnalytics(test_manager.db).get_habit_type(2) == 'weekly'
+    test_manager.check_off_habit(2)
+    assert cache.stats()['hits'] == 2
+    assert cache.stats()['misses'] == 1
+
+
+def test_least_recently_used_entries_are_evicted(test_manager):
+    cache = HabitMetadataCache(test_manager.db, max_size=2)
+    cache.get_many([1, 2])
+    cache.get(1)
+    cache.get(3)  # evicts 2, the least recently used
+
+    assert cache.stats()['evictions'] == 1
+    misses = cache.stats()['misses']
+    cache.get(1)
+    cache.get(2)
+    assert cache.stats()['misses'] == misses + 1
+
+
+def test_delete_and_deactivate_invalidate(test_manager):
+    """Cached metadata never outlives the habit or its active flag."""
+    cache = test_manager.db.habit_cache
+    assert cache.get(1)['is_active']
+    assert cache.get(3)['name'] == "Walk"
+
+    test_manager.deactivate_habit(1)
+    assert not cache.get(1)['is_active']
+
+    test_manager.delete_habit(3)
+    assert cache.get(3) is None
+    with pytest.raises(ValueError):
+        test_manager.check_off_habit(3)
+
+    test_manager.set_current_user(999)
+    with pytest.raises(ValueError):
+        test_manager.delete_habit(2)
+
+
+def test_habit_deleted_by_another_process_is_not_checked_off(test_manager):
+    """A stale cache entry never lets a completion in without its habit."""
+    cache = test_manager.db.habit_cache
+    assert cache.get(1) is not None and cache.get(3) is not None
+
+    other = Database(test_manager.db.db_path)
+    try:
+        elsewhere = HabitManager(other)
+        elsewhere.set_current_user(test_manager.current_user_id)
+        elsewhere.delete_habit(1)
+        elsewhere.delete_habit(3)
+    finally:
+        other.close()
+
+    with pytest.raises(ValueError):
+        test_manager.check_off_habit(1)
+    results = test_manager.check_off_many([(3,), (2,)])
+    assert [result['success'] for result in results] == [False, True]
+    assert cache.get(1) is None and cache.get(3) is None
+
+    with test_manager.db.connection() as conn:
+        assert conn.execute(
+            "SELECT COUNT(*) FROM Completions WHERE habit_id NOT IN (SELECT habit_id FROM Habits)"
+        ).fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM CompletionRollup WHERE habit_id IN (1, 3)").fetchone()[0] == 0
+
+
+def test_load_racing_an_invalidate_is_not_stored(test_manager, monkeypatch):
+    """A row read before a concurrent write isn't cached after it."""
+    cache = test_manager.db.habit_cache
+    load = cache._load
+
+    def load_then_write(habit_ids):
+        loaded = load(habit_ids)
+        # The writer commits and invalidates between our SELECT and the insert
+        test_manager.deactivate_habit(1)
+        return loaded
+
+    monkeypatch.setattr(cache, '_load', load_then_write)
+    assert cache.get(1)['is_active']
+    monkeypatch.setattr(cache, '_load', load)
+    assert not cache.get(1)['is_active']
+
+    cache.invalidate()
+    assert cache.get(2)['name'] == "Clean"
+    assert cache.stats()['size'] == 1
@@ -0,0 +1,76 @@
+import pytest
+import io
+import json
+from src.db import Database
+from src.habits_cli import main
+
+
+@pytest.fixture
+def token(test_manager, db_path, monkeypatch, capsys):
+    """One habit for the shared test user, plus a token from 'habits login'."""
+    test_manager.add_habit("Stretch", "daily")
+    monkeypatch.setattr("sys.stdin", io.StringIO("password123\n"))
+    assert main(["--db", db_path, "login", "--username", "testuser", "--password-stdin"]) == 0
+    return capsys.readouterr().out.strip()
+
+
+def test_checkoff_and_streaks_json(db_path, token, capsys):
+    """A check-off through the command line shows up in the JSON streaks."""
+    assert main(["--db", db_path, "--token", token, "checkoff", "1", "--mood", "7"]) == 0
+    assert main(["--db", db_path, "--token", token, "streaks", "--json"]) == 0
+
+    output = capsys.readouterr().out
+    streaks = json.loads(output[output.index("["):])
+    assert streaks == [{'habit_id': 1, 'name': 'Stretch', 'type': 'daily',
+                        'current_streak': 1, 'longest_streak': 1}]
+
+
+def test_token_from_environment_and_rejection(db_path, token, monkeypatch, capsys):
+    """HABITS_TOKEN is honoured; a tampered token is refused."""
+    monkeypatch.setenv("HABITS_TOKEN", token)
+    assert main(["--db", db_path, "export", "--output", "-"]) == 0
+    assert "Habit: Stretch (daily)" in capsys.readouterr().out
+
+    assert main(["--db", db_path, "--token", token[:-1] + "x", "streaks"]) == 1
+    assert "invalid token" in capsys.readouterr().err
+
+
+def test_export_to_stdout(db_path, token, tmp_path, monkeypatch, capsys):
+    """csv/jsonl go to stdout uncompressed instead of a file named '-'."""
+    monkeypatch.chdir(tmp_path)
+    assert main(["--db", db_path, "--token", token, "checkoff", "1"]) == 0
+    capsys.readouterr()
+
+    assert main(["--db", db_path, "--token", token, "export", "--format", "jsonl", "--output", "-"]) == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(r['habit_id'], r['habit_name']) for r in records] == [(1, "Stretch")]
+
+    assert main(["--db", db_path, "--token", token, "export", "--format", "csv", "--output", "-"]) == 0
+    assert capsys.readouterr().out.splitlines()[0].startswith("habit_id,habit_name,")
+
+    assert main(["--db", db_path, "--token", token, "export", "--format", "csv",
+                 "--compress", "gzip", "--output", "-"]) == 1
+    assert "--compress" in capsys.readouterr().err
+    assert not (tmp_path / "-").exists()
+
+
+def test_logout_ends_the_session(db_path, token, capsys):
+    assert main(["--db", db_path, "--token", token, "logout"]) == 0
+    assert main(["--db", db_path, "--token", token, "streaks"]) == 1
+    assert "invalid token" in capsys.readouterr().err
+
+
+def test_init_db_skips_current_schema(db_path, token):
+    """Schema work only runs for outdated databases or when forced."""
+    db = Database(db_path)
+    try:
+        dropped = db.drop_indexes()
+        assert "idx_completions_habit_day" in dropped
+
+        db.init_db()
+        assert db.drop_indexes() == []
+
+        db.init_db(force=True)
+        assert sorted(db.drop_indexes()) == sorted(dropped)
+    finally:
+        db.close()
@@ -17,6 +17,7 @@ def test_db():
     yield db
 
     # Cleanup after test
+    db.close()
     if os.path.exists(test_db_path):
         os.remove(test_db_path)
 
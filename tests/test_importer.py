@@ -0,0 +1,98 @@
+import pytest
+import gzip
+import json
+from src.habit_manager import HabitManager
+from src.importer import CompletionImporter
+from src.rollups import CompletionRollupStore
+
+
+@pytest.fixture
+def test_manager(test_manager):
+    """The shared manager after handing over to a second user; testuser owns habit 1."""
+    test_manager.add_habit("Not yours", "daily")
+
+    db = test_manager.db
+    db.register_user("import_user", "import@example.com", "password123")
+    test_manager.set_current_user(db.authenticate_user("import_user", "password123"))
+    test_manager.add_habit("Run", "daily")
+    return test_manager
+
+
+def _completion_count(db):
+    with db.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM Completions").fetchone()[0]
+
+
+def test_csv_import_dedupes_and_rejects(test_manager, tmp_path):
+    """Duplicates (in the file and already stored) are skipped; bad rows reported."""
+    csv_path = str(tmp_path / "import.csv")
+    test_manager.check_off_many([{'habit_id': 2, 'timestamp': '2025-01-01 08:00:00'}])
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write("habit_id,timestamp,notes,mood_score\n"
+                "2,2025-01-01 08:00:00,,\n"       # already stored
+                "2,2025-01-02 08:00:00,easy,6\n"
+                "2,2025-01-02 08:00:00,easy,6\n"  # repeated in the file
+                "2,2025-01-03 08:00:00,,\n"
+                "1,2025-01-03 08:00:00,,\n"       # someone else's habit
+                "2,yesterday,,\n")
+
+    stats = CompletionImporter(test_manager, chunk_size=2).import_file(csv_path)
+
+    assert (stats['read'], stats['imported'], stats['duplicates'], stats['rejected']) == (6, 2, 2, 2)
+    assert sorted(e['row'] for e in stats['errors']) == [5, 6]
+    assert _completion_count(test_manager.db) == 3
+
+    state = test_manager.streak_state.get_state(2)
+    assert (state['longest_streak'], state['total_completions']) == (3, 3)
+
+
+def test_bulk_jsonl_import_restores_schema(test_manager, tmp_path):
+    """Bulk loads rebuild indexes, triggers and derived tables afterwards."""
+    jsonl_path = str(tmp_path / "import.jsonl.gz")
+    with gzip.open(jsonl_path, 'wt', encoding='utf-8') as f:
+        for day in range(1, 11):
+            f.write(json.dumps({'habit_id': 2, 'timestamp': f"2025-02-{day:02d}T07:30:00Z", 'mood_score': 5}) + "\n")
+
+    db = test_manager.db
+    with db.connection() as conn:
+        schema = conn.execute("SELECT type, name FROM sqlite_master ORDER BY name").fetchall()
+
+    stats = CompletionImporter(test_manager).import_file(jsonl_path, bulk=True)
+    assert stats['bulk'] is True and stats['imported'] == 10
+
+    with db.connection() as conn:
+        assert conn.execute("SELECT type, name FROM sqlite_master ORDER BY name").fetchall() == schema
+        # 'Z' timestamps are stored in the canonical form, so they dedupe against check-offs
+        assert conn.execute("SELECT MIN(timestamp) FROM Completions").fetchone()[0] == '2025-02-01 07:30:00'
+
+    assert CompletionRollupStore(db).completion_count(2) == 10
+    assert test_manager.streak_state.get_state(2)['longest_streak'] == 10
+    assert CompletionImporter(test_manager).import_file(jsonl_path)['duplicates'] == 10
+
+
+def test_bulk_import_repairs_other_users_habits(test_manager, tmp_path):
+    """Triggers are off for everyone during a bulk load, so every habit is rebuilt."""
+    csv_path = str(tmp_path / "import.csv")
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write("habit_id,timestamp\n" + "".join(f"2,2025-03-{day:02d} 08:00:00\n" for day in range(1, 5)))
+
+    db = test_manager.db
+    other = HabitManager(db)
+    other.set_current_user(1)
+
+    def check_off_meanwhile(stats):
+        if stats['read'] == 2:
+            other.check_off_habit(1)
+
+    importer = CompletionImporter(test_manager, chunk_size=2, progress=check_off_meanwhile)
+    assert importer.import_file(csv_path, bulk=True)['imported'] == 4
+
+    assert CompletionRollupStore(db).completion_count(1) == 1
+    assert other.streak_state.get_state(1)['total_completions'] == 1
+
+
+def test_plain_import_is_the_default(test_manager, tmp_path):
+    csv_path = str(tmp_path / "import.csv")
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write("habit_id,timestamp\n2,2025-03-01 08:00:00\n")
+    assert CompletionImporter(test_manager).import_file(csv_path)['bulk'] is False
@@ -0,0 +1,74 @@
+import pytest
+import sqlite3
+
+
+@pytest.fixture
+def test_manager(test_manager):
+    """The shared logged-in manager, with instrumentation switched off again afterwards."""
+    yield test_manager
+    test_manager.db.disable_instrumentation()
+
+
+def test_off_by_default(test_manager):
+    """Without instrumentation, callers get plain sqlite3 connections."""
+    with test_manager.db.connection() as conn:
+        assert isinstance(conn, sqlite3.Connection)
+    assert test_manager.db.query_stats() is None
+
+
+def test_counts_statements_rows_and_callers(test_manager):
+    """Each statement is counted and attributed to the API method that ran it."""
+    db = test_manager.db
+    test_manager.add_habit("Floss", "daily")
+    test_manager.add_habit("Stretch", "daily")
+
+    db.enable_instrumentation()
+    habits = test_manager.list_habits()
+    test_manager.check_off_habit(habits[0][0])
+    stats = db.query_stats()
+
+    assert stats['by_caller']['HabitManager.list_habits']['count'] == 1
+    # The ownership check is a habit-metadata cache miss (reported as the public
+    # get_many(), not its private loader), then the insert
+    assert stats['by_caller']['HabitMetadataCache.get_many']['count'] == 1
+    assert stats['by_caller']['HabitManager.check_off_habit']['count'] == 1
+    list_sql = next(sql for sql in stats['by_statement'] if sql.startswith("SELECT habit_id, name"))
+    assert stats['by_statement'][list_sql]['rows'] == 2
+    assert stats['statements'] == sum(entry['count'] for entry in stats['by_caller'].values())
+
+    db.instrumentation.reset()
+    assert db.query_stats()['statements'] == 0
+
+
+def test_database_methods_are_callers(test_manager):
+    """Database's own API methods are reported, not the code that called them."""
+    db = test_manager.db
+    db.enable_instrumentation()
+    assert db.user_exists("testuser")
+    assert db.authenticate_user("testuser", "password123") == test_manager.current_user_id
+    assert db.register_user("second", "second@test.com", "password123")
+
+    callers = db.query_stats()['by_caller']
+    assert {'Database.user_exists', 'Database.authenticate_user', 'Database.register_user'} <= set(callers)
+    assert not any(caller.startswith(('test_', 'Database.connection', 'Database.transaction')) for caller in callers)
+
+
+def test_slow_query_log(test_manager, tmp_path):
+    """Statements over the threshold are written to the slow-query log."""
+    log_path = str(tmp_path / "slow.log")
+
+    db = test_manager.db
+    db.enable_instrumentation(slow_query_ms=0, slow_query_log=log_path)
+    test_manager.list_habits()
+
+    from src.instrumentation import slow_query_logger
+    for handler in list(slow_query_logger.handlers):
+        handler.flush()
+        handler.close()
+        slow_query_logger.removeHandler(handler)
+
+    with open(log_path, encoding='utf-8') as f:
+        content = f.read()
+
+    assert "HabitManager.list_habits" in content
+    assert db.query_stats()['slow_queries'] >= 1
@@ -0,0 +1,69 @@
+import pytest
+from src.habit_manager import HabitManager
+from src.advanced_analytics import AdvancedAnalytics
+from src.db import Database
+from src.nightly import partition_users, run_nightly_job, summarize_users
+from src.periods import utc_today
+
+
+@pytest.fixture
+def test_db(test_db):
+    """Five users with two habits each and a few days of check-offs."""
+    manager = HabitManager(test_db)
+    for n in range(5):
+        test_db.register_user(f"user{n}", f"user{n}@example.com", "password123")
+        manager.set_current_user(test_db.authenticate_user(f"user{n}", "password123"))
+        manager.add_habit("Read", "daily")
+        manager.add_habit("Clean", "weekly")
+        habit_id = manager.list_habits()[0][0]
+        manager.check_off_many([
+            {'habit_id': habit_id, 'timestamp': f"2025-05-{day:02d} 08:00:00"} for day in range(1, n + 2)
+        ])
+        manager.check_off_habit(habit_id + 1)
+    return test_db
+
+
+def test_partition_users():
+    assert partition_users([], 4) == []
+    assert partition_users([3, 5, 8], 8) == [(3, 3), (5, 5), (8, 8)]
+    assert partition_users(list(range(1, 11)), 3) == [(1, 4), (5, 7), (8, 10)]
+
+
+def test_job_writes_the_same_numbers_as_the_report(test_db):
+    stats = run_nightly_job(test_db.db_path, workers=2, backend='python')
+    assert (stats['users'], stats['habits']) == (5, 10)
+    assert sum(worker['habits'] for worker in stats['workers'].values()) == 10
+
+    report = AdvancedAnalytics(test_db, backend='python').habit_report()
+    with test_db.connection() as conn:
+        rows = conn.execute(
+            "SELECT habit_id, user_id, report_date, current_streak, longest_streak, completions, "
+            "periods_completed, success_rate, rolling_rate FROM HabitSummary ORDER BY habit_id"
+        ).fetchall()
+    assert [row[0] for row in rows] == sorted(report)
+    for habit_id, user_id, report_date, *numbers in rows:
+        expected = report[habit_id]
+        assert report_date == utc_today().isoformat()
+        assert user_id == expected['user_id']
+        assert numbers == [expected[key] for key in ('current_streak', 'longest_streak', 'completions',
+                                                      'periods_completed', 'success_rate', 'rolling_rate')]
+    assert report[9]['longest_streak'] == 5
+
+    # A rerun replaces the previous summary
+    run_nightly_job(test_db.db_path, workers=1, backend='python')
+    with test_db.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM HabitSummary").fetchone()[0] == 10
+
+
+def test_summarize_users_opens_paths_with_uri_characters(tmp_path):
+    db_path = str(tmp_path / "nightly #1 ?50%.db")
+    db = Database(db_path)
+    manager = HabitManager(db)
+    db.register_user("odd", "odd@example.com", "password123")
+    manager.set_current_user(db.authenticate_user("odd", "password123"))
+    manager.add_habit("Read", "daily")
+    manager.check_off_habit(1)
+    db.close()
+
+    result = summarize_users(db_path, (1, 1), utc_today(), 30, 'python')
+    assert [row[:4] for row in result['rows']] == [(1, 1, utc_today().isoformat(), 1)]
@@ -0,0 +1,52 @@
+import pytest
+from datetime import datetime
+from src.habit import DailyHabit, WeeklyHabit
+from src.repository import HabitRepository, PagedCompletionLog
+
+
+@pytest.fixture
+def test_manager(test_manager):
+    """The shared user with a daily habit (five completions, inserted out of order), a weekly one without any, and an inactive one."""
+    for name, habit_type in (("Read", "daily"), ("Clean", "weekly"), ("Old", "daily")):
+        test_manager.add_habit(name, habit_type)
+    test_manager.check_off_many(
+        {'habit_id': 1, 'timestamp': datetime(2024, 3, day, 8), 'notes': "chapter" if day % 2 else None,
+         'mood_score': day}
+        for day in (5, 1, 4, 2, 3)
+    )
+    test_manager.check_off_many([{'habit_id': 3, 'timestamp': datetime(2024, 3, 1)}])
+    test_manager.deactivate_habit(3)
+    return test_manager
+
+
+def test_habits_are_hydrated_in_one_query(test_manager):
+    stats = test_manager.db.enable_instrumentation()
+    habits = HabitRepository(test_manager.db).load_user_habits(1)
+    assert stats.statements == 1
+
+    read, clean = habits
+    assert isinstance(read, DailyHabit) and isinstance(clean, WeeklyHabit)
+    assert (read.habit_id, read.name, clean.habit_id) == (1, "Read", 2)
+    assert isinstance(read.creation_date, datetime)
+    assert [c.timestamp for c in read.completion_records] == [datetime(2024, 3, day, 8) for day in range(1, 6)]
+    assert [c.mood_score for c in read.completion_records] == [1, 2, 3, 4, 5]
+    assert read.completion_records[0].notes == "chapter" and read.completion_records[1].notes is None
+    assert len(clean.completion_records) == 0
+
+    everything = HabitRepository(test_manager.db).load_user_habits(1, include_inactive=True)
+    assert [len(habit.completion_records) for habit in everything] == [5, 0, 1]
+
+
+def test_lazy_records_load_page_by_page(test_manager):
+    habits = HabitRepository(test_manager.db).load_user_habits(1, lazy=True, page_size=2)
+    records = habits[0].completion_records
+    assert isinstance(records, PagedCompletionLog) and records.pages_loaded == 0
+
+    assert records[1].mood_score == 2
+    assert records.pages_loaded == 1
+    assert [c.mood_score for c in records] == [1, 2, 3, 4, 5]
+    assert records.pages_loaded == 3
+    assert len(records) == 5 and records[-1].timestamp == datetime(2024, 3, 5, 8)
+
+    eager = HabitRepository(test_manager.db).load_user_habits(1)
+    assert [c.timestamp for c in eager[0].completion_records] == [c.timestamp for c in records]
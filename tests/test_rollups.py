@@ -0,0 +1,57 @@
+from src.rollups import CompletionRollupStore
+
+
+def _add(manager, name, habit_type):
+    manager.add_habit(name, habit_type)
+    return [h[0] for h in manager.list_habits() if h[1] == name][0]
+
+
+def _snapshot(db):
+    with db.connection() as conn:
+        return conn.execute("SELECT * FROM CompletionRollup ORDER BY habit_id, period_key").fetchall()
+
+
+def test_check_offs_fold_into_one_row_per_period(test_manager):
+    """Completions in the same day (or week) share a rollup row."""
+    daily = _add(test_manager, "Read", "daily")
+    weekly = _add(test_manager, "Clean", "weekly")
+    test_manager.check_off_many([
+        {'habit_id': daily, 'timestamp': '2025-03-03 08:00:00', 'mood_score': 6},
+        {'habit_id': daily, 'timestamp': '2025-03-03 21:30:00', 'mood_score': 8},
+        {'habit_id': daily, 'timestamp': '2025-03-04 08:00:00'},
+        {'habit_id': weekly, 'timestamp': '2025-03-03 09:00:00'},
+        {'habit_id': weekly, 'timestamp': '2025-03-09 09:00:00'},
+    ])
+
+    rollups = CompletionRollupStore(test_manager.db)
+    periods = rollups.get_periods(daily)
+    assert [p['completion_count'] for p in periods] == [2, 1]
+    assert (periods[0]['mood_sum'], periods[0]['mood_count']) == (14, 2)
+    assert periods[0]['last_ts_epoch'] - periods[0]['first_ts_epoch'] == 13.5 * 3600
+    assert rollups.completion_count(daily) == 3
+
+    # Monday to Sunday of one week
+    assert [p['completion_count'] for p in rollups.get_periods(weekly)] == [2]
+
+
+def test_raw_sql_writes_keep_rollups_current(test_manager):
+    """Inserts without period columns, edits and deletes all update the rollup."""
+    db = test_manager.db
+    habit_id = _add(test_manager, "Walk", "daily")
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO Completions (habit_id, timestamp, mood_score) VALUES (?, ?, ?)",
+            [(habit_id, '2025-01-01 07:00:00', 5), (habit_id, '2025-01-01 19:00:00', None),
+             (habit_id, '2025-01-02 07:00:00', 3)]
+        )
+        conn.execute("UPDATE Completions SET timestamp = '2025-01-03 07:00:00' "
+                     "WHERE timestamp = '2025-01-01 19:00:00'")
+        conn.execute("DELETE FROM Completions WHERE timestamp = '2025-01-02 07:00:00'")
+
+    rollups = CompletionRollupStore(db)
+    assert [(p['completion_count'], p['mood_sum'], p['mood_count']) for p in rollups.get_periods(habit_id)] == \
+        [(1, 5, 1), (1, 0, 0)]
+
+    maintained = _snapshot(db)
+    assert rollups.rebuild() == 2
+    assert _snapshot(db) == maintained
@@ -0,0 +1,48 @@
+import sqlite3
+from datetime import date
+from data.scale_data_generator import generate_dataset, shard_path
+
+
+END_DATE = date(2025, 6, 30)
+
+
+def _user_completions(path, username):
+    conn = sqlite3.connect(path)
+    rows = conn.execute(
+        """
+        SELECT h.name, c.timestamp FROM Completions c
+        JOIN Habits h ON h.habit_id = c.habit_id
+        JOIN Users u ON u.user_id = h.user_id
+        WHERE u.username = ? ORDER BY h.name, c.timestamp
+        """,
+        (username,)
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def test_generation_is_deterministic_across_shards(tmp_path):
+    """The same seed yields the same user data, sharded or not."""
+    single = str(tmp_path / "single.db")
+    sharded = str(tmp_path / "sharded.db")
+    shard_paths = [shard_path(sharded, i, 2) for i in range(2)]
+
+    results = generate_dataset(single, users=4, habits=3, years=0.5, seed=7, end_date=END_DATE)
+    assert results[0]['users'] == 4
+    assert results[0]['habits'] == 12
+    assert results[0]['completions'] > 0
+
+    sharded_results = generate_dataset(sharded, users=4, habits=3, years=0.5, seed=7,
+                                       shards=2, workers=1, end_date=END_DATE)
+    assert [r['users'] for r in sharded_results] == [2, 2]
+    assert sum(r['completions'] for r in sharded_results) == results[0]['completions']
+
+    # user2 lands in shard 1 (round-robin) with identical completions
+    assert _user_completions(shard_paths[1], "user2") == _user_completions(single, "user2")
+
+    conn = sqlite3.connect(single)
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    state_rows = conn.execute("SELECT COUNT(*) FROM HabitStreakState").fetchone()[0]
+    conn.close()
+    assert "idx_habit_timestamp" in indexes
+    assert state_rows == 12
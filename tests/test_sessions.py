@@ -0,0 +1,74 @@
+import pytest
+from src.db import Database
+from src.sessions import SessionStore
+
+
+@pytest.fixture
+def test_db(test_db):
+    """A database with two users."""
+    test_db.register_user("alice", "alice@example.com", "password123")
+    test_db.register_user("bob", "bob@example.com", "password456")
+    return test_db
+
+
+def test_validation_is_served_from_memory(test_db):
+    token = test_db.sessions.login("alice", "password123")
+    assert test_db.sessions.login("alice", "wrong") is None
+
+    stats = test_db.enable_instrumentation()
+    assert test_db.sessions.validate(token) == 1
+    assert test_db.sessions.validate(token) == 1
+    assert stats.statements == 0
+    assert test_db.sessions.stats()['hits'] == 2
+
+    # Another process (here: another Database) reads the session once, then caches it
+    other = Database(test_db.db_path)
+    try:
+        assert other.sessions.validate(token) == 1
+        assert other.sessions.validate(token) == 1
+        assert other.sessions.stats() == {'size': 1, 'hits': 1, 'misses': 1}
+        assert other.sessions.validate(token + "x") is None
+    finally:
+        other.close()
+
+
+def test_only_a_hash_of_the_token_is_stored(test_db):
+    token = test_db.sessions.login("bob", "password456")
+    with test_db.connection() as conn:
+        (token_hash,) = conn.execute("SELECT token_hash FROM Sessions").fetchone()
+    assert token_hash != token and token not in token_hash
+
+
+def test_revoke_and_expiry(test_db):
+    alice = [test_db.sessions.login("alice", "password123") for _ in range(2)]
+    bob = test_db.sessions.login("bob", "password456")
+
+    assert test_db.sessions.revoke(alice[0])
+    assert test_db.sessions.validate(alice[0]) is None
+    assert test_db.sessions.validate(alice[1]) == 1
+    assert test_db.sessions.revoke_user(1) == 1
+    assert test_db.sessions.validate(alice[1]) is None
+    assert test_db.sessions.validate(bob) == 2
+
+    # Sessions that are already expired never validate and are purged
+    expired = SessionStore(test_db, ttl=-1)
+    stale = expired.create(2)
+    assert expired.validate(stale) is None
+    assert test_db.sessions.validate(stale) is None
+    assert test_db.sessions.purge_expired() == 1
+    assert test_db.sessions.validate(bob) == 2
+
+
+def test_revocation_elsewhere_is_seen_after_the_cache_ttl(test_db):
+    token = test_db.sessions.login("alice", "password123")
+    other = Database(test_db.db_path)
+    try:
+        trusting = SessionStore(other, cache_ttl=3600)
+        checking = SessionStore(other, cache_ttl=0)
+        assert trusting.validate(token) == 1 and checking.validate(token) == 1
+
+        test_db.sessions.revoke(token)
+        assert trusting.validate(token) == 1  # still within its cache TTL
+        assert checking.validate(token) is None
+    finally:
+        other.close()
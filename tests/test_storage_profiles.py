@@ -0,0 +1,48 @@
+import pytest
+from src.db import Database, STORAGE_PROFILES
+
+
+def test_default_profile_uses_wal(db_path):
+    """The default profile should switch the database to WAL."""
+    db = Database(db_path)
+    report = db.describe_storage()
+    db.close()
+
+    assert report['profile'] == 'balanced'
+    assert report['settings']['journal_mode'] == 'wal'
+    assert report['settings']['synchronous'] == 1  # NORMAL
+
+
+@pytest.mark.parametrize("profile", sorted(STORAGE_PROFILES))
+def test_every_profile_applies(db_path, profile):
+    """Each profile's PRAGMAs are applied to pooled connections."""
+    db = Database(db_path, profile=profile)
+    report = db.describe_storage()
+    db.close()
+
+    assert report['profile'] == profile
+    assert report['settings']['busy_timeout'] == STORAGE_PROFILES[profile]['busy_timeout']
+
+
+def test_unknown_profile_rejected(db_path):
+    """Typos in the profile name should fail loudly."""
+    with pytest.raises(ValueError):
+        Database(db_path, profile="fastest")
+
+
+def test_reader_not_blocked_by_open_write(db_path):
+    """With WAL, a second connection can read while a write is uncommitted."""
+    writer = Database(db_path)
+    reader = Database(db_path)
+    writer.register_user("waluser", "wal@test.com", "password123")
+
+    with writer.connection() as conn:
+        conn.execute("INSERT INTO Users (username, email, password_hash) VALUES ('pending', 'p@p', 'x')")
+        assert conn.in_transaction
+        # The reader sees the last committed state without waiting for the writer
+        assert reader.user_exists("waluser") is True
+        assert reader.user_exists("pending") is False
+        conn.rollback()
+
+    reader.close()
+    writer.close()
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+from src.advanced_analytics import AdvancedAnalytics
+
+
+def _add_completions(db, habit_id, days_ago):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # completion days are UTC
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO Completions (habit_id, timestamp) VALUES (?, ?)",
+            [(habit_id, now - timedelta(days=d)) for d in days_ago]
+        )
+
+
+def test_compute_streaks_matches_per_habit(test_manager):
+    """The batch engine agrees with the per-habit calculators."""
+    db = test_manager.db
+    analytics = AdvancedAnalytics(db)
+
+    test_manager.add_habit("Read", "daily")
+    test_manager.add_habit("Run", "daily")
+    test_manager.add_habit("Call home", "weekly")
+    test_manager.add_habit("Never done", "daily")
+    read_id, run_id, call_id, never_id = [h[0] for h in test_manager.list_habits()]
+
+    _add_completions(db, read_id, [0, 1, 2, 5, 6, 7, 8])
+    _add_completions(db, run_id, [3, 4])
+    _add_completions(db, call_id, [0, 7, 14, 35])
+
+    streaks = analytics.compute_streaks(test_manager.current_user_id)
+
+    assert list(streaks) == [read_id, run_id, call_id, never_id]
+    for habit_id, result in streaks.items():
+        assert result['current_streak'] == analytics.calculate_current_streak(habit_id)
+        assert result['longest_streak'] == analytics.calculate_longest_streak(habit_id)
+
+    assert streaks[read_id]['current_streak'] == 3
+    assert streaks[read_id]['longest_streak'] == 4
+    assert streaks[never_id] == {'name': 'Never done', 'type': 'daily',
+                                 'current_streak': 0, 'longest_streak': 0}
+
+
+def test_longest_streak_all_uses_batch(test_manager):
+    """get_longest_streak_all picks the habit with the longest run."""
+    db = test_manager.db
+    analytics = AdvancedAnalytics(db)
+
+    test_manager.add_habit("Short", "daily")
+    test_manager.add_habit("Long", "daily")
+    short_id, long_id = [h[0] for h in test_manager.list_habits()]
+    _add_completions(db, short_id, [0, 1])
+    _add_completions(db, long_id, [10, 11, 12, 13])
+
+    assert analytics.get_longest_streak_all(test_manager.current_user_id) == ("Long", 4)
@@ -0,0 +1,103 @@
+import pytest
+from datetime import date
+from src.db import Database
+from src.habit_manager import HabitManager
+from src.advanced_analytics import AdvancedAnalytics
+from src.streak_cache import StreakResultCache
+
+
+@pytest.fixture
+def test_manager(test_manager):
+    """The shared logged-in manager with a daily and a weekly habit."""
+    test_manager.add_habit("Read", "daily")
+    test_manager.add_habit("Clean", "weekly")
+    return test_manager
+
+
+def test_repeated_reads_hit_the_cache(test_manager):
+    analytics = AdvancedAnalytics(test_manager.db)
+    test_manager.check_off_habit(1)
+    analytics.compute_streaks(test_manager.current_user_id)
+
+    misses = test_manager.db.streak_cache.stats()['misses']
+    # A second instance shares the Database's cache
+    other = AdvancedAnalytics(test_manager.db)
+    streaks = other.compute_streaks(test_manager.current_user_id)
+    assert test_manager.db.streak_cache.stats()['misses'] == misses
+
+    # Callers can't corrupt the cached overview
+    streaks[1]['current_streak'] = 99
+    assert other.compute_streaks(test_manager.current_user_id)[1]['current_streak'] == 1
+
+
+def test_writes_invalidate(test_manager):
+    """Check-offs, new habits and deletes are visible on the next read."""
+    analytics = AdvancedAnalytics(test_manager.db)
+    user_id = test_manager.current_user_id
+    assert analytics.calculate_longest_streak(2) == 0
+    assert set(analytics.compute_streaks(user_id)) == {1, 2}
+
+    test_manager.check_off_many([{'habit_id': 2}])
+    assert analytics.calculate_longest_streak(2) == 1
+    assert analytics.compute_streaks(user_id)[2]['longest_streak'] == 1
+
+    test_manager.add_habit("Walk", "daily")
+    assert set(analytics.compute_streaks(user_id)) == {1, 2, 3}
+
+    test_manager.delete_habit(2)
+    assert analytics.calculate_longest_streak(2) == 0
+    assert set(analytics.compute_streaks(user_id)) == {1, 3}
+
+
+def test_writes_from_another_database_invalidate(test_manager):
+    """Another process's writes reach this cache through the data version triggers."""
+    analytics = AdvancedAnalytics(test_manager.db)
+    user_id = test_manager.current_user_id
+    assert analytics.calculate_longest_streak(2) == 0
+    assert set(analytics.compute_streaks(user_id)) == {1, 2}
+
+    other_db = Database(test_manager.db.db_path)
+    other = HabitManager(other_db)
+    other.set_current_user(user_id)
+    other.check_off_habit(2)
+    other.add_habit("Walk", "daily")
+    other_db.close()
+
+    assert analytics.calculate_longest_streak(2) == 1
+    streaks = analytics.compute_streaks(user_id)
+    assert set(streaks) == {1, 2, 3}
+    assert streaks[2]['longest_streak'] == 1
+
+
+def test_single_habit_streaks_read_the_state_directly(test_manager):
+    """One query for the stored state, with nothing to check a memo against."""
+    analytics = AdvancedAnalytics(test_manager.db)
+    test_manager.check_off_habit(1)
+    stats = test_manager.db.enable_instrumentation()
+    assert analytics.calculate_current_streak(1) == 1
+    assert analytics.calculate_longest_streak(1) == 1
+    assert stats.statements == 2
+    test_manager.db.disable_instrumentation()
+
+
+def test_results_are_keyed_by_day():
+    """A new as-of date misses, so current streaks roll over at midnight."""
+    cache = StreakResultCache()
+    assert cache.get_or_compute('current', ('user', 1), date(2025, 3, 1), lambda: 4) == 4
+    assert cache.get_or_compute('current', ('user', 1), date(2025, 3, 1), lambda: 0) == 4
+    assert cache.get_or_compute('current', ('user', 1), date(2025, 3, 2), lambda: 0) == 0
+
+
+def test_results_computed_across_a_write_are_not_stored():
+    cache = StreakResultCache()
+
+    def compute_during_write():
+        cache.invalidate(('user', 1))
+        return 'stale'
+
+    assert cache.get_or_compute('longest', ('user', 1), None, compute_during_write) == 'stale'
+    assert cache.get_or_compute('longest', ('user', 1), None, lambda: 'fresh') == 'fresh'
+    assert cache.stats()['size'] == 1
+
+    cache.invalidate()
+    assert cache.get_or_compute('longest', ('user', 1), None, lambda: 'rebuilt') == 'rebuilt'
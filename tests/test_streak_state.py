@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+from src.advanced_analytics import AdvancedAnalytics
+from src.maintenance import rebuild_derived_tables
+from src.periods import completion_columns
+from src.streak_state import state_from_periods
+
+
+def test_state_from_periods():
+    """Runs are measured over consecutive period numbers."""
+    state = state_from_periods([1, 2, 3, 7, 8], 6)
+    assert state == {'current_streak': 2, 'longest_streak': 3, 'last_period': 8, 'total_completions': 6}
+    assert state_from_periods([], 0)['longest_streak'] == 0
+
+
+def test_check_off_updates_state(test_manager):
+    """Each check-off is folded into HabitStreakState in the same transaction."""
+    test_manager.add_habit("Stretch", "daily")
+    habit_id = test_manager.list_habits()[0][0]
+
+    test_manager.check_off_habit(habit_id)
+    test_manager.check_off_habit(habit_id)  # same day: no extra streak
+
+    state = test_manager.streak_state.get_state(habit_id)
+    assert state['total_completions'] == 2
+    assert state['current_streak'] == 1
+    assert state['longest_streak'] == 1
+
+
+def test_rebuild_matches_history(test_manager):
+    """Rebuilding from Completions reproduces the history-based numbers."""
+    db = test_manager.db
+    test_manager.add_habit("Journal", "daily")
+    habit_id = test_manager.list_habits()[0][0]
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # completion days are UTC
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO Completions (habit_id, timestamp) VALUES (?, ?)",
+            [(habit_id, now - timedelta(days=d)) for d in (0, 1, 2, 10, 11, 12, 13, 14)]
+        )
+
+    analytics = AdvancedAnalytics(db)
+    # No state yet: the history-based path answers
+    assert analytics.streak_state.get_state(habit_id) is None
+    expected = (analytics.calculate_current_streak(habit_id), analytics.calculate_longest_streak(habit_id))
+    assert expected == (3, 5)
+
+    assert rebuild_derived_tables(db)['streak_state'] == 1
+    state = analytics.streak_state.get_state(habit_id)
+    assert state['total_completions'] == 8
+    assert (analytics.calculate_current_streak(habit_id), analytics.calculate_longest_streak(habit_id)) == expected
+    assert analytics.compute_streaks(test_manager.current_user_id)[habit_id]['longest_streak'] == 5
+
+
+def test_backdated_completion_triggers_recount(test_manager):
+    """Completions older than the last period fall back to a per-habit rebuild."""
+    db = test_manager.db
+    test_manager.add_habit("Walk", "daily")
+    habit_id = test_manager.list_habits()[0][0]
+    store = test_manager.streak_state
+
+    today = datetime.now(timezone.utc).replace(tzinfo=None)
+    with db.transaction() as conn:
+        for days_ago in (0, 2, 1):
+            timestamp = (today - timedelta(days=days_ago)).strftime('%Y-%m-%d %H:%M:%S')
+            conn.execute("INSERT INTO Completions (habit_id, timestamp) VALUES (?, ?)", (habit_id, timestamp))
+            store.apply_completion(conn, habit_id, 'daily', completion_columns(timestamp)[1])
+
+    state = store.get_state(habit_id)
+    assert state['longest_streak'] == 3
+    assert state['current_streak'] == 3
+    assert state['total_completions'] == 3
@@ -0,0 +1,39 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from src.advanced_analytics import AdvancedAnalytics
+
+
+@pytest.fixture
+def test_manager(test_manager):
+    """The shared logged-in manager with a daily and a weekly habit."""
+    test_manager.add_habit("Read", "daily")
+    test_manager.add_habit("Clean", "weekly")
+    return test_manager
+
+
+def test_success_rate_counts_due_dates(test_manager):
+    """Completed days (weeks) over the schedule's due dates since creation."""
+    # created_at and completion days are UTC
+    today = datetime.now(timezone.utc).replace(tzinfo=None, hour=12, minute=0, second=0, microsecond=0)
+    with test_manager.db.transaction() as conn:
+        for habit_id, age in ((1, 9), (2, 14)):
+            created = (today - timedelta(days=age)).strftime('%Y-%m-%d %H:%M:%S')
+            conn.execute("UPDATE Habits SET created_at = ? WHERE habit_id = ?", (created, habit_id))
+    test_manager.check_off_many(
+        [{'habit_id': 1, 'timestamp': today - timedelta(days=age)} for age in (9, 5, 5, 2, 0)]
+        + [{'habit_id': 2, 'timestamp': today - timedelta(days=age)} for age in (14, 7)]
+    )
+
+    analytics = AdvancedAnalytics(test_manager.db)
+    created_at = {row[0]: row[3] for row in test_manager.list_habits()}
+    # 4 of 10 due days; 2 of 3 due weeks
+    assert analytics.success_rate(1, "daily", created_at[1]) == 40.0
+    assert analytics.success_rate(2, "weekly", created_at[2]) == 66.7
+
+
+def test_success_rate_uses_the_utc_day(test_manager):
+    """An offset creation time counts from its UTC date, like the completion days."""
+    test_manager.check_off_many([{'habit_id': 1, 'timestamp': datetime(2025, 3, 3, 0, 10)}])
+    analytics = AdvancedAnalytics(test_manager.db)
+    # 23:30 at UTC-2 is already March 3rd in UTC: one due day, completed
+    assert analytics.success_rate(1, "daily", "2025-03-02T23:30:00-02:00", today=date(2025, 3, 3)) == 100.0
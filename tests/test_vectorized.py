@@ -0,0 +1,81 @@
+import pytest
+import random
+from src.advanced_analytics import AdvancedAnalytics
+from src.bitmap import CompletionBitmap
+from src.streak_state import state_from_periods
+from src.vectorized import habit_statistics, resolve_backend
+
+
+def _random_history(seed):
+    """Habit histories (id, start, today, completions, bitmap) with gaps and empty habits."""
+    rng = random.Random(seed)
+    habits = []
+    for habit_id in range(1, 60):
+        start = rng.randint(19000, 19100)
+        today = start + rng.randint(0, 200)
+        periods = rng.sample(range(start - 5, today + 1), rng.randint(0, today - start))
+        habits.append((habit_id, start, today, len(periods) * 2, CompletionBitmap.from_periods(periods)))
+    return habits
+
+
+def test_python_backend_matches_plain_loops():
+    habits = _random_history(3)
+    stats = habit_statistics(habits, window=7, backend='python')
+
+    for habit_id, start, today, completions, bitmap in habits:
+        periods = list(bitmap.periods())
+        run = 0
+        while today - run in periods:
+            run += 1
+        assert stats[habit_id]['current_streak'] == run
+        assert stats[habit_id]['longest_streak'] == state_from_periods(periods, 0)['longest_streak']
+        assert stats[habit_id]['completions'] == completions
+        assert stats[habit_id]['periods_completed'] == len(periods)
+        since_start = len([p for p in periods if start <= p <= today])
+        assert stats[habit_id]['success_rate'] == round(since_start * 100 / (today - start + 1), 1)
+        in_window = len([p for p in periods if today - 7 < p <= today])
+        assert stats[habit_id]['rolling_rate'] == round(in_window * 100 / 7, 1)
+
+
+def test_numpy_backend_matches_python():
+    pytest.importorskip("numpy")
+    for seed in range(5):
+        habits = _random_history(seed)
+        assert habit_statistics(habits, 30, 'numpy') == habit_statistics(habits, 30, 'python')
+    empty = [(1, 5, 9, 0, CompletionBitmap())]
+    assert habit_statistics(empty, 30, 'numpy') == habit_statistics(empty, 30, 'python')
+    assert habit_statistics([], 30, 'numpy') == {}
+
+
+def test_backend_selection():
+    with pytest.raises(ValueError):
+        resolve_backend('fortran')
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        assert resolve_backend() == 'python'
+        with pytest.raises(ValueError):
+            resolve_backend('numpy')
+    else:
+        assert resolve_backend() == 'numpy'
+
+
+def test_habit_report_through_analytics(test_manager):
+    db = test_manager.db
+    test_manager.add_habit("Read", "daily")
+    db.register_user("second", "second@example.com", "password123")
+    test_manager.set_current_user(db.authenticate_user("second", "password123"))
+    test_manager.add_habit("Read", "daily")
+    test_manager.check_off_habit(2)
+    test_manager.check_off_habit(2)
+
+    with db.transaction() as conn:
+        # Written behind HabitManager's back: no stored bitmap or streak state yet
+        conn.execute("INSERT INTO Completions (habit_id, timestamp) VALUES (1, '2025-01-01 08:00:00')")
+
+    report = AdvancedAnalytics(db, backend='python').habit_report()
+    assert set(report) == {1, 2}
+    assert report[2]['user_id'] == 2 and report[2]['name'] == "Read"
+    assert (report[2]['current_streak'], report[2]['completions'], report[2]['periods_completed']) == (1, 2, 1)
+    assert (report[1]['current_streak'], report[1]['longest_streak'], report[1]['completions']) == (0, 1, 1)
+    assert AdvancedAnalytics(db, backend='python').habit_report(user_id=1).keys() == {1}
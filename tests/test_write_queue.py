@@ -0,0 +1,68 @@
+import pytest
+import threading
+from src.habit_manager import HabitManager
+from src.write_queue import WriteQueue
+
+
+@pytest.fixture
+def test_db(test_db):
+    """A user with two habits."""
+    manager = HabitManager(test_db)
+    test_db.register_user("queue_user", "queue@example.com", "password123")
+    manager.set_current_user(test_db.authenticate_user("queue_user", "password123"))
+    manager.add_habit("Read", "daily")
+    manager.add_habit("Walk", "daily")
+    return test_db
+
+
+def _completions(db):
+    with db.connection() as conn:
+        return conn.execute("SELECT habit_id, COUNT(*) FROM Completions GROUP BY habit_id").fetchall()
+
+
+def test_concurrent_producers_are_grouped(test_db):
+    writes = WriteQueue(test_db, window=0.05)
+    futures = []
+    lock = threading.Lock()
+
+    def produce(habit_id):
+        for _ in range(25):
+            future = writes.check_off(1, habit_id)
+            with lock:
+                futures.append(future)
+
+    threads = [threading.Thread(target=produce, args=(1 + n % 2,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for future in futures:
+        assert future.result(timeout=10) is None
+    writes.close()
+
+    assert writes.stats()['operations'] == 200
+    assert writes.stats()['batches'] < 200
+    assert _completions(test_db) == [(1, 100), (2, 100)]
+    assert HabitManager(test_db).streak_state.get_state(1)['total_completions'] == 100
+
+
+def test_failed_operation_only_fails_itself(test_db):
+    writes = WriteQueue(test_db, window=0.05)
+    ok = writes.check_off(1, 1)
+    foreign = writes.check_off(2, 1)  # someone else's habit
+    added = writes.add_habit(1, "Stretch", "weekly")
+    broken = writes.submit(lambda: 1 / 0)
+    deleted = writes.delete_habit(1, 2)
+    writes.close()
+
+    assert ok.result() is None and added.result() is None and deleted.result() is None
+    with pytest.raises(ValueError):
+        foreign.result()
+    with pytest.raises(ZeroDivisionError):
+        broken.result()
+    assert _completions(test_db) == [(1, 1)]
+    with test_db.connection() as conn:
+        assert [row[0] for row in conn.execute("SELECT name FROM Habits ORDER BY habit_id")] == ["Read", "Stretch"]
+
+    with pytest.raises(RuntimeError):
+        writes.check_off(1, 1)